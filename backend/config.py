@@ -7,14 +7,28 @@ load_dotenv()
 
 # Directory configuration
 BASE_DIR = Path(__file__).resolve().parent
-PROJECTS_DIR = BASE_DIR / "image_generation"
+# All runtime data lives under DATA_DIR (defaults to the backend package), so
+# benchmarks and test runs can point the whole store at a scratch directory
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BASE_DIR))).resolve()
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+PROJECTS_DIR = DATA_DIR / "image_generation"
 PROJECTS_DIR.mkdir(exist_ok=True)
+PREVIEWS_DIR = DATA_DIR / "previews"
+PREVIEWS_DIR.mkdir(exist_ok=True)
+PREVIEW_CACHE_DIR = DATA_DIR / "preview_cache"
+PREVIEW_CACHE_DIR.mkdir(exist_ok=True)
+PROJECT_INDEX_PATH = DATA_DIR / "project_index.sqlite3"
+# Content-addressed image store; must share a filesystem with PROJECTS_DIR for hardlinks
+BLOBS_DIR = DATA_DIR / "blobs"
+BLOBS_DIR.mkdir(exist_ok=True)
+PROFILES_DIR = DATA_DIR / "profiles"
+PROFILES_DIR.mkdir(exist_ok=True)
 
 # API Configuration
 CONFIG = {
     "runware": {
         "api_key": os.getenv("RUNWARE_API_KEY", "your_key_here"),
-        "api_url": "https://api.runware.ai/v1/imageInference",
+        "api_url": os.getenv("RUNWARE_API_URL", "https://api.runware.ai/v1/imageInference"),
         "models": [
             "runware:101@1",
             "runware:102@1",
@@ -23,7 +37,7 @@ CONFIG = {
     },
     "together": {
         "api_key": os.getenv("TOGETHER_API_KEY", "your_key_here"),
-        "api_url": "https://api.together.xyz/v1/images/generations",
+        "api_url": os.getenv("TOGETHER_API_URL", "https://api.together.xyz/v1/images/generations"),
         "models": [
             "black-forest-labs/FLUX.1-schnell",
             "black-forest-labs/FLUX.1-schnell-Free",
@@ -32,7 +46,7 @@ CONFIG = {
     },
     "Openai": {
         "api_key": os.getenv("OPENAI_API_KEY", "your_key_here"),
-        "api_url": "https://api.openai.com/v1/chat/completions",
+        "api_url": os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions"),
         "models": [
             "gpt-4o-mini",
             "gpt-4.1-mini"
@@ -45,3 +59,63 @@ CONFIG = {
 TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "60"))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
 RETRY_DELAY = int(os.getenv("RETRY_DELAY", "2"))
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("MAX_CONCURRENT_GENERATIONS", "4"))
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "6"))
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(64 * 1024)))
+# "url" keeps images on the provider CDN; "base64" inlines them into the local preview store
+IMAGE_OUTPUT_MODE = os.getenv("IMAGE_OUTPUT_MODE", "url").lower()
+PREVIEW_CACHE_MAX_BYTES = int(os.getenv("PREVIEW_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+PREVIEW_MAX_BYTES = int(os.getenv("PREVIEW_MAX_BYTES", str(25 * 1024 * 1024)))    # per proxied image
+PREVIEW_PROXY_MAX_KEYS = int(os.getenv("PREVIEW_PROXY_MAX_KEYS", "20000"))    # least recently used dropped first
+TRACE_MAX_SESSIONS = int(os.getenv("TRACE_MAX_SESSIONS", "200"))    # oldest session traces are dropped first
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "5000"))          # per session
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+POSTPROCESS_WORKERS = int(os.getenv("POSTPROCESS_WORKERS", str(os.cpu_count() or 1)))
+
+# Slideshow video rendering
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+VIDEO_FPS = int(os.getenv("VIDEO_FPS", "24"))
+VIDEO_WIDTH = int(os.getenv("VIDEO_WIDTH", "1280"))
+VIDEO_HEIGHT = int(os.getenv("VIDEO_HEIGHT", "720"))
+
+# Per-request profiling: off (and not installed) unless a token is configured
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# Logging: events are queued and written by a background thread
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "console").lower()                # console or json
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))             # events beyond this are dropped
+LOG_SUPPRESS_WINDOW = float(os.getenv("LOG_SUPPRESS_WINDOW", "30"))    # seconds; 0 disables suppression
+
+# Production server (backend/server.py)
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Sessions, proxy keys, admission tickets, bulk jobs and metrics are per process;
+# more than one worker is refused unless this accepts that (see backend/server.py)
+ALLOW_PROCESS_LOCAL_STATE = os.getenv("ALLOW_PROCESS_LOCAL_STATE", "0") == "1"
+KEEP_ALIVE_TIMEOUT = int(os.getenv("KEEP_ALIVE_TIMEOUT", "75"))                  # above common proxy idle timeouts (60s)
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "300"))    # in-flight generations and renders
+DRAIN_DELAY = float(os.getenv("DRAIN_DELAY", "0"))                              # seconds /ready fails before SIGTERM stops the listener
+
+# Admission control for background generation work; 0 disables a limit
+MAX_ACTIVE_SESSIONS = int(os.getenv("MAX_ACTIVE_SESSIONS", "16"))
+MAX_ACTIVE_SESSIONS_PER_CLIENT = int(os.getenv("MAX_ACTIVE_SESSIONS_PER_CLIENT", "4"))
+MAX_QUEUED_SCENES = int(os.getenv("MAX_QUEUED_SCENES", "400"))
+MAX_QUEUED_SCENES_PER_CLIENT = int(os.getenv("MAX_QUEUED_SCENES_PER_CLIENT", "100"))
+ADMISSION_SCENE_SECONDS = float(os.getenv("ADMISSION_SCENE_SECONDS", "10"))    # estimate before any scene finishes
+# X-Client-Id is trusted (for per-client admission limits) only alongside this shared secret
+# in X-Client-Secret; without it, clients are told apart by address
+CLIENT_ID_SECRET = os.getenv("CLIENT_ID_SECRET", "")
+
+# Bulk jobs: per-stage worker pools shared by all jobs
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "500"))
+BULK_MAX_ACTIVE_JOBS = int(os.getenv("BULK_MAX_ACTIVE_JOBS", "2"))
+BULK_KEEP_JOBS = int(os.getenv("BULK_KEEP_JOBS", "50"))    # finished jobs kept for status queries
+BULK_ANALYZE_WORKERS = int(os.getenv("BULK_ANALYZE_WORKERS", "2"))
+BULK_PROMPT_WORKERS = int(os.getenv("BULK_PROMPT_WORKERS", "4"))
+BULK_IMAGE_WORKERS = int(os.getenv("BULK_IMAGE_WORKERS", str(MAX_CONCURRENT_GENERATIONS)))
+BULK_APPROVE_WORKERS = int(os.getenv("BULK_APPROVE_WORKERS", "2"))
+BULK_SHUTDOWN_TIMEOUT = float(os.getenv("BULK_SHUTDOWN_TIMEOUT", "30"))    # wait for running stage tasks on shutdown
@@ -1,55 +1,120 @@
 # Complete fix for backend/main.py
 # Replace your existing main.py with this corrected version
 
+import hmac
+import math
 import uuid
 import json
+import asyncio
+import threading
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from contextlib import asynccontextmanager
 
-from .config import CONFIG, PROJECTS_DIR
+from .config import (
+    CONFIG, PROJECTS_DIR, PREVIEWS_DIR, MAX_CONCURRENT_GENERATIONS, EVENT_LOOP_LAG_INTERVAL, DRAIN_DELAY,
+    CLIENT_ID_SECRET, BULK_SHUTDOWN_TIMEOUT
+)
 from .models.schemas import (
     ScriptAnalysis, ScriptRequest, ProjectInfo, ScenePrompt, 
-    GenerationRequest, RegenerationRequest, PreviewImage, 
-    GenerationSession, ApprovalRequest
+    GenerationRequest, RegenerationRequest, BatchRegenerationRequest, PreviewImage, 
+    GenerationSession, ApprovalRequest, ProjectSummaryRequest, PostProcessSettings, BulkJobRequest
 )
-from .models.session_manager import get_session, set_session, delete_session, count_sessions
-from .utils.script_analysis import analyze_script, create_project
+from .models.session_manager import get_session, set_session, delete_session, count_sessions, all_sessions
+from .utils.script_analysis import analyze_script, create_project, new_project_id
 from .utils.prompt_generation import generate_scene_prompts_Openai, generate_fallback_scenes
 from .utils.image_generation import generate_image_with_retry
-from .utils.storage import save_scene_prompts, save_approved_images
+from .utils.storage import save_scene_prompts, load_scene_prompts, save_approved_images
+from .utils.previews import discard_preview, fetch_proxied_preview, known_proxy_key, cached_media_type
+from .utils.thumbnails import get_derivative, project_image_path
+from .utils.project_index import count_projects, rebuild_index, get_indexed_project
+from .utils.downloads import file_sha256
+from .utils.export import iter_project_zip
+from .utils.profiling import (
+    ProfilingMiddleware, PROFILE_FILES, profiling_enabled, token_matches, list_profiles, profile_path
+)
+from .utils.tracing import (
+    span, bind_trace, traced_call, get_trace, discard_trace, summarize_trace, to_chrome_trace
+)
+from .utils.log import configure_logging, flush_logging, get_logger, log_context
+from .utils.admission import AdmissionRejected, admit, scene_finished, release
+from .utils.bulk_jobs import (
+    start_job, get_job, list_jobs, cancel_job, count_active_items, job_progress,
+    shutdown_pipeline as shutdown_bulk_pipeline
+)
+from .utils.lifecycle import READY, get_state, mark_ready, mark_draining, install_drain_handler
+from .utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, ACTIVE_SESSIONS, render_metrics, monitor_event_loop_lag
+from .utils.video import (
+    encoder_available, plan_slideshow, claim_render, render_slideshow, get_render_status, video_path, 
+    count_active_renders
+)
+from .utils.postprocess import (
+    load_settings as load_postprocess_settings, 
+    save_settings as save_postprocess_settings, 
+    shutdown_pool as shutdown_postprocess_pool
+)
+from .utils.http_cache import (
+    IMMUTABLE, REVALIDATE, short_hash, etag_matches, not_modified, json_response_with_etag
+)
+
+configure_logging()
+log = get_logger(__name__)
+
+def replace_preview(session: GenerationSession, preview: PreviewImage) -> None:
+    """Replace the preview for the same scene, or append it if the scene has none yet."""
+    for i, existing_preview in enumerate(session.previews):
+        if existing_preview.scene_number == preview.scene_number:
+            discard_preview(existing_preview.preview_url)
+            session.previews[i] = preview
+            return
+    session.previews.append(preview)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("🚀 Story to Image Generator API starting...")
-    print(f"📁 Projects directory: {PROJECTS_DIR}")
+    log.info("starting", projects_dir=str(PROJECTS_DIR))
+    if count_projects() == 0:
+        log.info("projects_indexed", count=rebuild_index())
 
     providers = {
         "Runware": CONFIG["runware"]["api_key"] != "your_key_here",
         "Together AI": CONFIG["together"]["api_key"] != "your_key_here", 
         "Openai": CONFIG["Openai"]["api_key"] != "your_key_here",
     }
-    for name, available in providers.items():
-        print(f"{'✅' if available else '❌'} {name}")
-
-    print("\n🧠 Available AI Models (Openai):")
-    for model in CONFIG["Openai"]["models"]:
-        print(f"  • {model}")
+    log.info(
+        "providers", 
+        available=[name for name, available in providers.items() if available],
+        missing_keys=[name for name, available in providers.items() if not available]
+    )
+    log.info(
+        "models", 
+        openai=CONFIG["Openai"]["models"], 
+        runware=CONFIG["runware"]["models"], 
+        together=CONFIG["together"]["models"]
+    )
 
-    print("\n🎨 Image Models:")
-    print("  Runware:")
-    for model in CONFIG["runware"]["models"]:
-        print(f"  • {model}")
-    print("  Together AI:")
-    for model in CONFIG["together"]["models"]:
-        print(f"  • {model}")
+    lag_monitor = asyncio.create_task(monitor_event_loop_lag(EVENT_LOOP_LAG_INTERVAL))
+    if not install_drain_handler(DRAIN_DELAY) and DRAIN_DELAY > 0:
+        log.warning("drain_unavailable", drain_delay=DRAIN_DELAY, detail="SIGTERM stops the server without draining")
+    mark_ready()
 
     yield
-    print("🛑 Shutting down...")
+    mark_draining()
+    log.info("shutting_down", **in_flight_work())
+    lag_monitor.cancel()
+    await run_in_threadpool(shutdown_bulk_pipeline, BULK_SHUTDOWN_TIMEOUT)
+    shutdown_postprocess_pool()
+    await run_in_threadpool(flush_logging)
 
 app = FastAPI(
     title="Story to Image Generator",
@@ -66,7 +131,12 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-app.mount("/projects", StaticFiles(directory=PROJECTS_DIR), name="projects")
+# Compress JSON responses (status polls, project listings); already-compressed media is skipped
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Outermost, so a profile covers the whole request; absent unless PROFILE_TOKEN is set
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
 
 @app.get("/")
 async def root():
@@ -88,9 +158,9 @@ async def get_available_models():
 @app.post("/analyze-script", response_model=ProjectInfo)
 async def analyze_script_endpoint(req: ScriptRequest):
     try:
-        project_id = f"story_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        project_id = new_project_id()
         analysis = analyze_script(req.script)
-        create_project(project_id, req.script, analysis)
+        create_project(project_id, req.script, analysis, title=req.title)
         
         return ProjectInfo(
             project_id=project_id,
@@ -102,11 +172,17 @@ async def analyze_script_endpoint(req: ScriptRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-@app.post("/generate-previews")
-async def generate_previews(request: GenerationRequest, background_tasks: BackgroundTasks):
-    project_path = PROJECTS_DIR / request.project_id
-    if not project_path.exists():
-        raise HTTPException(status_code=404, detail="Project not found")
+def prepare_scene_prompts(project_path: Path, request: GenerationRequest) -> List[ScenePrompt]:
+    """Load saved scene prompts or generate (and save) new ones for a generation request."""
+    if request.use_saved_prompts:
+        try:
+            with span("load_saved_prompts"):
+                scenes = load_scene_prompts(project_path, request.scene_numbers)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        if not scenes:
+            raise HTTPException(status_code=400, detail="None of the requested scenes are saved")
+        return scenes
 
     try:
         script = (project_path / "script.txt").read_text(encoding="utf-8")
@@ -114,17 +190,79 @@ async def generate_previews(request: GenerationRequest, background_tasks: Backgr
         raise HTTPException(status_code=404, detail="Script file not found")
 
     # Generate scene prompts
-    if request.ai_provider == "Openai":
-        scenes = generate_scene_prompts_Openai(
-            script, request.num_scenes, request.media_type, request.ai_model
-        )
-    else:
-        scenes = generate_fallback_scenes(script, request.num_scenes, request.media_type)
+    with span("prompt_generation", provider=request.ai_provider, num_scenes=request.num_scenes):
+        if request.ai_provider == "Openai":
+            scenes = generate_scene_prompts_Openai(
+                script, request.num_scenes, request.media_type, request.ai_model
+            )
+        else:
+            scenes = generate_fallback_scenes(script, request.num_scenes, request.media_type)
+
+    with span("save_scene_prompts", scenes=len(scenes)):
+        save_scene_prompts(project_path, scenes)
+    return scenes
+
+def client_id(http_request: Request) -> str:
+    """
+    Admission key: the caller's address. A trusted frontend, one that sends
+    X-Client-Secret matching CLIENT_ID_SECRET, can name its own users with
+    X-Client-Id instead. Otherwise any caller could dodge the per-client
+    limits by changing the header.
+    """
+    address = http_request.client.host if http_request.client else "unknown"
+    claimed = http_request.headers.get("x-client-id")
+    secret = http_request.headers.get("x-client-secret", "")
+    if claimed and CLIENT_ID_SECRET and hmac.compare_digest(secret.encode(), CLIENT_ID_SECRET.encode()):
+        return f"client:{claimed}"
+    return address
+
+def too_many_requests(rejection: AdmissionRejected) -> HTTPException:
+    """429 with Retry-After, and the queue position in the body."""
+    retry_after = max(1, math.ceil(rejection.retry_after))
+    return HTTPException(
+        status_code=429,
+        detail={"error": str(rejection), "retry_after": retry_after, "queue_position": rejection.queue_position},
+        headers={"Retry-After": str(retry_after)}
+    )
 
-    save_scene_prompts(project_path, scenes)
+def admit_or_reject(http_request: Request, scenes: int, parallelism: int = 1) -> str:
+    """Admission ticket for background work, or 429 with Retry-After and a queue position."""
+    try:
+        return admit(client_id(http_request), scenes, parallelism)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise too_many_requests(e)
 
-    # Create generation session
+@app.post("/generate-previews")
+async def generate_previews(request: GenerationRequest, background_tasks: BackgroundTasks, http_request: Request):
+    project_path = PROJECTS_DIR / request.project_id
+    if not project_path.exists():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # Allocated up front so prompt preparation is traced under the session
     session_id = f"session_{uuid.uuid4().hex[:8]}"
+    if request.use_saved_prompts:
+        # Saved prompts are a local read: load them first so the ticket covers exactly what will run
+        try:
+            with bind_trace(session_id):
+                scenes = prepare_scene_prompts(project_path, request)
+            ticket = admit_or_reject(http_request, len(scenes))
+        except Exception:
+            discard_trace(session_id)
+            raise
+    else:
+        # Admitted before the LLM call, so rejected requests cost nothing
+        ticket = admit_or_reject(http_request, request.num_scenes)
+        try:
+            with bind_trace(session_id):
+                scenes = prepare_scene_prompts(project_path, request)
+        except Exception:
+            discard_trace(session_id)
+            release(ticket)
+            raise
+
+    # Create generation session
     session = GenerationSession(
         session_id=session_id,
         project_id=request.project_id,
@@ -141,29 +279,36 @@ async def generate_previews(request: GenerationRequest, background_tasks: Backgr
     def generate_previews_task():
         current_session = get_session(session_id)
         if not current_session:
+            release(ticket)
             return
         
         try:
-            for scene_prompt in scenes:
-                preview = generate_image_with_retry(
-                    scene_prompt, request.image_provider, request.image_model
-                )
-                current_session.previews.append(preview)
-                current_session.completed_scenes += 1
-                
-                if not preview.preview_url:
-                    error_msg = f"Failed to generate scene {scene_prompt.scene_number}"
-                    current_session.errors.append(error_msg)
-                
-                set_session(current_session)  # Update session state
+            with bind_trace(session_id), log_context(project_id=request.project_id), \
+                    span("generate_previews", scenes=len(scenes)):
+                for scene_prompt in scenes:
+                    preview = generate_image_with_retry(
+                        scene_prompt, request.image_provider, request.image_model
+                    )
+                    current_session.previews.append(preview)
+                    current_session.completed_scenes += 1
+                    scene_finished(ticket, preview.generation_time)
+                    
+                    if not preview.preview_url:
+                        error_msg = f"Failed to generate scene {scene_prompt.scene_number}"
+                        current_session.errors.append(error_msg)
+                    
+                    set_session(current_session)  # Update session state
             
             current_session.status = "previewing"
             set_session(current_session)
             
         except Exception as e:
+            log.exception("generation_failed", session_id=session_id, project_id=request.project_id)
             current_session.status = "failed"
             current_session.errors.append(f"Generation failed: {str(e)}")
             set_session(current_session)
+        finally:
+            release(ticket)
 
     background_tasks.add_task(generate_previews_task)
 
@@ -188,20 +333,13 @@ async def regenerate_scene(request: RegenerationRequest):
         raise HTTPException(status_code=404, detail="Scene not found")
 
     # Generate new preview
-    preview = generate_image_with_retry(
-        scene_prompt, request.image_provider, request.image_model
-    )
+    with bind_trace(session.session_id), span("regenerate_scene", scene_number=request.scene_number):
+        preview = generate_image_with_retry(
+            scene_prompt, request.image_provider, request.image_model
+        )
 
     # Update session with new preview
-    replaced = False
-    for i, existing_preview in enumerate(session.previews):
-        if existing_preview.scene_number == request.scene_number:
-            session.previews[i] = preview
-            replaced = True
-            break
-    
-    if not replaced:
-        session.previews.append(preview)
+    replace_preview(session, preview)
 
     if not preview.preview_url:
         session.errors.append(f"Failed to regenerate scene {request.scene_number}")
@@ -214,18 +352,151 @@ async def regenerate_scene(request: RegenerationRequest):
         "new_preview": preview
     }
 
+@app.post("/regenerate-scenes")
+async def regenerate_scenes(
+    request: BatchRegenerationRequest, background_tasks: BackgroundTasks, http_request: Request
+):
+    session = get_session(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.status in ["generating", "regenerating"]:
+        raise HTTPException(
+            status_code=409, 
+            detail=f"Session is busy ({session.status}), try again when it finishes"
+        )
+
+    # Resolve the requested scenes, keeping request order and dropping duplicates
+    prompts_by_number = {p.scene_number: p for p in session.scene_prompts}
+    scene_numbers = list(dict.fromkeys(request.scene_numbers))
+    missing = [n for n in scene_numbers if n not in prompts_by_number]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Scenes not found: {missing}")
+    if not scene_numbers:
+        raise HTTPException(status_code=400, detail="No scenes requested")
+
+    workers = min(MAX_CONCURRENT_GENERATIONS, len(scene_numbers))
+    ticket = admit_or_reject(http_request, len(scene_numbers), parallelism=workers)
+
+    previous_status = session.status
+    session.status = "regenerating"
+    session.regenerating_scenes = scene_numbers.copy()
+    set_session(session)
+
+    def regenerate_scenes_task():
+        lock = threading.Lock()
+
+        def regenerate(scene_number: int):
+            override = request.overrides.get(scene_number)
+            provider = (override and override.image_provider) or request.image_provider
+            model = (override and override.image_model) or request.image_model
+
+            preview = generate_image_with_retry(prompts_by_number[scene_number], provider, model)
+
+            with lock:
+                replace_preview(session, preview)
+                session.regenerating_scenes.remove(scene_number)
+                if not preview.preview_url:
+                    session.errors.append(f"Failed to regenerate scene {scene_number}")
+                set_session(session)
+            scene_finished(ticket, preview.generation_time)
+
+        try:
+            with bind_trace(session.session_id), span("regenerate_scenes", scenes=len(scene_numbers)):
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # Each worker runs in a copy of this context so its spans join the trace
+                    futures = [executor.submit(traced_call(regenerate, n)) for n in scene_numbers]
+                    for future in futures:
+                        future.result()
+        except Exception as e:
+            session.errors.append(f"Batch regeneration failed: {str(e)}")
+        finally:
+            session.regenerating_scenes = []
+            if session.status == "regenerating":
+                session.status = previous_status
+            set_session(session)
+            release(ticket)
+
+    background_tasks.add_task(regenerate_scenes_task)
+
+    return {
+        "session_id": request.session_id,
+        "status": "regenerating",
+        "scene_numbers": scene_numbers
+    }
+
+@app.post("/bulk-jobs")
+async def create_bulk_job(request: BulkJobRequest):
+    """Run many scripts through analysis, prompts and rendering; poll the returned job for progress."""
+    try:
+        job = await run_in_threadpool(start_job, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise too_many_requests(e)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job_progress(job)
+
+@app.get("/bulk-jobs")
+async def list_bulk_jobs():
+    return {"jobs": [job_progress(job) for job in list_jobs()]}
+
+@app.get("/bulk-jobs/{job_id}")
+async def get_bulk_job(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    return {**job_progress(job), "items": job.items}
+
+@app.delete("/bulk-jobs/{job_id}")
+async def cancel_bulk_job(job_id: str):
+    """Stop a bulk job; items already rendering finish their current scenes, the rest are cancelled."""
+    if not cancel_job(job_id):
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    return job_progress(get_job(job_id))
+
 @app.get("/generation-status/{session_id}")
-async def get_generation_status(session_id: str):
+async def get_generation_status(session_id: str, request: Request):
     session = get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+
+    # The version changes on every update, so pollers of an unchanged session get a bodiless 304
+    etag = f'"{session.session_id}-{session.version}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return JSONResponse(jsonable_encoder(session), headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+@app.get("/preview-proxy/{key}")
+async def get_proxied_preview(key: str, request: Request):
+    # Keys name a fixed provider URL, so the bytes behind them never change
+    cache_headers = {"Cache-Control": IMMUTABLE, "ETag": f'"{key}"'}
+    if not await run_in_threadpool(known_proxy_key, key):
+        raise HTTPException(status_code=404, detail="Preview not found")
+    if etag_matches(request, cache_headers["ETag"]):
+        return not_modified(cache_headers["ETag"], IMMUTABLE)
+
+    try:
+        path = await run_in_threadpool(fetch_proxied_preview, key)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to fetch preview: {str(e)}")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Preview not found")
+
+    media_type = await run_in_threadpool(cached_media_type, path)
+    return FileResponse(path, media_type=media_type, headers=cache_headers)
 
 @app.post("/approve-previews")
 async def approve_previews(request: ApprovalRequest):
     session = get_session(request.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    if session.status == "regenerating":
+        raise HTTPException(
+            status_code=409,
+            detail="Session is regenerating scenes, approve when it finishes"
+        )
 
     # Update approval status for each scene
     for scene_num, approved in request.scene_approvals.items():
@@ -234,52 +505,284 @@ async def approve_previews(request: ApprovalRequest):
                 preview.approved = approved
                 break
 
-    # Save approved images
+    # Save approved images off the event loop
     try:
-        saved_count = save_approved_images(session)
+        with bind_trace(session.session_id), span("approve_images"):
+            downloads = await run_in_threadpool(traced_call(save_approved_images, session))
         session.status = "completed"
         set_session(session)
 
         return {
             "status": "completed",
-            "saved_images": saved_count,
-            "total_scenes": len(session.previews)
+            "saved_images": sum(1 for d in downloads if d.success),
+            "total_scenes": len(session.previews),
+            "downloads": downloads
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save images: {str(e)}")
 
 @app.get("/projects")
-async def list_projects():
+async def list_projects(
+    request: Request, 
+    offset: int = 0, 
+    limit: int = 50, 
+    sort: str = "newest", 
+    search: Optional[str] = None
+):
     from .utils.storage import list_projects as _list_projects
-    return _list_projects()
+    if offset < 0 or not 1 <= limit <= 200:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 200")
+    try:
+        page = await run_in_threadpool(_list_projects, offset=offset, limit=limit, sort=sort, search=search)
+        return json_response_with_etag(request, page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/projects/summaries")
+async def get_project_summaries(summary_request: ProjectSummaryRequest, request: Request):
+    from .utils.storage import get_project_summaries as _get_project_summaries
+    if len(summary_request.project_ids) > 200 or summary_request.offset < 0 or not 1 <= summary_request.limit <= 200:
+        raise HTTPException(status_code=400, detail="At most 200 projects per request")
+    try:
+        summaries = await run_in_threadpool(_get_project_summaries, summary_request)
+        return json_response_with_etag(request, summaries)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/projects/{project_id}")
-async def get_project_details(project_id: str):
+async def get_project_details(project_id: str, request: Request):
     from .utils.storage import get_project_details as _get_project_details
     try:
-        return _get_project_details(project_id)
+        return json_response_with_etag(request, _get_project_details(project_id))
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Project not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading project: {str(e)}")
 
+@app.delete("/projects/{project_id}")
+async def delete_project(project_id: str):
+    from .utils.storage import delete_project as _delete_project
+    try:
+        freed_blobs = await run_in_threadpool(_delete_project, project_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return {"message": "Project deleted", "freed_images": freed_blobs}
+
+@app.get("/projects/{project_id}/postprocess", response_model=PostProcessSettings)
+async def get_postprocess_settings(project_id: str):
+    project_path = PROJECTS_DIR / project_id
+    if "/" in project_id or project_id.startswith(".") or not project_path.is_dir():
+        raise HTTPException(status_code=404, detail="Project not found")
+    return load_postprocess_settings(project_path)
+
+@app.put("/projects/{project_id}/postprocess", response_model=PostProcessSettings)
+async def update_postprocess_settings(project_id: str, settings: PostProcessSettings):
+    project_path = PROJECTS_DIR / project_id
+    if "/" in project_id or project_id.startswith(".") or not project_path.is_dir():
+        raise HTTPException(status_code=404, detail="Project not found")
+    try:
+        save_postprocess_settings(project_path, settings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return settings
+
+@app.post("/projects/{project_id}/video")
+async def start_video_render(project_id: str, background_tasks: BackgroundTasks):
+    project_path = PROJECTS_DIR / project_id
+    if "/" in project_id or project_id.startswith(".") or not project_path.is_dir():
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not encoder_available():
+        raise HTTPException(status_code=503, detail="Video encoder (ffmpeg) is not installed")
+    try:
+        plan = plan_slideshow(project_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not claim_render(project_id):
+        raise HTTPException(status_code=409, detail="A render is already running for this project")
+
+    def render_video_task():
+        try:
+            render_slideshow(project_id)
+        except Exception as e:
+            log.exception("video_render_failed", project_id=project_id, error=str(e))
+
+    background_tasks.add_task(render_video_task)
+
+    return {
+        "project_id": project_id,
+        "status": "rendering",
+        "scenes": len(plan),
+        "duration_seconds": round(sum(seconds for _, seconds in plan), 1)
+    }
+
+@app.get("/projects/{project_id}/video/status")
+async def get_video_status(project_id: str):
+    status = get_render_status(project_id)
+    if status:
+        return {"project_id": project_id, **status}
+    if video_path(project_id).exists():
+        return {"project_id": project_id, "status": "completed"}
+    raise HTTPException(status_code=404, detail="No video for this project")
+
+@app.get("/projects/{project_id}/video")
+async def get_video(project_id: str):
+    path = video_path(project_id)
+    if "/" in project_id or project_id.startswith(".") or not path.exists():
+        raise HTTPException(status_code=404, detail="No video for this project")
+    return FileResponse(path, media_type="video/mp4", filename=f"{project_id}.mp4")
+
+@app.get("/projects/{project_id}/export")
+async def export_project(project_id: str):
+    project_path = PROJECTS_DIR / project_id
+    if "/" in project_id or project_id.startswith(".") or not project_path.is_dir():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    return StreamingResponse(
+        iter_project_zip(project_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{project_id}.zip"'}
+    )
+
+def image_version(project_id: str, image_name: str, path: Path) -> str:
+    """Content-hash version of a project image, from the index or by hashing the file."""
+    hashes = (get_indexed_project(project_id) or {}).get("image_hashes", {})
+    return short_hash(hashes.get(image_name) or file_sha256(path))
+
+@app.get("/projects/{project_id}/images/{image_name}")
+async def get_project_image(project_id: str, image_name: str, request: Request, v: Optional[str] = None):
+    try:
+        path = project_image_path(project_id, image_name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    version = await run_in_threadpool(image_version, project_id, image_name, path)
+    etag = f'"{version}"'
+    # Only a URL carrying the current hash is safe to cache forever
+    cache_control = IMMUTABLE if v == version else REVALIDATE
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    return FileResponse(
+        path, 
+        media_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream", 
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+@app.get("/projects/{project_id}/thumbnails/{size}/{image_name}")
+async def get_project_thumbnail(
+    project_id: str, 
+    size: str, 
+    image_name: str, 
+    request: Request, 
+    v: Optional[str] = None
+):
+    try:
+        source = project_image_path(project_id, image_name)
+        version = await run_in_threadpool(image_version, project_id, image_name, source)
+        etag = f'"{version}-{size}"'
+        cache_control = IMMUTABLE if v == version else REVALIDATE
+        if etag_matches(request, etag):
+            return not_modified(etag, cache_control)
+
+        path = await run_in_threadpool(get_derivative, project_id, image_name, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    return FileResponse(
+        path, 
+        media_type="image/webp", 
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
 # NEW: Add catch-all route for direct project access (fixes the 404 issue)
 @app.get("/story_{timestamp}")
-async def get_story_project_direct(timestamp: str):
+async def get_story_project_direct(timestamp: str, request: Request):
     """Handle direct story project access - common cause of 404 errors"""
     project_id = f"story_{timestamp}"
-    return await get_project_details(project_id)
+    return await get_project_details(project_id, request)
 
 @app.delete("/sessions/{session_id}")
 async def cleanup_session(session_id: str):
+    session = get_session(session_id)
+    if session:
+        for preview in session.previews:
+            discard_preview(preview.preview_url)
+    discard_trace(session_id)
     if delete_session(session_id):
         return {"message": "Session cleaned up"}
     raise HTTPException(status_code=404, detail="Session not found")
 
+@app.get("/sessions/{session_id}/trace")
+async def get_session_trace(session_id: str):
+    spans = get_trace(session_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="No trace for this session")
+    return {"session_id": session_id, **summarize_trace(spans), "spans": spans}
+
+@app.get("/sessions/{session_id}/trace/chrome")
+async def get_session_chrome_trace(session_id: str):
+    spans = get_trace(session_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="No trace for this session")
+    return JSONResponse(
+        to_chrome_trace(session_id, spans),
+        headers={"Content-Disposition": f'attachment; filename="trace_{session_id}.json"'}
+    )
+
+def require_profile_token(request: Request) -> None:
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Profiling is not enabled")
+    if not token_matches(request.headers.get("x-profile") or request.query_params.get("profile")):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+@app.get("/profiles")
+async def get_profiles(request: Request):
+    require_profile_token(request)
+    profiles = await run_in_threadpool(list_profiles)
+    return {"profiles": profiles, "total": len(profiles)}
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    require_profile_token(request)
+    path = profile_path(profile_id)
+    if not path or not (path / "summary.json").exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return json.loads((path / "summary.json").read_text(encoding="utf-8"))
+
+@app.get("/profiles/{profile_id}/{filename}")
+async def get_profile_file(profile_id: str, filename: str, request: Request):
+    require_profile_token(request)
+    path = profile_path(profile_id)
+    if not path or filename not in PROFILE_FILES or not (path / filename).exists():
+        raise HTTPException(status_code=404, detail="Profile file not found")
+    media_type = "application/octet-stream" if filename.endswith(".prof") else None
+    return FileResponse(path / filename, media_type=media_type, filename=f"{profile_id}_{filename}")
+
+def sessions_by_status():
+    counts = {}
+    for session in all_sessions().values():
+        counts[(session.status,)] = counts.get((session.status,), 0) + 1
+    return counts
+
+ACTIVE_SESSIONS.set_function(sessions_by_status)
+
+def in_flight_work():
+    return {
+        "generating_sessions": sessions_by_status().get(("generating",), 0),
+        "video_renders": count_active_renders(),
+        "bulk_items": count_active_items()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     try:
-        project_count = len([p for p in PROJECTS_DIR.iterdir() if p.is_dir()])
+        project_count = count_projects()
     except Exception:
         project_count = 0
         
@@ -290,9 +793,23 @@ async def health_check():
         "total_projects": project_count
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness, unlike /health: 503 until startup finishes and once shutdown begins."""
+    state = get_state()
+    return JSONResponse(
+        {"status": state, **in_flight_work()}, 
+        status_code=200 if state == READY else 503
+    )
+
+# Static mounts go last so they don't shadow the /projects/{...} API routes above
+app.mount("/projects", StaticFiles(directory=PROJECTS_DIR), name="projects")
+app.mount("/previews", StaticFiles(directory=PREVIEWS_DIR), name="previews")
+
 if __name__ == "__main__":
     print("🎬 Starting Story to Image Generator API ...")
     print("📦 Install dependencies: pip install -r requirements.txt")
     print("🔑 Set environment: OPENAI_API_KEY, RUNWARE_API_KEY, TOGETHER_API_KEY")
     print("🌐 Providers: Runware, Together; LLM: Openai")
+    print("🏭 Production: python -m backend.server")
     uvicorn.run("backend.main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
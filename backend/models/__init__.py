@@ -7,9 +7,18 @@ from .schemas import (
     ScenePrompt,
     GenerationRequest,
     RegenerationRequest,
+    SceneOverride,
+    BatchRegenerationRequest,
     PreviewImage,
     GenerationSession,
-    ApprovalRequest
+    ApprovalRequest,
+    DownloadResult,
+    ProjectSummaryRequest,
+    PostProcessSettings,
+    BulkScript,
+    BulkJobRequest,
+    BulkItem,
+    BulkJob
 )
 
 from .session_manager import (
@@ -29,9 +38,18 @@ __all__ = [
     'ScenePrompt',
     'GenerationRequest',
     'RegenerationRequest',
+    'SceneOverride',
+    'BatchRegenerationRequest',
     'PreviewImage',
     'GenerationSession',
     'ApprovalRequest',
+    'DownloadResult',
+    'ProjectSummaryRequest',
+    'PostProcessSettings',
+    'BulkScript',
+    'BulkJobRequest',
+    'BulkItem',
+    'BulkJob',
     # Session management
     'get_session',
     'set_session', 
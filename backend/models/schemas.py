@@ -32,6 +32,8 @@ class GenerationRequest(BaseModel):
     ai_model: str = "openai/gpt-4o-mini"
     image_provider: str = "runware"    # "runware", "together"
     image_model: str = "runware:101@1"
+    use_saved_prompts: bool = False    # reuse the project's saved scene prompts, no LLM call
+    scene_numbers: Optional[List[int]] = None    # with use_saved_prompts, only these scenes
 
 class RegenerationRequest(BaseModel):
     session_id: str
@@ -39,6 +41,17 @@ class RegenerationRequest(BaseModel):
     image_provider: str = "runware"
     image_model: str = "runware:101@1"
 
+class SceneOverride(BaseModel):
+    image_provider: Optional[str] = None
+    image_model: Optional[str] = None
+
+class BatchRegenerationRequest(BaseModel):
+    session_id: str
+    scene_numbers: List[int]
+    image_provider: str = "runware"
+    image_model: str = "runware:101@1"
+    overrides: Dict[int, SceneOverride] = {}    # per-scene provider/model overrides
+
 class PreviewImage(BaseModel):
     scene_number: int
     scene_title: str
@@ -49,6 +62,7 @@ class PreviewImage(BaseModel):
     model_used: str
     approved: bool = False
     error: Optional[str] = None
+    local_url: Optional[str] = None    # backend URL serving a cached copy of preview_url
 
 class GenerationSession(BaseModel):
     session_id: str
@@ -59,7 +73,71 @@ class GenerationSession(BaseModel):
     previews: List[PreviewImage]
     scene_prompts: List[ScenePrompt] = []
     errors: List[str] = []
+    regenerating_scenes: List[int] = []
+    version: int = 0    # bumped on every set_session; clients use it to skip unchanged polls
 
 class ApprovalRequest(BaseModel):
     session_id: str
-    scene_approvals: Dict[int, bool]
\ No newline at end of file
+    scene_approvals: Dict[int, bool]
+
+class DownloadResult(BaseModel):
+    scene_number: int
+    filename: str
+    success: bool
+    bytes: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+    sha256: Optional[str] = None
+    stored_bytes: Optional[int] = None    # size on disk after post-processing
+
+class ProjectSummaryRequest(BaseModel):
+    project_ids: List[str] = []        # explicit IDs; when empty, a page of the index is summarized
+    offset: int = 0
+    limit: int = 10
+    sort: str = "newest"               # "newest", "oldest", "words", "images"
+    search: Optional[str] = None
+    thumbnails_per_project: int = 4
+
+class PostProcessSettings(BaseModel):
+    enabled: bool = False
+    max_size: Optional[int] = None     # longest edge in pixels; None keeps the provider size
+    format: str = "jpeg"               # "jpeg", "webp", "avif"
+    quality: int = 85
+    progressive: bool = True           # progressive JPEG; ignored for other formats
+
+
+class BulkScript(BaseModel):
+    script: str
+    title: str = "Untitled Story"
+
+class BulkJobRequest(BaseModel):
+    scripts: List[BulkScript]
+    num_scenes: int = 5
+    media_type: str = "cinematic"
+    ai_provider: str = "Openai"        # "Openai", "fallback"
+    ai_model: str = "openai/gpt-4o-mini"
+    image_provider: str = "runware"    # "runware", "together"
+    image_model: str = "runware:101@1"
+    auto_approve: bool = False         # save every successful scene once an item's images are done
+
+class BulkItem(BaseModel):
+    index: int
+    title: str
+    stage: str = "queued"    # queued, analyzing, prompting, waiting, rendering, approving, done, failed, cancelled, interrupted
+    project_id: Optional[str] = None
+    session_id: Optional[str] = None
+    total_scenes: int = 0
+    completed_scenes: int = 0
+    failed_scenes: int = 0
+    saved_images: int = 0
+    error: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+class BulkJob(BaseModel):
+    job_id: str
+    status: str              # running, cancelling, completed, cancelled, interrupted
+    created_at: str
+    finished_at: Optional[str] = None
+    auto_approve: bool = False
+    items: List[BulkItem] = []
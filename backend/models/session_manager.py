@@ -1,16 +1,20 @@
+import threading
 from typing import Dict, Optional
 from .schemas import GenerationSession
 
 # In-memory session registry
 _sessions: Dict[str, GenerationSession] = {}
+_version_lock = threading.Lock()
 
 def get_session(session_id: str) -> Optional[GenerationSession]:
     """Get a session by ID."""
     return _sessions.get(session_id)
 
 def set_session(session: GenerationSession) -> None:
-    """Store or update a session."""
-    _sessions[session.session_id] = session
+    """Store or update a session, bumping its version so pollers see the change."""
+    with _version_lock:
+        session.version += 1
+        _sessions[session.session_id] = session
 
 def delete_session(session_id: str) -> bool:
     """Delete a session and return True if it existed."""
@@ -0,0 +1,99 @@
+"""
+Production entry point.
+
+    python -m backend.server --workers 1 --port 8000
+
+Unlike `python -m backend.main`, which serves 127.0.0.1 with auto-reload,
+this runs uvicorn without reload. It uses uvloop and httptools when they are
+installed (uvicorn[standard] brings both). Keep-alive is longer than common
+proxy idle timeouts, so the proxy closes idle connections first and never
+reuses one uvicorn has just closed.
+
+Shutdown is graceful. On SIGTERM, /ready fails for DRAIN_DELAY seconds so a
+load balancer can stop routing, then uvicorn stops listening. It waits up to
+GRACEFUL_SHUTDOWN_TIMEOUT seconds for in-flight requests and their
+background work (preview generation, approvals, video renders) to finish.
+
+Several kinds of state live in the memory of the worker that created them:
+
+- generation sessions and video render progress;
+- preview proxy keys;
+- admission tickets and bulk jobs;
+- metrics.
+
+With a shared listening socket, requests land on any worker. Status polls
+then 404, and every limit is multiplied by the worker count. So --workers
+above 1 is refused unless --allow-process-local-state (or
+ALLOW_PROCESS_LOCAL_STATE=1) accepts this. Only accept it when the
+deployment pins each client to one worker and sizes limits per worker.
+To scale on one box, run single-worker instances behind a sticky proxy.
+
+Every option defaults to its environment variable (see backend/config.py).
+"""
+
+import argparse
+import importlib.util
+import uvicorn
+
+from .config import (
+    HOST, PORT, WEB_CONCURRENCY, KEEP_ALIVE_TIMEOUT, GRACEFUL_SHUTDOWN_TIMEOUT, DRAIN_DELAY, ALLOW_PROCESS_LOCAL_STATE
+)
+from .utils.log import configure_logging, get_logger
+
+log = get_logger(__name__)
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--keep-alive", type=int, default=KEEP_ALIVE_TIMEOUT, help="idle keep-alive seconds")
+    parser.add_argument("--graceful-timeout", type=int, default=GRACEFUL_SHUTDOWN_TIMEOUT,
+                        help="seconds to wait for in-flight work on shutdown")
+    parser.add_argument("--access-log", action="store_true", help="log every request")
+    parser.add_argument("--allow-process-local-state", action="store_true", default=ALLOW_PROCESS_LOCAL_STATE,
+                        help="permit --workers > 1 although sessions, limits and jobs are per worker")
+    args = parser.parse_args()
+    if args.workers > 1 and not args.allow_process_local_state:
+        parser.error(
+            f"--workers {args.workers}: sessions, admission limits and bulk jobs are per worker, "
+            "so polls would miss their session and limits would multiply. "
+            "Pass --allow-process-local-state if clients are pinned to workers."
+        )
+
+    configure_logging()
+    if args.workers > 1:
+        log.warning(
+            "process_local_sessions",
+            workers=args.workers,
+            detail="sessions and render progress are per worker; requests for a session must reach the same worker"
+        )
+    log.info(
+        "server_starting",
+        host=args.host, port=args.port, workers=args.workers, loop=event_loop(), http=http_protocol(),
+        keep_alive=args.keep_alive, graceful_timeout=args.graceful_timeout, drain_delay=DRAIN_DELAY
+    )
+
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=event_loop(),
+        http=http_protocol(),
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=args.access_log,
+        log_config=None,    # uvicorn's loggers go through the structured log queue
+        proxy_headers=True,
+        server_header=False
+    )
+
+if __name__ == "__main__":
+    main()
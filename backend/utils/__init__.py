@@ -3,7 +3,10 @@
 from .script_analysis import analyze_script, create_project
 from .prompt_generation import generate_scene_prompts_Openai, generate_fallback_scenes
 from .image_generation import generate_image_with_retry
-from .storage import save_scene_prompts, save_approved_images, list_projects, get_project_details
+from .downloads import download_images
+from .storage import (
+    save_scene_prompts, load_scene_prompts, save_approved_images, list_projects, get_project_details, delete_project
+)
 
 __all__ = [
     'analyze_script',
@@ -11,8 +14,11 @@ __all__ = [
     'generate_scene_prompts_Openai', 
     'generate_fallback_scenes',
     'generate_image_with_retry',
+    'download_images',
     'save_scene_prompts',
+    'load_scene_prompts',
     'save_approved_images',
     'list_projects',
-    'get_project_details'
+    'get_project_details',
+    'delete_project'
 ]
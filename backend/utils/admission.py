@@ -0,0 +1,121 @@
+"""
+Admission control for background generation work.
+
+Each preview generation or batch regeneration takes a ticket for the number
+of scenes it will generate. A ticket counts against four limits:
+
+- active sessions and queued scenes, across all clients;
+- active sessions and queued scenes for one client.
+
+Work that would exceed any limit is rejected up front, before the LLM call
+and the background task. It is not left to compete for provider capacity
+and threadpool slots. The rejection carries an estimate of how long until
+the request would fit (for Retry-After). It also gives a queue position:
+the number of admitted sessions that must finish or drain first. The
+estimate uses a moving average of recent scene times.
+"""
+
+import math
+import uuid
+import threading
+from typing import Dict, List, Optional, Tuple
+from ..config import (
+    MAX_ACTIVE_SESSIONS, MAX_ACTIVE_SESSIONS_PER_CLIENT, MAX_QUEUED_SCENES, MAX_QUEUED_SCENES_PER_CLIENT,
+    ADMISSION_SCENE_SECONDS
+)
+from .metrics import ADMISSION_REJECTIONS, ADMITTED_SESSIONS, QUEUED_SCENES
+
+SCENE_SECONDS_SMOOTHING = 0.2    # weight of the newest scene in the moving average
+
+# ticket -> {"client", "remaining", "parallelism"}, like the in-memory session registry
+_tickets: Dict[str, Dict] = {}
+_scene_seconds = {"average": ADMISSION_SCENE_SECONDS}
+_lock = threading.Lock()
+
+class AdmissionRejected(Exception):
+    def __init__(self, limit: str, retry_after: float, queue_position: int):
+        super().__init__(f"Over the {limit} limit")
+        self.limit = limit
+        self.retry_after = retry_after
+        self.queue_position = queue_position
+
+def _drain_time(tickets: List[Dict], scenes: int, average: float) -> Tuple[float, int]:
+    """
+    Seconds until the given tickets have generated `scenes` more scenes, and
+    how many of them will have finished by then. Each ticket works through
+    its remaining scenes `parallelism` at a time.
+    """
+    finish_times = sorted(
+        math.ceil(t["remaining"] / t["parallelism"]) * average for t in tickets if t["remaining"] > 0
+    )
+    if not finish_times or scenes <= 0:
+        return 0.0, 0
+
+    def drained(seconds: float) -> int:
+        return sum(
+            min(t["remaining"], t["parallelism"] * int(seconds // average)) for t in tickets
+        )
+
+    # Scenes complete in steps of one average scene time, so check each step
+    for steps in range(1, int(finish_times[-1] // average) + 1):
+        if drained(steps * average) >= scenes:
+            seconds = steps * average
+            return seconds, max(1, sum(1 for f in finish_times if f <= seconds))
+    return finish_times[-1], len(finish_times)
+
+def _check(tickets: List[Dict], scenes: int, max_sessions: int, max_scenes: int, scope: str) -> None:
+    average = _scene_seconds["average"]
+    if max_sessions and len(tickets) >= max_sessions:
+        # The (excess + 1)-th session to finish frees the slot this request needs
+        position = len(tickets) - max_sessions + 1
+        finish_times = sorted(math.ceil(t["remaining"] / t["parallelism"]) * average for t in tickets)
+        ADMISSION_REJECTIONS.inc(limit=f"{scope}_sessions")
+        raise AdmissionRejected(f"{scope} active sessions", finish_times[position - 1], position)
+
+    queued = sum(t["remaining"] for t in tickets)
+    if max_scenes and queued + scenes > max_scenes:
+        if scenes > max_scenes:
+            # Never fits, however long the caller waits
+            raise ValueError(f"At most {max_scenes} scenes can be queued at once, {scenes} requested")
+        seconds, position = _drain_time(tickets, queued + scenes - max_scenes, average)
+        ADMISSION_REJECTIONS.inc(limit=f"{scope}_scenes")
+        raise AdmissionRejected(f"{scope} queued scenes", seconds, position)
+
+def admit(client: str, scenes: int, parallelism: int = 1) -> str:
+    """
+    Take a ticket for `scenes` scenes of work. Raises AdmissionRejected when
+    over a limit, ValueError when the request could never fit.
+    """
+    with _lock:
+        everyone = list(_tickets.values())
+        _check(everyone, scenes, MAX_ACTIVE_SESSIONS, MAX_QUEUED_SCENES, "global")
+        mine = [t for t in everyone if t["client"] == client]
+        _check(mine, scenes, MAX_ACTIVE_SESSIONS_PER_CLIENT, MAX_QUEUED_SCENES_PER_CLIENT, "client")
+
+        ticket = uuid.uuid4().hex
+        _tickets[ticket] = {"client": client, "remaining": scenes, "parallelism": max(1, parallelism)}
+        return ticket
+
+def scene_finished(ticket: str, seconds: Optional[float] = None) -> None:
+    """Count one scene of a ticket as done and fold its duration into the estimate."""
+    with _lock:
+        if ticket in _tickets:
+            _tickets[ticket]["remaining"] = max(0, _tickets[ticket]["remaining"] - 1)
+        if seconds is not None and seconds > 0:
+            average = _scene_seconds["average"]
+            _scene_seconds["average"] = average + SCENE_SECONDS_SMOOTHING * (seconds - average)
+
+def release(ticket: str) -> None:
+    with _lock:
+        _tickets.pop(ticket, None)
+
+def active_tickets() -> int:
+    with _lock:
+        return len(_tickets)
+
+def queued_scenes() -> int:
+    with _lock:
+        return sum(t["remaining"] for t in _tickets.values())
+
+ADMITTED_SESSIONS.set_function(active_tickets)
+QUEUED_SCENES.set_function(queued_scenes)
@@ -0,0 +1,101 @@
+import os
+import uuid
+import errno
+import shutil
+import threading
+from pathlib import Path
+from typing import Iterable
+from ..config import BLOBS_DIR
+
+# Project images are hardlinks to sha256-named blobs, so the inode link count is the
+# reference count: a blob with st_nlink == 1 is referenced by no project and can go.
+_lock = threading.Lock()
+
+def blob_path(sha256: str) -> Path:
+    return BLOBS_DIR / sha256[:2] / sha256
+
+def has_blob(sha256: str) -> bool:
+    return blob_path(sha256).exists()
+
+def reference_count(sha256: str) -> int:
+    """Number of project files currently pointing at a blob."""
+    try:
+        return blob_path(sha256).stat().st_nlink - 1
+    except FileNotFoundError:
+        return 0
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """
+    Hardlink when possible; copy across filesystems (that copy is then not
+    deduplicated). Never overwrites: an existing destination raises
+    FileExistsError, like os.link.
+    """
+    try:
+        os.link(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        tmp = destination.parent / f".{destination.name}.{uuid.uuid4().hex[:8]}.copy"
+        try:
+            shutil.copyfile(source, tmp)
+            os.link(tmp, destination)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+def link_blob(sha256: str, destination: Path) -> None:
+    """Atomically replace destination with a reference to an existing blob."""
+    tmp = destination.parent / f".{destination.name}.{uuid.uuid4().hex[:8]}.link"
+    try:
+        _link_or_copy(blob_path(sha256), tmp)
+        os.replace(tmp, destination)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def adopt_file(path: Path, sha256: str) -> bool:
+    """Make a freshly written project file a blob reference.
+
+    If the content is already stored, the new copy is swapped for a link to the
+    existing blob; otherwise the file's own inode becomes the blob. Returns True
+    when the content was a duplicate.
+    """
+    with _lock:
+        blob = blob_path(sha256)
+        if blob.exists():
+            if not os.path.samefile(blob, path):
+                link_blob(sha256, path)
+            return True
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            _link_or_copy(path, blob)
+        except FileExistsError:
+            # Another process stored the same content first; the lock only covers this one
+            link_blob(sha256, path)
+            return True
+        return False
+
+def link_existing(sha256: str, destination: Path) -> bool:
+    """Reference an already stored blob without writing any image bytes."""
+    with _lock:
+        if not has_blob(sha256):
+            return False
+        link_blob(sha256, destination)
+        return True
+
+def release_blobs(sha256s: Iterable[str]) -> int:
+    """Delete the given blobs if no project references them any more."""
+    removed = 0
+    with _lock:
+        for sha256 in set(sha256s):
+            blob = blob_path(sha256)
+            try:
+                if blob.stat().st_nlink <= 1:
+                    blob.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+    return removed
+
+def collect_garbage() -> int:
+    """Delete every unreferenced blob."""
+    return release_blobs(p.name for p in BLOBS_DIR.glob("*/*") if p.is_file())
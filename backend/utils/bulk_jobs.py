@@ -0,0 +1,432 @@
+"""
+Bulk story processing.
+
+A bulk job takes many scripts that share generation settings. Each script
+is an item and passes through four stages:
+
+1. analysis;
+2. scene prompts;
+3. scene images;
+4. optionally, approval of every successful scene.
+
+Each stage has its own bounded thread pool (BULK_*_WORKERS), shared by all
+jobs. An item moves to the next stage as soon as it leaves the current one,
+so stages overlap. While one story's images render, the next story's
+prompts are written and a third story is analyzed.
+
+Before rendering, an item takes an admission ticket, as an interactive
+generation does. While interactive users hold the capacity, bulk items wait
+instead of crowding them out. A waiting item also holds up its prompt
+worker, so no more LLM calls are made than the image stage can absorb.
+
+Every item gets a normal project and generation session, so its results can
+also be viewed and approved through the usual endpoints.
+"""
+
+import time
+import uuid
+import threading
+from datetime import datetime
+from collections import Counter
+from typing import Dict, List, Optional, Set
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from ..config import (
+    PROJECTS_DIR, BULK_MAX_ITEMS, BULK_MAX_ACTIVE_JOBS, BULK_KEEP_JOBS, BULK_ANALYZE_WORKERS, BULK_PROMPT_WORKERS, BULK_IMAGE_WORKERS,
+    BULK_APPROVE_WORKERS
+)
+from ..models.schemas import BulkJob, BulkItem, BulkJobRequest, GenerationSession, ScenePrompt
+from ..models.session_manager import set_session
+from .script_analysis import analyze_script, create_project, new_project_id
+from .prompt_generation import generate_scene_prompts_Openai, generate_fallback_scenes
+from .image_generation import generate_image_with_retry
+from .storage import save_scene_prompts, save_approved_images
+from .admission import AdmissionRejected, admit, scene_finished, release
+from .tracing import span, bind_trace, traced_call
+from .log import get_logger, log_context
+
+log = get_logger(__name__)
+
+FINISHED_STAGES = ("done", "failed", "cancelled", "interrupted")
+ACTIVE_STATUSES = ("running", "cancelling")
+STAGE_WORKERS = {
+    "analyze": BULK_ANALYZE_WORKERS,
+    "prompts": BULK_PROMPT_WORKERS,
+    "images": BULK_IMAGE_WORKERS,
+    "approve": BULK_APPROVE_WORKERS
+}
+MAX_ADMISSION_WAIT = 15    # seconds between admission attempts, whatever Retry-After says
+
+# job_id -> job, plus the request (scripts and settings) it was started with
+_jobs: Dict[str, BulkJob] = {}
+_requests: Dict[str, BulkJobRequest] = {}
+# Per item: the generation session and admission ticket while rendering
+_sessions: Dict[tuple, GenerationSession] = {}
+_tickets: Dict[tuple, str] = {}
+_lock = threading.RLock()
+# Notified whenever a bulk item gives up its admission ticket, so waiting items retry at once
+_ticket_released = threading.Condition(_lock)
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+# Stage tasks submitted and not yet done, so shutdown can wait for them with a deadline
+_pending: Set[Future] = set()
+_shutting_down = threading.Event()
+
+def _get_pool(stage: str) -> ThreadPoolExecutor:
+    with _lock:
+        if stage not in _pools:
+            _pools[stage] = ThreadPoolExecutor(
+                max_workers=max(1, STAGE_WORKERS[stage]), thread_name_prefix=f"bulk-{stage}"
+            )
+        return _pools[stage]
+
+def _submit(stage: str, function, *args) -> None:
+    job_id, index = args[0], args[1]
+    try:
+        if _shutting_down.is_set():
+            raise RuntimeError("shutting down")
+        future = _get_pool(stage).submit(traced_call(function, *args))
+        with _lock:
+            _pending.add(future)
+        future.add_done_callback(_discard_pending)
+    except RuntimeError:
+        _finish_item(job_id, index, "interrupted", "Server shut down before the item finished")
+
+def _discard_pending(future: Future) -> None:
+    with _lock:
+        _pending.discard(future)
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+def _cancelled(job_id: str) -> bool:
+    return _jobs[job_id].status != "running" or _shutting_down.is_set()
+
+def _set_stage(job_id: str, index: int, stage: str, **fields) -> BulkItem:
+    with _lock:
+        item = _jobs[job_id].items[index]
+        item.stage = stage
+        for key, value in fields.items():
+            setattr(item, key, value)
+        return item
+
+def _finish_item(job_id: str, index: int, stage: str, error: Optional[str] = None) -> None:
+    with _lock:
+        job = _jobs[job_id]
+        item = job.items[index]
+        if item.stage in FINISHED_STAGES:
+            return
+        item.stage = stage
+        item.error = error or item.error
+        item.finished_at = _now()
+        session = _sessions.pop((job_id, index), None)
+        if session is not None and session.status == "generating":
+            # Whatever rendered before the item stopped can still be reviewed through the session
+            session.status = "previewing" if session.previews else "failed"
+            session.errors.append(item.error or f"Bulk item {stage}")
+            set_session(session)
+        ticket = _tickets.pop((job_id, index), None)
+
+        if all(i.stage in FINISHED_STAGES for i in job.items):
+            job.status = {"running": "completed", "cancelling": "cancelled"}.get(job.status, job.status)
+            job.finished_at = _now()
+            _requests.pop(job_id, None)
+            finished = job
+        else:
+            finished = None
+
+    if ticket:
+        _release(ticket)
+    if stage == "failed":
+        log.warning("bulk_item_failed", bulk_job=job_id, item=index, error=error)
+    if finished:
+        log.info("bulk_job_finished", bulk_job=job_id, status=finished.status, **_counts(finished))
+
+def _release(ticket: str) -> None:
+    release(ticket)
+    with _ticket_released:
+        _ticket_released.notify_all()
+
+def _counts(job: BulkJob) -> Dict[str, int]:
+    stages = Counter(item.stage for item in job.items)
+    return {"items_done": stages["done"], "items_failed": stages["failed"], "items": len(job.items)}
+
+# Stage 1: analysis and project creation
+def _analyze(job_id: str, index: int) -> None:
+    if _cancelled(job_id):
+        return _finish_item(job_id, index, "cancelled")
+    try:
+        script = _requests[job_id].scripts[index]
+        _set_stage(job_id, index, "analyzing", started_at=_now())
+        project_id = new_project_id()
+        with log_context(bulk_job=job_id, project_id=project_id):
+            create_project(project_id, script.script, analyze_script(script.script), title=script.title)
+        _set_stage(job_id, index, "queued", project_id=project_id)
+    except Exception as e:
+        return _finish_item(job_id, index, "failed", f"Analysis failed: {e}")
+    _submit("prompts", _prompts, job_id, index)
+
+# Stage 2: scene prompts, then admission for the images
+def _prompts(job_id: str, index: int) -> None:
+    if _cancelled(job_id):
+        return _finish_item(job_id, index, "cancelled")
+    request = _requests[job_id]
+    item = _set_stage(job_id, index, "prompting")
+    session_id = f"session_{uuid.uuid4().hex[:8]}"
+
+    try:
+        with bind_trace(session_id), log_context(bulk_job=job_id, project_id=item.project_id):
+            script = request.scripts[index].script
+            with span("prompt_generation", provider=request.ai_provider, num_scenes=request.num_scenes):
+                if request.ai_provider == "Openai":
+                    scenes = generate_scene_prompts_Openai(
+                        script, request.num_scenes, request.media_type, request.ai_model
+                    )
+                else:
+                    scenes = generate_fallback_scenes(script, request.num_scenes, request.media_type)
+            with span("save_scene_prompts", scenes=len(scenes)):
+                save_scene_prompts(PROJECTS_DIR / item.project_id, scenes)
+    except Exception as e:
+        return _finish_item(job_id, index, "failed", f"Prompt generation failed: {e}")
+
+    session = GenerationSession(
+        session_id=session_id,
+        project_id=item.project_id,
+        status="generating",
+        total_scenes=len(scenes),
+        completed_scenes=0,
+        previews=[],
+        scene_prompts=scenes,
+        errors=[]
+    )
+    set_session(session)
+    with _lock:
+        _sessions[(job_id, index)] = session
+    _set_stage(job_id, index, "waiting", session_id=session_id, total_scenes=len(scenes))
+
+    ticket = _wait_for_admission(job_id, index, len(scenes))
+    if ticket is None:
+        return
+    with _lock:
+        _tickets[(job_id, index)] = ticket
+    _set_stage(job_id, index, "rendering")
+    for scene in scenes:
+        _submit("images", _render_scene, job_id, index, scene)
+
+def _wait_for_admission(job_id: str, index: int, scenes: int) -> Optional[str]:
+    """Admission ticket for an item's images; waits while over the limits. None if the item ended instead."""
+    while True:
+        if _cancelled(job_id):
+            _finish_item(job_id, index, "interrupted" if _shutting_down.is_set() else "cancelled")
+            return None
+        try:
+            return admit(f"bulk:{job_id}", scenes, parallelism=min(BULK_IMAGE_WORKERS, scenes))
+        except ValueError as e:
+            _finish_item(job_id, index, "failed", str(e))
+            return None
+        except AdmissionRejected as e:
+            # Interactive sessions don't notify, so their capacity is picked up at the next retry
+            with _ticket_released:
+                if not _cancelled(job_id):
+                    _ticket_released.wait(min(max(e.retry_after, 1), MAX_ADMISSION_WAIT))
+
+# Stage 3: one task per scene, so scenes of several items share the image workers
+def _render_scene(job_id: str, index: int, scene: ScenePrompt) -> None:
+    with _lock:
+        session = _sessions.get((job_id, index))
+        ticket = _tickets.get((job_id, index))
+    if session is None:
+        return
+
+    preview = None
+    if not _cancelled(job_id):
+        request = _requests[job_id]
+        with bind_trace(session.session_id), log_context(bulk_job=job_id, project_id=session.project_id):
+            try:
+                preview = generate_image_with_retry(scene, request.image_provider, request.image_model)
+            except Exception as e:
+                session.errors.append(f"Failed to generate scene {scene.scene_number}: {e}")
+    scene_finished(ticket, preview.generation_time if preview else None)
+
+    with _lock:
+        item = _jobs[job_id].items[index]
+        if preview is not None:
+            session.previews.append(preview)
+            if not preview.preview_url:
+                session.errors.append(f"Failed to generate scene {scene.scene_number}")
+        session.completed_scenes += 1
+        item.completed_scenes = session.completed_scenes
+        if preview is None or not preview.preview_url:
+            item.failed_scenes += 1
+        last = session.completed_scenes == session.total_scenes
+        if last:
+            session.previews.sort(key=lambda p: p.scene_number)
+            session.status = "previewing"
+        set_session(session)
+
+    if not last:
+        return
+    if _cancelled(job_id):
+        return _finish_item(job_id, index, "interrupted" if _shutting_down.is_set() else "cancelled")
+
+    succeeded = any(p.preview_url for p in session.previews)
+    if not succeeded:
+        return _finish_item(job_id, index, "failed", "No scene images were generated")
+    if _jobs[job_id].auto_approve:
+        with _lock:
+            # The ticket covers rendering only; approval has its own pool
+            ticket = _tickets.pop((job_id, index), None)
+        if ticket:
+            _release(ticket)
+        _submit("approve", _approve, job_id, index, session)
+    else:
+        _finish_item(job_id, index, "done")
+
+# Stage 4: approve and save every successful scene
+def _approve(job_id: str, index: int, session: GenerationSession) -> None:
+    _set_stage(job_id, index, "approving")
+    try:
+        for preview in session.previews:
+            preview.approved = bool(preview.preview_url)
+        with bind_trace(session.session_id), log_context(bulk_job=job_id, project_id=session.project_id), \
+                span("approve_images"):
+            results = save_approved_images(session)
+        session.status = "completed"
+        set_session(session)
+        _set_stage(job_id, index, "approving", saved_images=sum(1 for r in results if r.success))
+    except Exception as e:
+        return _finish_item(job_id, index, "failed", f"Saving images failed: {e}")
+    _finish_item(job_id, index, "done")
+
+def _prune_jobs() -> None:
+    finished = [job_id for job_id, job in _jobs.items() if job.status not in ACTIVE_STATUSES]
+    for job_id in finished[:max(0, len(finished) - BULK_KEEP_JOBS)]:
+        del _jobs[job_id]
+
+def start_job(request: BulkJobRequest) -> BulkJob:
+    """
+    Register a job and queue all of its items for analysis. Raises ValueError
+    for unusable requests, AdmissionRejected when BULK_MAX_ACTIVE_JOBS are running.
+    """
+    if not request.scripts:
+        raise ValueError("No scripts given")
+    if len(request.scripts) > BULK_MAX_ITEMS:
+        raise ValueError(f"At most {BULK_MAX_ITEMS} scripts per job, {len(request.scripts)} given")
+    if request.num_scenes < 1:
+        raise ValueError("num_scenes must be at least 1")
+    if _shutting_down.is_set():
+        raise RuntimeError("Server is shutting down")
+
+    job = BulkJob(
+        job_id=f"bulk_{uuid.uuid4().hex[:8]}",
+        status="running",
+        created_at=_now(),
+        auto_approve=request.auto_approve,
+        items=[BulkItem(index=i, title=script.title) for i, script in enumerate(request.scripts)]
+    )
+    with _lock:
+        active = [j for j in _jobs.values() if j.status in ACTIVE_STATUSES]
+        if BULK_MAX_ACTIVE_JOBS and len(active) >= BULK_MAX_ACTIVE_JOBS:
+            # The (excess + 1)-th job to finish frees the slot; 60s until a job has a throughput to go by
+            position = len(active) - BULK_MAX_ACTIVE_JOBS + 1
+            estimates = sorted(estimate_remaining_seconds(j) or 60.0 for j in active)
+            raise AdmissionRejected("active bulk jobs", estimates[position - 1], position)
+        _prune_jobs()
+        _jobs[job.job_id] = job
+        _requests[job.job_id] = request
+
+    log.info("bulk_job_started", bulk_job=job.job_id, items=len(job.items), auto_approve=job.auto_approve)
+    for index in range(len(job.items)):
+        _submit("analyze", _analyze, job.job_id, index)
+    return job
+
+def get_job(job_id: str) -> Optional[BulkJob]:
+    with _lock:
+        job = _jobs.get(job_id)
+        return job.copy(deep=True) if job else None
+
+def list_jobs() -> List[BulkJob]:
+    with _lock:
+        return [job.copy(deep=True) for job in reversed(_jobs.values())]
+
+def cancel_job(job_id: str) -> bool:
+    """Stop a running job: items not yet finished end as cancelled. False if unknown."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return False
+        if job.status == "running":
+            job.status = "cancelling"
+            _ticket_released.notify_all()
+        return True
+
+def count_active_items() -> int:
+    with _lock:
+        return sum(
+            1 for job in _jobs.values() if job.status in ACTIVE_STATUSES
+            for item in job.items if item.stage not in FINISHED_STAGES
+        )
+
+def estimate_remaining_seconds(job: BulkJob) -> Optional[float]:
+    """Remaining time at the job's throughput so far; None until an item has finished."""
+    finished = sum(1 for item in job.items if item.stage in FINISHED_STAGES)
+    if not finished:
+        return None
+    end = datetime.fromisoformat(job.finished_at) if job.finished_at else datetime.now()
+    elapsed = (end - datetime.fromisoformat(job.created_at)).total_seconds()
+    return elapsed / finished * (len(job.items) - finished)
+
+def job_progress(job: BulkJob) -> Dict:
+    """Aggregate progress for a job, without the per-item details."""
+    end = datetime.fromisoformat(job.finished_at) if job.finished_at else datetime.now()
+    elapsed = (end - datetime.fromisoformat(job.created_at)).total_seconds()
+    finished = sum(1 for item in job.items if item.stage in FINISHED_STAGES)
+    remaining = estimate_remaining_seconds(job)
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "auto_approve": job.auto_approve,
+        "total_items": len(job.items),
+        "finished_items": finished,
+        "stages": dict(Counter(item.stage for item in job.items)),
+        "total_scenes": sum(item.total_scenes for item in job.items),
+        "completed_scenes": sum(item.completed_scenes for item in job.items),
+        "failed_scenes": sum(item.failed_scenes for item in job.items),
+        "saved_images": sum(item.saved_images for item in job.items),
+        "elapsed_seconds": round(elapsed, 1),
+        "items_per_minute": round(finished / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "eta_seconds": round(remaining, 1) if remaining is not None else None
+    }
+
+def shutdown_pipeline(timeout: float) -> None:
+    """
+    Stop taking work and give running stage tasks up to `timeout` seconds to
+    finish. Items unfinished by then are marked interrupted; blocks, so call
+    it off the event loop.
+    """
+    deadline = time.monotonic() + timeout
+    _shutting_down.set()
+    with _lock:
+        _ticket_released.notify_all()
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    with _lock:
+        pending = list(_pending)
+    _, still_running = wait(pending, timeout=max(0.0, deadline - time.monotonic()))
+    if still_running:
+        log.warning("bulk_shutdown_timeout", running_tasks=len(still_running), timeout=timeout)
+
+    with _lock:
+        unfinished = [
+            (job.job_id, item.index) for job in _jobs.values()
+            for item in job.items if item.stage not in FINISHED_STAGES
+        ]
+        for job in _jobs.values():
+            if job.status in ACTIVE_STATUSES:
+                job.status = "interrupted"
+    for job_id, index in unfinished:
+        _finish_item(job_id, index, "interrupted", "Server shut down before the item finished")
@@ -0,0 +1,129 @@
+import os
+import time
+import hashlib
+import tempfile
+import requests
+from pathlib import Path
+from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from ..config import TIMEOUT, DOWNLOAD_CONCURRENCY, DOWNLOAD_CHUNK_SIZE
+from ..models.schemas import DownloadResult
+from .metrics import DOWNLOAD_BYTES, DOWNLOAD_SECONDS
+from .tracing import span, traced_call
+from .log import get_logger
+
+log = get_logger(__name__)
+
+# (scene_number, url, destination)
+DownloadJob = Tuple[int, str, Path]
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in chunks without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stream_to_file(
+    http: requests.Session, 
+    url: str, 
+    destination: Path, 
+    max_bytes: Optional[int] = None, 
+    content_type: Optional[str] = None
+) -> Tuple[int, str]:
+    """Stream a URL into a temp file next to destination, then rename it into place.
+
+    Returns the number of bytes written and their sha256, computed while streaming.
+    Raises ValueError for bodies over max_bytes or a Content-Type not starting
+    with content_type; nothing is left at destination in that case.
+    """
+    tmp_path = None
+
+    try:
+        with http.get(url, stream=True, timeout=TIMEOUT) as response:
+            response.raise_for_status()
+
+            received_type = response.headers.get("Content-Type", "")
+            if content_type and not received_type.startswith(content_type):
+                raise ValueError(f"Unexpected Content-Type '{received_type}'")
+            declared = int(response.headers.get("Content-Length") or 0)
+            if max_bytes is not None and declared > max_bytes:
+                raise ValueError(f"Response of {declared} bytes exceeds the {max_bytes} byte limit")
+
+            bytes_written = 0
+            digest = hashlib.sha256()
+            fd, tmp_name = tempfile.mkstemp(
+                dir=destination.parent, prefix=f".{destination.name}.", suffix=".part"
+            )
+            tmp_path = Path(tmp_name)
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    bytes_written += len(chunk)
+                    # Content-Length may be missing or wrong; count what actually arrives
+                    if max_bytes is not None and bytes_written > max_bytes:
+                        raise ValueError(f"Response exceeds the {max_bytes} byte limit")
+                    f.write(chunk)
+                    digest.update(chunk)
+
+        # Readers only ever see the old file or the complete new one
+        os.replace(tmp_path, destination)
+        return bytes_written, digest.hexdigest()
+
+    except Exception:
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+        raise
+
+def download_to_file(
+    http: requests.Session, 
+    scene_number: int, 
+    url: str, 
+    destination: Path
+) -> DownloadResult:
+    """Download one scene image and report its size and duration."""
+    start_time = time.time()
+
+    try:
+        with span("download", scene_number=scene_number) as trace:
+            bytes_written, sha256 = stream_to_file(http, url, destination)
+            trace["bytes"] = bytes_written
+        DOWNLOAD_BYTES.inc(bytes_written)
+        DOWNLOAD_SECONDS.observe(time.time() - start_time, outcome="success")
+        return DownloadResult(
+            scene_number=scene_number,
+            filename=destination.name,
+            success=True,
+            bytes=bytes_written,
+            duration=time.time() - start_time,
+            sha256=sha256
+        )
+
+    except Exception as e:
+        log.warning("download_failed", scene_number=scene_number, error=str(e))
+        DOWNLOAD_SECONDS.observe(time.time() - start_time, outcome="failure")
+        return DownloadResult(
+            scene_number=scene_number,
+            filename=destination.name,
+            success=False,
+            duration=time.time() - start_time,
+            error=str(e)
+        )
+
+def download_images(jobs: List[DownloadJob], max_workers: int = DOWNLOAD_CONCURRENCY) -> List[DownloadResult]:
+    """Download many images concurrently with bounded parallelism, preserving job order."""
+    if not jobs:
+        return []
+
+    workers = max(1, min(max_workers, len(jobs)))
+
+    with requests.Session() as http:
+        # Size the connection pool to the worker count so connections are reused
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        http.mount("http://", adapter)
+        http.mount("https://", adapter)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # traced_call carries the caller's trace into the worker threads
+            futures = [executor.submit(traced_call(download_to_file, http, *job)) for job in jobs]
+            return [future.result() for future in futures]
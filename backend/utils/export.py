@@ -0,0 +1,72 @@
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+from ..config import PROJECTS_DIR, DOWNLOAD_CHUNK_SIZE
+from .thumbnails import list_image_files
+
+# Text compresses well; images don't, so they are stored as-is to keep export at disk speed
+TEXT_FILES = ["script.txt", "analysis.json", "scene_prompts.txt", "scene_prompts.json"]
+
+class _StreamBuffer:
+    """Write-only, unseekable sink that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def export_entries(project_path: Path) -> List[Tuple[Path, str, int]]:
+    """Files included in a project export as (path, archive name, compression)."""
+    entries = [
+        (project_path / name, name, zipfile.ZIP_DEFLATED) 
+        for name in TEXT_FILES 
+        if (project_path / name).exists()
+    ]
+    entries.extend(
+        (img_file, f"images/{img_file.name}", zipfile.ZIP_STORED) 
+        for img_file in list_image_files(project_path / "images")
+    )
+    return entries
+
+def iter_project_zip(project_id: str) -> Iterator[bytes]:
+    """Stream a ZIP of a project chunk by chunk, without temp files or whole-file buffering."""
+    project_path = PROJECTS_DIR / project_id
+    if "/" in project_id or project_id.startswith(".") or not project_path.is_dir():
+        raise FileNotFoundError("Project not found")
+
+    entries = export_entries(project_path)
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, mode="w") as archive:
+        for path, arcname, compression in entries:
+            zinfo = zipfile.ZipInfo.from_file(path, f"{project_id}/{arcname}")
+            zinfo.compress_type = compression
+
+            with open(path, "rb") as src, archive.open(zinfo, mode="w") as dst:
+                for chunk in iter(lambda: src.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    dst.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central directory
+    yield buffer.drain()
@@ -0,0 +1,44 @@
+import json
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# Versioned URLs never change content, so clients may keep them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Everything else may be cached but must be revalidated (cheap 304s)
+REVALIDATE = "no-cache"
+
+def short_hash(sha256: str) -> str:
+    """Version token used in URLs and ETags."""
+    return sha256[:16]
+
+def versioned_url(url: str, sha256: Optional[str]) -> str:
+    """Append a content-hash version to an asset URL when the hash is known."""
+    return f"{url}?v={short_hash(sha256)}" if sha256 else url
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names this representation."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def json_response_with_etag(request: Request, payload: Any, cache_control: str = REVALIDATE) -> Response:
+    """Serialize payload once, tag it with a hash of the body and honour If-None-Match."""
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    return Response(
+        content=body, 
+        media_type="application/json", 
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
@@ -2,8 +2,20 @@ import time
 import uuid
 import requests
 from typing import Optional
-from ..config import CONFIG, TIMEOUT, MAX_RETRIES, RETRY_DELAY
+from ..config import CONFIG, TIMEOUT, MAX_RETRIES, RETRY_DELAY, IMAGE_OUTPUT_MODE
 from ..models.schemas import ScenePrompt, PreviewImage
+from .previews import store_base64_preview, proxy_preview_url
+from .metrics import (
+    IMAGE_ATTEMPT_SECONDS, IMAGE_GENERATION_SECONDS, IMAGE_RETRIES, IMAGE_FAILURES, 
+    PROVIDER_ERRORS, SCENES_IN_FLIGHT, bounded_label
+)
+from .tracing import span
+from .log import get_logger, log_context
+
+log = get_logger(__name__)
+
+INLINE_OUTPUT = IMAGE_OUTPUT_MODE == "base64"
+IMAGE_PROVIDERS = ("runware", "together")
 
 def generate_image_runware(scene: ScenePrompt, model: str) -> Optional[str]:
     """Generate image using Runware API."""
@@ -11,7 +23,7 @@ def generate_image_runware(scene: ScenePrompt, model: str) -> Optional[str]:
         payload = {
             "taskType": "imageInference",
             "taskUUID": str(uuid.uuid4()),
-            "outputType": "URL",
+            "outputType": "base64Data" if INLINE_OUTPUT else "URL",
             "outputFormat": "JPG",
             "positivePrompt": scene.image_prompt,
             "height": 1024,
@@ -36,15 +48,28 @@ def generate_image_runware(scene: ScenePrompt, model: str) -> Optional[str]:
         
         if response.status_code == 200:
             data = response.json()
+            result = None
             if isinstance(data, list) and len(data) > 0:
-                return data[0].get("imageURL", "")
+                result = data[0]
             elif "data" in data and data["data"]:
-                return data["data"][0].get("imageURL", "")
+                result = data["data"][0]
+            
+            if result:
+                if INLINE_OUTPUT:
+                    encoded = result.get("imageBase64Data")
+                    return store_base64_preview(encoded) if encoded else None
+                return result.get("imageURL", "")
+            PROVIDER_ERRORS.inc(provider="runware", reason="empty")
+        else:
+            PROVIDER_ERRORS.inc(provider="runware", reason=f"http_{response.status_code}")
+            log.warning("provider_http_error", provider="runware", error=f"HTTP {response.status_code}")
                 
     except requests.exceptions.RequestException as e:
-        print(f"Runware API request error: {e}")
+        PROVIDER_ERRORS.inc(provider="runware", reason="request")
+        log.warning("provider_request_failed", provider="runware", error=str(e))
     except Exception as e:
-        print(f"Runware unexpected error: {e}")
+        PROVIDER_ERRORS.inc(provider="runware", reason="unexpected")
+        log.exception("provider_unexpected_error", provider="runware", error=str(e))
     
     return None
 
@@ -58,7 +83,7 @@ def generate_image_together(scene: ScenePrompt, model: str) -> Optional[str]:
             "height": 1024,
             "steps": 4 if "schnell" in model.lower() else 20,
             "n": 1,
-            "response_format": "url"
+            "response_format": "b64_json" if INLINE_OUTPUT else "url"
         }
         
         headers = {
@@ -76,32 +101,70 @@ def generate_image_together(scene: ScenePrompt, model: str) -> Optional[str]:
         if response.status_code == 200:
             data = response.json()
             if "data" in data and data["data"]:
+                if INLINE_OUTPUT:
+                    encoded = data["data"][0].get("b64_json")
+                    return store_base64_preview(encoded) if encoded else None
                 return data["data"][0].get("url", "")
+            PROVIDER_ERRORS.inc(provider="together", reason="empty")
+        else:
+            PROVIDER_ERRORS.inc(provider="together", reason=f"http_{response.status_code}")
+            log.warning("provider_http_error", provider="together", error=f"HTTP {response.status_code}")
                 
     except requests.exceptions.RequestException as e:
-        print(f"Together AI API request error: {e}")
+        PROVIDER_ERRORS.inc(provider="together", reason="request")
+        log.warning("provider_request_failed", provider="together", error=str(e))
     except Exception as e:
-        print(f"Together AI unexpected error: {e}")
+        PROVIDER_ERRORS.inc(provider="together", reason="unexpected")
+        log.exception("provider_unexpected_error", provider="together", error=str(e))
     
     return None
 
 def generate_image_with_retry(scene: ScenePrompt, provider: str, model: str) -> PreviewImage:
     """Generate image with retry logic."""
+    with log_context(scene_number=scene.scene_number, provider=provider, model=model), \
+            span("generate_image", scene_number=scene.scene_number, provider=provider, model=model) as trace:
+        preview = _generate_image_with_retry(scene, provider, model)
+        trace["outcome"] = "success" if preview.preview_url else "failure"
+        return preview
+
+def _generate_image_with_retry(scene: ScenePrompt, provider: str, model: str) -> PreviewImage:
+    # Provider and model come from the request, so only configured ones get their own series
+    labels = {
+        "provider": bounded_label(provider, IMAGE_PROVIDERS),
+        "model": bounded_label(model, CONFIG[provider]["models"] if provider in IMAGE_PROVIDERS else ())
+    }
     start_time = time.time()
     last_error = None
+    SCENES_IN_FLIGHT.inc()
     
-    for attempt in range(MAX_RETRIES):
-        try:
-            if provider == "runware":
-                url = generate_image_runware(scene, model)
-            elif provider == "together":
-                url = generate_image_together(scene, model)
-                
-            else:
-                url = None
-                last_error = f"Unknown provider: {provider}"
+    try:
+        for attempt in range(MAX_RETRIES):
+            attempt_start = time.time()
+            url = None
+            with span("image_attempt", scene_number=scene.scene_number, attempt=attempt + 1) as trace:
+                try:
+                    if provider == "runware":
+                        url = generate_image_runware(scene, model)
+                    elif provider == "together":
+                        url = generate_image_together(scene, model)
+                        
+                    else:
+                        last_error = f"Unknown provider: {provider}"
+                        
+                except Exception as e:
+                    last_error = str(e)
+                    log.warning("image_attempt_failed", attempt=attempt + 1, error=str(e))
+                trace["outcome"] = "success" if url else "failure"
+            
+            IMAGE_ATTEMPT_SECONDS.observe(
+                time.time() - attempt_start, 
+                attempt=attempt + 1, outcome="success" if url else "failure", **labels
+            )
             
             if url:
+                IMAGE_GENERATION_SECONDS.observe(
+                    time.time() - start_time, outcome="success", **labels
+                )
                 return PreviewImage(
                     scene_number=scene.scene_number,
                     scene_title=scene.scene_title,
@@ -110,16 +173,20 @@ def generate_image_with_retry(scene: ScenePrompt, provider: str, model: str) ->
                     generation_time=time.time() - start_time,
                     provider_used=provider,
                     model_used=model,
-                    approved=False
+                    approved=False,
+                    local_url=proxy_preview_url(url)
                 )
-                
-        except Exception as e:
-            last_error = str(e)
-            print(f"Generation attempt {attempt + 1} failed: {e}")
-        
-        # Wait before retry (except on last attempt)
-        if attempt < MAX_RETRIES - 1:
-            time.sleep(RETRY_DELAY)
+            
+            # Wait before retry (except on last attempt)
+            if attempt < MAX_RETRIES - 1:
+                IMAGE_RETRIES.inc(**labels)
+                with span("retry_wait", scene_number=scene.scene_number, seconds=RETRY_DELAY):
+                    time.sleep(RETRY_DELAY)
+    finally:
+        SCENES_IN_FLIGHT.dec()
+
+    IMAGE_FAILURES.inc(**labels)
+    IMAGE_GENERATION_SECONDS.observe(time.time() - start_time, outcome="failure", **labels)
 
     # Return failed preview
     return PreviewImage(
@@ -132,4 +199,4 @@ def generate_image_with_retry(scene: ScenePrompt, provider: str, model: str) ->
         model_used=model,
         approved=False,
         error=last_error
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,58 @@
+"""
+Process lifecycle state for readiness probes and graceful shutdown.
+
+/health is liveness and answers whenever the process is up. /ready answers
+200 only between the end of startup and the first shutdown signal, so a
+load balancer stops routing new work to a server that is about to stop.
+
+On SIGTERM the server keeps serving for DRAIN_DELAY seconds while /ready
+reports "draining", then passes the signal on to uvicorn. Uvicorn stops
+listening and waits up to its graceful-shutdown timeout for in-flight
+requests and their background tasks (preview generation, batch
+regeneration, video renders) before the lifespan shutdown runs.
+"""
+
+import signal
+import threading
+
+STARTING, READY, DRAINING = "starting", "ready", "draining"
+
+_state = {"value": STARTING}
+
+def get_state() -> str:
+    return _state["value"]
+
+def mark_ready() -> None:
+    _state["value"] = READY
+
+def mark_draining() -> None:
+    _state["value"] = DRAINING
+
+def install_drain_handler(delay: float) -> bool:
+    """
+    Chain a SIGTERM handler in front of the server's own. Call from the main
+    thread once the server has installed its handlers (i.e. during lifespan
+    startup); elsewhere this does nothing. Returns whether it was installed.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    previous = signal.getsignal(signal.SIGTERM)
+    # uvicorn < 0.29 uses loop.add_signal_handler: the Python-level handler is
+    # asyncio's no-op and shutdown goes through the wakeup fd, past any handler here
+    if not callable(previous) or getattr(previous, "__module__", "").startswith("asyncio"):
+        return False
+
+    def handle_sigterm(sig, frame):
+        # A second SIGTERM skips whatever is left of the delay
+        if get_state() == DRAINING or delay <= 0:
+            mark_draining()
+            previous(sig, frame)
+            return
+        mark_draining()
+        # No logging here: a signal handler must not take the log queue's lock
+        timer = threading.Timer(delay, previous, (sig, frame))
+        timer.daemon = True
+        timer.start()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    return True
@@ -0,0 +1,167 @@
+"""
+Structured, non-blocking logging.
+
+Modules log through get_logger(__name__). The calling thread only builds the
+event dict: it merges bound context, stamps level and time, and applies
+repeat suppression. The dict then goes onto a bounded queue. A single
+QueueListener thread renders each event (console or JSON) and writes it to
+stderr, so a slow or blocked stream never stalls generation threads. When
+the queue is full, events are dropped and counted instead of waited on.
+
+Each event includes the context bound with log_context(), such as
+project_id, scene_number, provider and model. It also includes the
+session_id of the current trace. Worker threads keep this context when
+their work is submitted through tracing.traced_call().
+
+A warning or error with the same event, provider and error text as one
+logged within the last LOG_SUPPRESS_WINDOW seconds is suppressed. The next
+one that gets through carries a `suppressed` count. During a provider
+outage this logs one line per window instead of one per failed attempt.
+"""
+
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from typing import Dict, List, Optional, Tuple
+import structlog
+from structlog.contextvars import bound_contextvars as log_context
+from ..config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SUPPRESS_WINDOW
+from .metrics import LOG_EVENTS_SUPPRESSED, LOG_EVENTS_DROPPED
+from .tracing import current_trace
+
+SUPPRESSIBLE_LEVELS = ("warning", "error", "critical")
+MAX_TRACKED_REPEATS = 1000
+
+_handler: Optional[logging.handlers.QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+def get_logger(name: str):
+    return structlog.get_logger(name)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener untouched and never blocks on a full queue."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Rendering happens on the listener thread; the event dict travels as-is
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_EVENTS_DROPPED.inc()
+
+class _RepeatSuppressor:
+    """Processor dropping warnings and errors that repeat within a time window."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._seen: Dict[Tuple, List] = {}    # key -> [window start, suppressed count]
+        self._lock = threading.Lock()
+
+    def __call__(self, logger, method_name: str, event_dict: Dict) -> Dict:
+        if self.window <= 0 or method_name not in SUPPRESSIBLE_LEVELS:
+            return event_dict
+
+        key = (event_dict.get("event"), event_dict.get("provider"), event_dict.get("error"))
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen and now - seen[0] < self.window:
+                seen[1] += 1
+                LOG_EVENTS_SUPPRESSED.inc(event=str(key[0]))
+                raise structlog.DropEvent
+
+            if seen and seen[1]:
+                event_dict["suppressed"] = seen[1]
+            self._seen[key] = [now, 0]
+            if len(self._seen) > MAX_TRACKED_REPEATS:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+        return event_dict
+
+def _add_session(logger, method_name: str, event_dict: Dict) -> Dict:
+    trace_id = current_trace()
+    if trace_id is not None:
+        event_dict.setdefault("session_id", trace_id)
+    return event_dict
+
+def _capture_exc_info(logger, method_name: str, event_dict: Dict) -> Dict:
+    # The listener thread renders the traceback, so capture it while it is still current
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+def configure_logging() -> None:
+    """Route structlog and stdlib logging through the queue; safe to call more than once."""
+    global _handler, _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        level = logging.getLevelName(LOG_LEVEL)
+        if not isinstance(level, int):
+            level = logging.INFO
+
+        timestamper = structlog.processors.TimeStamper(fmt="iso", utc=True)
+        structlog.configure(
+            processors=[
+                structlog.contextvars.merge_contextvars,
+                _add_session,
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.add_logger_name,
+                _RepeatSuppressor(LOG_SUPPRESS_WINDOW),
+                _capture_exc_info,
+                timestamper,
+                structlog.stdlib.ProcessorFormatter.wrap_for_formatter
+            ],
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            wrapper_class=structlog.make_filtering_bound_logger(level),
+            cache_logger_on_first_use=True
+        )
+
+        if LOG_FORMAT == "json":
+            renderers = [structlog.processors.format_exc_info, structlog.processors.JSONRenderer()]
+        else:
+            renderers = [structlog.dev.ConsoleRenderer(colors=False)]
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(structlog.stdlib.ProcessorFormatter(
+            processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, *renderers],
+            # Records from plain logging.getLogger() users
+            foreign_pre_chain=[structlog.stdlib.add_log_level, structlog.stdlib.add_logger_name, timestamper]
+        ))
+
+        _handler = _QueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        root = logging.getLogger()
+        root.addHandler(_handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(_handler.queue, output)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def flush_logging(timeout: float = 1.0) -> None:
+    """
+    Wait up to `timeout` seconds for queued events to be written. uvicorn
+    re-raises SIGTERM once shutdown completes, which kills the process
+    before atexit handlers (and so shutdown_logging) get to run.
+    """
+    handler = _handler
+    if handler is None:
+        return
+    deadline = time.monotonic() + timeout
+    while handler.queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def shutdown_logging() -> None:
+    """Write out queued events and stop the listener thread."""
+    global _handler, _listener
+    with _configure_lock:
+        if _listener is not None:
+            logging.getLogger().removeHandler(_handler)
+            _listener.stop()
+            _handler = _listener = None
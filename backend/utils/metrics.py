@@ -0,0 +1,224 @@
+"""
+Minimal in-process metrics rendered in the Prometheus text format (0.0.4).
+
+Counters, gauges and histograms are module-level objects; instrumented code
+calls .inc() / .set() / .observe() with label values as keyword arguments,
+and GET /metrics renders everything registered here.
+"""
+
+import abc
+import math
+import asyncio
+import threading
+from typing import Callable, Collection, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Provider calls take seconds to minutes; downloads and loop lag are much shorter
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+DOWNLOAD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+_registry: List["_Metric"] = []
+_lock = threading.Lock()
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def bounded_label(value: str, known: Collection[str]) -> str:
+    """Label value for user-supplied input: anything outside `known` is "other", keeping series bounded."""
+    return value if value in known else "other"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        with _lock:
+            _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines, without the HELP and TYPE header."""
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self._samples())
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with _lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], object]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], object]) -> None:
+        """
+        Compute the value at scrape time instead. Unlabelled gauges return a
+        number; labelled ones return {label value tuple: number}.
+        """
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            result = self._function()
+            items = list(result.items()) if self.labelnames else [((), result)]
+        else:
+            with _lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def _samples(self) -> List[str]:
+        with _lock:
+            items = [(key, dict(state, counts=list(state["counts"]))) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+def render_metrics() -> str:
+    with _lock:
+        metrics = list(_registry)
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+# Image generation
+IMAGE_ATTEMPT_SECONDS = Histogram(
+    "image_generation_attempt_seconds", "Duration of a single provider call",
+    ("provider", "model", "attempt", "outcome")
+)
+IMAGE_GENERATION_SECONDS = Histogram(
+    "image_generation_seconds", "Duration of a scene image including retries",
+    ("provider", "model", "outcome")
+)
+IMAGE_RETRIES = Counter(
+    "image_generation_retries_total", "Provider calls retried after a failed attempt", ("provider", "model")
+)
+IMAGE_FAILURES = Counter(
+    "image_generation_failures_total", "Scenes that failed after all retries", ("provider", "model")
+)
+PROVIDER_ERRORS = Counter(
+    "provider_errors_total", "Failed provider calls by cause (http_<status>, request, empty, unexpected)",
+    ("provider", "reason")
+)
+SCENES_IN_FLIGHT = Gauge("scenes_in_flight", "Scene images currently being generated")
+
+# Prompt generation
+PROMPT_GENERATION_SECONDS = Histogram(
+    "prompt_generation_seconds", "Duration of LLM scene prompt generation", ("model", "outcome")
+)
+PROMPT_ERRORS = Counter(
+    "prompt_generation_errors_total", "LLM prompt generation failures by cause", ("reason",)
+)
+PROMPT_FALLBACKS = Counter(
+    "prompt_fallback_total", "Scene lists built by generate_fallback_scenes"
+)
+
+# Sessions
+ACTIVE_SESSIONS = Gauge("active_sessions", "Generation sessions held in memory, by status", ("status",))
+
+# Admission control
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total", "Generation requests turned away with 429, by limit", ("limit",)
+)
+ADMITTED_SESSIONS = Gauge("admitted_sessions", "Generation and regeneration jobs holding an admission ticket")
+QUEUED_SCENES = Gauge("queued_scenes", "Admitted scenes not yet generated")
+
+# Downloads of approved images
+DOWNLOAD_BYTES = Counter("image_download_bytes_total", "Bytes downloaded from provider CDNs")
+DOWNLOAD_SECONDS = Histogram(
+    "image_download_seconds", "Duration of one image download", ("outcome",), buckets=DOWNLOAD_BUCKETS
+)
+
+# Event loop health
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "Delay of the event loop beyond a scheduled wakeup", buckets=LOOP_LAG_BUCKETS
+)
+EVENT_LOOP_LAG_LAST = Gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample")
+
+# Logging pipeline
+LOG_EVENTS_SUPPRESSED = Counter(
+    "log_events_suppressed_total", "Repeated warnings and errors left out of the log", ("event",)
+)
+LOG_EVENTS_DROPPED = Counter("log_events_dropped_total", "Log events dropped because the log queue was full")
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """Sleep for interval and record how late the loop wakes us; runs until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
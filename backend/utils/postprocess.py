@@ -0,0 +1,133 @@
+import os
+import json
+import tempfile
+import multiprocessing
+from pathlib import Path
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, features
+from ..config import POSTPROCESS_WORKERS
+from ..models.schemas import PostProcessSettings, DownloadResult
+from .downloads import file_sha256
+from .log import get_logger
+
+log = get_logger(__name__)
+
+SETTINGS_FILE = "postprocess.json"
+
+# Output format -> (Pillow format name, file extension)
+OUTPUT_FORMATS = {
+    "jpeg": ("JPEG", ".jpg"),
+    "webp": ("WEBP", ".webp"),
+    "avif": ("AVIF", ".avif")
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def supported_formats() -> List[str]:
+    """Output formats the installed Pillow can encode."""
+    # get_supported_modules() rather than check(): older Pillow warns about names it doesn't know (avif)
+    available = features.get_supported_modules()
+    return [name for name in OUTPUT_FORMATS if name == "jpeg" or name in available]
+
+def validate_settings(settings: PostProcessSettings) -> None:
+    if settings.format not in supported_formats():
+        raise ValueError(f"Unsupported format '{settings.format}', expected one of {supported_formats()}")
+    if not 1 <= settings.quality <= 100:
+        raise ValueError("quality must be between 1 and 100")
+    if settings.max_size is not None and settings.max_size < 16:
+        raise ValueError("max_size must be at least 16 pixels")
+
+def load_settings(project_path: Path) -> PostProcessSettings:
+    """A project's post-processing settings; disabled unless configured."""
+    settings_file = project_path / SETTINGS_FILE
+    if not settings_file.exists():
+        return PostProcessSettings()
+    return PostProcessSettings(**json.loads(settings_file.read_text(encoding="utf-8")))
+
+def save_settings(project_path: Path, settings: PostProcessSettings) -> None:
+    validate_settings(settings)
+    (project_path / SETTINGS_FILE).write_text(json.dumps(settings.dict(), indent=2), encoding="utf-8")
+
+def process_image(source: str, settings: Dict) -> Dict:
+    """Resize and re-encode one image. Runs in a worker process, so takes and returns plain data.
+
+    The result replaces the source atomically; when the format changes the file gets a
+    new extension and the source is removed.
+    """
+    source_path = Path(source)
+    pil_format, extension = OUTPUT_FORMATS[settings["format"]]
+    destination = source_path.with_suffix(extension)
+    input_bytes = source_path.stat().st_size
+
+    with Image.open(source_path) as img:
+        img = img.convert("RGB")
+        if settings.get("max_size"):
+            img.thumbnail((settings["max_size"], settings["max_size"]), Image.LANCZOS)
+
+        save_options = {"quality": settings["quality"]}
+        if pil_format == "JPEG":
+            save_options.update(optimize=True, progressive=settings.get("progressive", True))
+        elif pil_format == "WEBP":
+            save_options.update(method=4)
+
+        fd, tmp_name = tempfile.mkstemp(
+            dir=destination.parent, prefix=f".{destination.name}.", suffix=".part"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, format=pil_format, **save_options)
+            sha256 = file_sha256(Path(tmp_name))
+            os.replace(tmp_name, destination)
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    if destination != source_path:
+        source_path.unlink(missing_ok=True)
+
+    return {
+        "filename": destination.name,
+        "input_bytes": input_bytes,
+        "output_bytes": destination.stat().st_size,
+        "sha256": sha256
+    }
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Created lazily from a worker thread of an already multithreaded server; forking that
+        # can inherit held locks, so workers start from a clean forkserver (or spawn) process
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _pool = ProcessPoolExecutor(max_workers=POSTPROCESS_WORKERS, mp_context=context)
+    return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+def postprocess_results(images_dir: Path, results: List[DownloadResult], settings: PostProcessSettings) -> None:
+    """Post-process every successfully saved image in parallel, updating results in place."""
+    if not settings.enabled:
+        return
+
+    saved = [result for result in results if result.success]
+    futures = [
+        (result, _get_pool().submit(process_image, str(images_dir / result.filename), settings.dict()))
+        for result in saved
+    ]
+
+    for result, future in futures:
+        try:
+            processed = future.result()
+        except Exception as e:
+            # The provider's original image stays in place
+            log.warning("postprocess_failed", scene_number=result.scene_number, error=str(e))
+            continue
+
+        result.filename = processed["filename"]
+        result.sha256 = processed["sha256"]
+        result.stored_bytes = processed["output_bytes"]
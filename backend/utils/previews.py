@@ -0,0 +1,244 @@
+import os
+import time
+import uuid
+import base64
+import shutil
+import hashlib
+import tempfile
+import threading
+import requests
+from PIL import Image
+from pathlib import Path
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from ..config import (
+    PREVIEWS_DIR, PREVIEW_CACHE_DIR, PREVIEW_CACHE_MAX_BYTES, PREVIEW_MAX_BYTES, PREVIEW_PROXY_MAX_KEYS
+)
+from ..models.schemas import DownloadResult
+from .downloads import stream_to_file, file_sha256
+from .log import get_logger
+
+log = get_logger(__name__)
+
+PREVIEWS_URL_PREFIX = "/previews/"
+PROXY_URL_PREFIX = "/preview-proxy/"
+
+FETCH_LOCK_STRIPES = 64
+# Eviction trims the cache to this fraction of its limit, so the next few fetches don't trigger another scan
+EVICT_TO = 0.9
+
+# Proxy key -> provider URL for recently handed out previews, least recently used first
+_proxied_urls: "OrderedDict[str, str]" = OrderedDict()
+# Fetches of the same key share a lock; a fixed set of stripes keeps this bounded
+_fetch_locks: List[threading.Lock] = [threading.Lock() for _ in range(FETCH_LOCK_STRIPES)]
+_registry_lock = threading.Lock()
+_proxy_http = requests.Session()
+# Running size of the preview cache; None until the directory is first scanned
+_cache_bytes: Optional[int] = None
+_cache_lock = threading.Lock()
+
+def store_preview(data: bytes, extension: str = "jpg") -> str:
+    """Write image bytes to the local preview store and return the backend URL serving them."""
+    filename = f"{uuid.uuid4().hex}.{extension}"
+
+    fd, tmp_name = tempfile.mkstemp(dir=PREVIEWS_DIR, prefix=f".{filename}.", suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_name, PREVIEWS_DIR / filename)
+
+    return f"{PREVIEWS_URL_PREFIX}{filename}"
+
+def store_base64_preview(encoded: str, extension: str = "jpg") -> str:
+    """Decode a provider's base64 image payload into the preview store."""
+    return store_preview(base64.b64decode(encoded), extension)
+
+def local_preview_path(url: str) -> Optional[Path]:
+    """Return the on-disk path for a preview store URL, or None for remote URLs."""
+    if not url or not url.startswith(PREVIEWS_URL_PREFIX):
+        return None
+
+    filename = url[len(PREVIEWS_URL_PREFIX):]
+    if not filename or "/" in filename or filename.startswith("."):
+        return None
+
+    return PREVIEWS_DIR / filename
+
+def promote_preview(scene_number: int, url: str, destination: Path) -> DownloadResult:
+    """Move a locally stored preview into a project; no network fetch involved."""
+    start_time = time.time()
+    source = local_preview_path(url)
+
+    try:
+        size = source.stat().st_size
+        os.replace(source, destination)
+        return DownloadResult(
+            scene_number=scene_number,
+            filename=destination.name,
+            success=True,
+            bytes=size,
+            duration=time.time() - start_time,
+            sha256=file_sha256(destination)
+        )
+    except Exception as e:
+        log.warning("preview_save_failed", scene_number=scene_number, error=str(e))
+        return DownloadResult(
+            scene_number=scene_number,
+            filename=destination.name,
+            success=False,
+            duration=time.time() - start_time,
+            error=str(e)
+        )
+
+def copy_preview(scene_number: int, source: Path, destination: Path) -> DownloadResult:
+    """Copy an already cached preview into a project instead of downloading it again."""
+    start_time = time.time()
+    tmp_name = None
+
+    try:
+        fd, tmp_name = tempfile.mkstemp(
+            dir=destination.parent, prefix=f".{destination.name}.", suffix=".part"
+        )
+        with os.fdopen(fd, "wb") as dst, open(source, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_name, destination)
+
+        return DownloadResult(
+            scene_number=scene_number,
+            filename=destination.name,
+            success=True,
+            bytes=destination.stat().st_size,
+            duration=time.time() - start_time,
+            sha256=file_sha256(destination)
+        )
+    except Exception as e:
+        if tmp_name:
+            Path(tmp_name).unlink(missing_ok=True)
+        log.warning("preview_save_failed", scene_number=scene_number, error=str(e))
+        return DownloadResult(
+            scene_number=scene_number,
+            filename=destination.name,
+            success=False,
+            duration=time.time() - start_time,
+            error=str(e)
+        )
+
+def discard_preview(url: str) -> bool:
+    """Delete a locally stored preview; remote URLs are left alone."""
+    path = local_preview_path(url)
+    if path is None or not path.exists():
+        return False
+    path.unlink(missing_ok=True)
+    return True
+
+
+def proxy_key(url: str) -> str:
+    """Stable cache key for a provider URL."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+def proxy_preview_url(url: str) -> Optional[str]:
+    """
+    Register a provider URL with the proxy and return the backend URL that
+    serves it. None for previews already in the local store: they are served
+    directly, and approval moves them, so a second URL would go stale.
+    """
+    if not url or local_preview_path(url):
+        return None
+
+    key = proxy_key(url)
+    with _registry_lock:
+        _proxied_urls[key] = url
+        _proxied_urls.move_to_end(key)
+        while len(_proxied_urls) > PREVIEW_PROXY_MAX_KEYS:
+            _proxied_urls.popitem(last=False)
+    return f"{PROXY_URL_PREFIX}{key}"
+
+def _proxy_cache_path(key: str) -> Path:
+    return PREVIEW_CACHE_DIR / f"{key}.jpg"
+
+def cached_preview_path(url: str) -> Optional[Path]:
+    """Return the cached copy of a provider URL if the proxy has already fetched it."""
+    if not url:
+        return None
+    path = _proxy_cache_path(proxy_key(url))
+    return path if path.exists() else None
+
+def known_proxy_key(key: str) -> bool:
+    """Whether the proxy can serve a key: registered, or still in the cache."""
+    with _registry_lock:
+        if key in _proxied_urls:
+            return True
+    return _proxy_cache_path(key).exists()
+
+def fetch_proxied_preview(key: str) -> Optional[Path]:
+    """Return the cached file for a proxy key, fetching it from the provider on first use."""
+    with _registry_lock:
+        url = _proxied_urls.get(key)
+        if url is not None:
+            _proxied_urls.move_to_end(key)
+    lock = _fetch_locks[hash(key) % FETCH_LOCK_STRIPES]
+
+    path = _proxy_cache_path(key)
+
+    # One upstream fetch per key, even with concurrent viewers
+    with lock:
+        if path.exists():
+            os.utime(path)    # mark as recently used for eviction
+            return path
+        if url is None:
+            return None
+
+        size, _ = stream_to_file(_proxy_http, url, path, max_bytes=PREVIEW_MAX_BYTES, content_type="image/")
+
+    if _cache_grew(size) > PREVIEW_CACHE_MAX_BYTES:
+        evict_preview_cache(PREVIEW_CACHE_MAX_BYTES)
+    return path
+
+def cached_media_type(path: Path) -> str:
+    """Media type of a cached preview, read from the image header rather than assumed."""
+    try:
+        with Image.open(path) as img:
+            return Image.MIME.get(img.format, "application/octet-stream")
+    except Exception:
+        return "application/octet-stream"
+
+def _cache_grew(size: int) -> int:
+    """Add a new cache entry to the running total and return the cache size."""
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is None:
+            # The first scan already counts the new file
+            _cache_bytes = sum(p.stat().st_size for p in PREVIEW_CACHE_DIR.glob("*.jpg"))
+        else:
+            _cache_bytes += size
+        return _cache_bytes
+
+def evict_preview_cache(max_bytes: int = PREVIEW_CACHE_MAX_BYTES) -> int:
+    """Delete least recently used cache entries until the cache is back under max_bytes."""
+    global _cache_bytes
+    with _cache_lock:
+        removed, _cache_bytes = _evict(max_bytes)
+    return removed
+
+def _evict(max_bytes: int) -> Tuple[int, int]:
+    entries = []
+    total = 0
+    for path in PREVIEW_CACHE_DIR.glob("*.jpg"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return 0, total
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes * EVICT_TO:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+
+    return removed, total
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Opt-in per-request profiling.
+
+When PROFILE_TOKEN is set, ProfilingMiddleware is installed and any request
+carrying the token (X-Profile header or ?profile= query parameter) runs under
+a profiler plus tracemalloc. Two profilers are available, chosen with
+X-Profile-Mode or ?profile_mode=:
+
+- cprofile (default): deterministic cProfile of the event-loop thread, which
+  covers async handlers and the blocking work they run inline.
+- sample: samples every thread's stack every PROFILE_SAMPLE_INTERVAL seconds,
+  which also covers threadpool and background-task work.
+
+Each profile is a directory under PROFILES_DIR holding summary.json
+(request, top functions, allocation diff) and report.txt, plus profile.prof
+(pstats) or stacks.txt (collapsed stacks for flamegraph/speedscope). Without
+PROFILE_TOKEN nothing is installed and requests pay no overhead.
+"""
+
+import io
+import sys
+import json
+import time
+import linecache
+import hmac
+import uuid
+import pstats
+import shutil
+import cProfile
+import threading
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from ..config import PROFILE_TOKEN, PROFILES_DIR, PROFILE_KEEP, PROFILE_SAMPLE_INTERVAL
+from .log import get_logger
+
+log = get_logger(__name__)
+
+MODES = ("cprofile", "sample")
+PROFILE_FILES = ("summary.json", "report.txt", "profile.prof", "stacks.txt")
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+# Leaf frames of threads that are just waiting for work
+IDLE_LEAVES = {"wait", "select", "poll", "get", "_wait_for_tstate_lock", "accept", "sleep"}
+
+# One profiled request at a time: cProfile and tracemalloc are process-wide
+_active = threading.Lock()
+
+def profiling_enabled() -> bool:
+    return bool(PROFILE_TOKEN)
+
+def token_matches(token: Optional[str]) -> bool:
+    return profiling_enabled() and token is not None and hmac.compare_digest(token, PROFILE_TOKEN)
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Directory of a stored profile; None for unknown or malformed IDs."""
+    if not profile_id or "/" in profile_id or profile_id.startswith("."):
+        return None
+    path = PROFILES_DIR / profile_id
+    return path if path.is_dir() else None
+
+def list_profiles() -> List[Dict]:
+    profiles = []
+    for path in sorted(PROFILES_DIR.iterdir(), reverse=True):
+        try:
+            summary = json.loads((path / "summary.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        profiles.append({
+            key: summary.get(key)
+            for key in ("profile_id", "created_at", "method", "path", "status", "duration_seconds", "mode")
+        })
+    return profiles
+
+def _prune() -> None:
+    stored = sorted(p for p in PROFILES_DIR.iterdir() if p.is_dir())
+    for path in stored[:max(0, len(stored) - PROFILE_KEEP)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+class _StackSampler(threading.Thread):
+    """Counts collapsed stacks of all other threads at a fixed interval."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident or frame.f_code.co_name in IDLE_LEAVES:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+def _cprofile_summary(profiler: cProfile.Profile, directory: Path) -> Tuple[List[Dict], str]:
+    profiler.dump_stats(str(directory / "profile.prof"))
+    stats = pstats.Stats(profiler)
+    stats.sort_stats("cumulative")
+
+    top = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in sorted(
+        stats.stats.items(), key=lambda item: item[1][3], reverse=True
+    )[:TOP_FUNCTIONS]:
+        top.append({
+            "function": f"{name} ({Path(filename).name}:{line})",
+            "calls": ncalls,
+            "own_seconds": round(tottime, 6),
+            "cumulative_seconds": round(cumtime, 6)
+        })
+
+    report = io.StringIO()
+    stats.stream = report
+    stats.print_stats(TOP_FUNCTIONS)
+    stats.print_callees(TOP_FUNCTIONS // 2)
+    return top, report.getvalue()
+
+def _sample_summary(sampler: _StackSampler, directory: Path) -> Tuple[List[Dict], str]:
+    (directory / "stacks.txt").write_text(
+        "".join(f"{stack} {count}\n" for stack, count in sampler.stacks.most_common()), encoding="utf-8"
+    )
+    leaves: Counter = Counter()
+    for stack, count in sampler.stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    total = sum(sampler.stacks.values()) or 1
+
+    top = [
+        {"function": leaf, "samples": count, "share": round(count / total, 4)}
+        for leaf, count in leaves.most_common(TOP_FUNCTIONS)
+    ]
+    report = [f"{sampler.samples} sampling rounds every {sampler.interval * 1000:.1f} ms\n", "Hottest stacks:"]
+    report += [f"{count:>6}  {stack}" for stack, count in sampler.stacks.most_common(TOP_FUNCTIONS)]
+    return top, "\n".join(report) + "\n"
+
+def _allocation_summary(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> List[Dict]:
+    # Leave out the profiler's own bookkeeping
+    noise = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, linecache.__file__)]
+    before, after = before.filter_traces(noise), after.filter_traces(noise)
+    return [
+        {
+            "location": str(stat.traceback[0]),
+            "size_diff_bytes": stat.size_diff,
+            "count_diff": stat.count_diff,
+            "size_bytes": stat.size
+        }
+        for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+    ]
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware; unflagged requests only pay a header lookup."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/profiles"):
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        query_string = scope.get("query_string", b"")
+        query = parse_qs(query_string.decode("latin-1")) if b"profile" in query_string else {}
+        token = headers.get(b"x-profile", b"").decode("latin-1") or (query.get("profile") or [None])[0]
+        if not token_matches(token) or not _active.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        try:
+            mode = headers.get(b"x-profile-mode", b"").decode("latin-1") or (query.get("profile_mode") or ["cprofile"])[0]
+            await self._profile(scope, receive, send, mode if mode in MODES else "cprofile")
+        finally:
+            _active.release()
+
+    async def _profile(self, scope, receive, send, mode: str):
+        profile_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        status = {"code": None}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode("latin-1"))
+                ])
+            await send(message)
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        profiler, sampler = None, None
+        if mode == "sample":
+            sampler = _StackSampler(PROFILE_SAMPLE_INTERVAL)
+            sampler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+            if sampler:
+                sampler.stop()
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            try:
+                self._write(profile_id, scope, mode, status["code"], duration, profiler, sampler, before, after, peak)
+            except Exception as e:
+                log.error("profile_write_failed", profile_id=profile_id, error=str(e))
+
+    def _write(self, profile_id, scope, mode, status, duration, profiler, sampler, before, after, peak) -> None:
+        directory = PROFILES_DIR / profile_id
+        directory.mkdir(parents=True)
+
+        if profiler:
+            top, report = _cprofile_summary(profiler, directory)
+        else:
+            top, report = _sample_summary(sampler, directory)
+        allocations = _allocation_summary(before, after)
+
+        summary = {
+            "profile_id": profile_id,
+            "created_at": datetime.now().isoformat(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "duration_seconds": round(duration, 6),
+            "mode": mode,
+            "peak_traced_bytes": peak,
+            "top_functions": top,
+            "allocations": allocations,
+            "files": sorted(p.name for p in directory.iterdir()) + ["summary.json", "report.txt"]
+        }
+        (directory / "report.txt").write_text(report, encoding="utf-8")
+        (directory / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        _prune()
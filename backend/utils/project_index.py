@@ -0,0 +1,207 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from ..config import PROJECTS_DIR, PROJECT_INDEX_PATH
+from .downloads import file_sha256
+from .thumbnails import list_image_files
+from .log import get_logger
+
+log = get_logger(__name__)
+
+# Whitelisted ORDER BY clauses for server-side sorting
+SORT_ORDERS = {
+    "newest": "created_at DESC",
+    "oldest": "created_at ASC",
+    "words": "word_count DESC, created_at DESC",
+    "images": "image_count DESC, created_at DESC"
+}
+
+# Bump when the projects table changes incompatibly; older indexes are dropped
+# and rebuilt from disk at startup (rebuild_index runs when the index is empty)
+SCHEMA_VERSION = 2    # 2: images holds filename -> sha256 instead of a list of filenames
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    word_count INTEGER NOT NULL DEFAULT 0,
+    recommended_scenes INTEGER NOT NULL DEFAULT 0,
+    estimated_duration_minutes REAL NOT NULL DEFAULT 0,
+    complexity_score TEXT NOT NULL DEFAULT '',
+    images TEXT NOT NULL DEFAULT '{}',
+    image_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_projects_created_at ON projects (created_at);
+CREATE INDEX IF NOT EXISTS idx_projects_word_count ON projects (word_count);
+"""
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    with _schema_lock:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            if version:
+                log.info("project_index_schema_changed", old_version=version, new_version=SCHEMA_VERSION)
+            # Indexes created before versioning (user_version 0) may hold the old layout too
+            conn.execute("DROP TABLE IF EXISTS projects")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+
+def _connection() -> sqlite3.Connection:
+    """One connection per thread; WAL lets readers proceed while a writer commits."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(PROJECT_INDEX_PATH, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        _local.conn = conn
+    return conn
+
+def _row_to_project(row: sqlite3.Row) -> Dict:
+    image_hashes = json.loads(row["images"])
+    return {
+        "project_id": row["project_id"],
+        "title": row["title"],
+        "created_at": row["created_at"],
+        "analysis": {
+            "word_count": row["word_count"],
+            "recommended_scenes": row["recommended_scenes"],
+            "estimated_duration_minutes": row["estimated_duration_minutes"],
+            "complexity_score": row["complexity_score"]
+        },
+        "images": list(image_hashes),
+        "image_hashes": image_hashes,
+        "total_images": row["image_count"]
+    }
+
+def index_project(
+    project_id: str, 
+    analysis: Dict, 
+    title: str = "", 
+    created_at: Optional[str] = None
+) -> None:
+    """Insert or update a project's listing data; known images are preserved."""
+    now = datetime.now().isoformat()
+    conn = _connection()
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO projects (
+                project_id, title, created_at, word_count, recommended_scenes,
+                estimated_duration_minutes, complexity_score, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (project_id) DO UPDATE SET
+                title = excluded.title,
+                word_count = excluded.word_count,
+                recommended_scenes = excluded.recommended_scenes,
+                estimated_duration_minutes = excluded.estimated_duration_minutes,
+                complexity_score = excluded.complexity_score,
+                updated_at = excluded.updated_at
+            """,
+            (
+                project_id,
+                title,
+                created_at or now,
+                analysis.get("word_count", 0),
+                analysis.get("recommended_scenes", 0),
+                analysis.get("estimated_duration_minutes", 0),
+                analysis.get("complexity_score", ""),
+                now
+            )
+        )
+
+def set_project_images(project_id: str, images: Dict[str, str]) -> None:
+    """Record the images currently saved for a project as filename -> sha256, in display order."""
+    conn = _connection()
+    with conn:
+        conn.execute(
+            "UPDATE projects SET images = ?, image_count = ?, updated_at = ? WHERE project_id = ?",
+            (json.dumps(images), len(images), datetime.now().isoformat(), project_id)
+        )
+
+def remove_project(project_id: str) -> bool:
+    """Drop a project from the index and return True if it was indexed."""
+    conn = _connection()
+    with conn:
+        cursor = conn.execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
+    return cursor.rowcount > 0
+
+def get_indexed_project(project_id: str) -> Optional[Dict]:
+    """Look up a single project's listing data."""
+    row = _connection().execute(
+        "SELECT * FROM projects WHERE project_id = ?", (project_id,)
+    ).fetchone()
+    return _row_to_project(row) if row else None
+
+def get_indexed_projects(project_ids: List[str]) -> List[Dict]:
+    """Look up several projects at once, keeping the requested order."""
+    if not project_ids:
+        return []
+    placeholders = ",".join("?" * len(project_ids))
+    rows = _connection().execute(
+        f"SELECT * FROM projects WHERE project_id IN ({placeholders})", project_ids
+    ).fetchall()
+    by_id = {row["project_id"]: _row_to_project(row) for row in rows}
+    return [by_id[pid] for pid in project_ids if pid in by_id]
+
+def query_projects(
+    offset: int = 0, 
+    limit: int = 50, 
+    sort: str = "newest", 
+    search: Optional[str] = None
+) -> Tuple[List[Dict], int]:
+    """Return one page of projects plus the total number matching the search."""
+    if sort not in SORT_ORDERS:
+        raise ValueError(f"Unknown sort '{sort}', expected one of {list(SORT_ORDERS)}")
+
+    where = ""
+    params: List = []
+    if search:
+        # Match the search text literally, not as a LIKE pattern
+        where = "WHERE project_id LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\'"
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        params = [pattern, pattern]
+
+    conn = _connection()
+    total = conn.execute(f"SELECT COUNT(*) FROM projects {where}", params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT * FROM projects {where} ORDER BY {SORT_ORDERS[sort]} LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    ).fetchall()
+
+    return [_row_to_project(row) for row in rows], total
+
+def count_projects() -> int:
+    """Total number of indexed projects."""
+    return _connection().execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+def rebuild_index() -> int:
+    """Re-index every project folder on disk; used once when the index is new."""
+    indexed = 0
+    for folder in PROJECTS_DIR.iterdir():
+        analysis_file = folder / "analysis.json"
+        if not folder.is_dir() or not analysis_file.exists():
+            continue
+        try:
+            analysis = json.loads(analysis_file.read_text(encoding="utf-8"))
+            created_at = datetime.fromtimestamp(folder.stat().st_ctime).isoformat()
+            index_project(folder.name, analysis, created_at=created_at)
+
+            images_dir = folder / "images"
+            if images_dir.exists():
+                set_project_images(folder.name, {
+                    p.name: file_sha256(p) for p in list_image_files(images_dir)
+                })
+            indexed += 1
+        except Exception as e:
+            log.warning("index_project_failed", project_id=folder.name, error=str(e))
+    return indexed
@@ -1,8 +1,14 @@
 import json
+import time
 import requests
 from typing import List
 from ..config import CONFIG, TIMEOUT
 from ..models.schemas import ScenePrompt
+from .metrics import PROMPT_GENERATION_SECONDS, PROMPT_ERRORS, PROMPT_FALLBACKS, bounded_label
+from .tracing import span
+from .log import get_logger
+
+log = get_logger(__name__)
 
 STYLE_MAP = {
     "cinematic": "cinematic style with dramatic lighting and professional composition, movie-like quality",
@@ -64,38 +70,47 @@ def generate_scene_prompts_Openai(
         "Content-Type": "application/json"
     }
     
+    model_label = bounded_label(model, CONFIG["Openai"]["models"])
+    start_time = time.time()
     try:
-        response = requests.post(
-            CONFIG["Openai"]["api_url"], 
-            headers=headers, 
-            json=payload, 
-            timeout=TIMEOUT
-        )
-        response.raise_for_status()
+        with span("llm_request", model=model, num_scenes=num_scenes):
+            response = requests.post(
+                CONFIG["Openai"]["api_url"], 
+                headers=headers, 
+                json=payload, 
+                timeout=TIMEOUT
+            )
+            response.raise_for_status()
         
-        content = response.json()["choices"][0]["message"]["content"]
+        with span("parse_prompts"):
+            content = response.json()["choices"][0]["message"]["content"]
 
-        # Clean up JSON content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].strip()
+            # Clean up JSON content
+            if "```json" in content:
+                content = content.split("```json")[1].split("```")[0].strip()
+            elif "```" in content:
+                content = content.split("```")[1].strip()
 
-        data = json.loads(content)
-        return [ScenePrompt(**scene) for scene in data["scenes"]]
+            data = json.loads(content)
+            scenes = [ScenePrompt(**scene) for scene in data["scenes"]]
+        PROMPT_GENERATION_SECONDS.observe(time.time() - start_time, model=model_label, outcome="success")
+        return scenes
         
     except requests.exceptions.RequestException as e:
-        print(f"Openai API error: {e}")
-        return generate_fallback_scenes(script, num_scenes, media_type)
+        reason, error = "request", e
     except (json.JSONDecodeError, KeyError) as e:
-        print(f"Openai response parsing error: {e}")
-        return generate_fallback_scenes(script, num_scenes, media_type)
+        reason, error = "parse", e
     except Exception as e:
-        print(f"Openai unexpected error: {e}")
-        return generate_fallback_scenes(script, num_scenes, media_type)
+        reason, error = "unexpected", e
+
+    log.warning("prompt_generation_failed", provider="openai", model=model, reason=reason, error=str(error))
+    PROMPT_ERRORS.inc(reason=reason)
+    PROMPT_GENERATION_SECONDS.observe(time.time() - start_time, model=model_label, outcome="failure")
+    return generate_fallback_scenes(script, num_scenes, media_type)
 
 def generate_fallback_scenes(script: str, num_scenes: int, media_type: str) -> List[ScenePrompt]:
     """Generate fallback scenes when AI generation fails."""
+    PROMPT_FALLBACKS.inc()
     words = script.split()
     words_per_scene = max(1, len(words) // max(num_scenes, 1))
 
@@ -1,4 +1,5 @@
 import json
+import uuid
 from datetime import datetime
 from pathlib import Path
 import re
@@ -6,6 +7,7 @@ from typing import List
 import requests
 from ..models.schemas import ScriptAnalysis
 from ..config import PROJECTS_DIR
+from .project_index import index_project
 
 def analyze_script(script: str) -> ScriptAnalysis:
     """Analyze script and provide enhanced AI-like recommendations with improved accuracy."""
@@ -71,8 +73,12 @@ def analyze_script(script: str) -> ScriptAnalysis:
         complexity_score=complexity
     )
 
-def create_project(project_id: str, script: str, analysis: ScriptAnalysis) -> Path:
-    """Create a new project directory with script and analysis."""
+def new_project_id() -> str:
+    # The random suffix keeps IDs unique when several scripts arrive in the same second
+    return f"story_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+def create_project(project_id: str, script: str, analysis: ScriptAnalysis, title: str = "") -> Path:
+    """Create a new project directory with script and analysis, and add it to the index."""
     project_path = PROJECTS_DIR / project_id
     
     # Create directory structure
@@ -85,5 +91,6 @@ def create_project(project_id: str, script: str, analysis: ScriptAnalysis) -> Pa
         json.dumps(analysis.dict(), indent=2), 
         encoding="utf-8"
     )
+    index_project(project_id, analysis.dict(), title=title)
     
     return project_path
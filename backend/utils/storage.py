@@ -1,74 +1,258 @@
 import json
-import requests
+import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
-from ..config import PROJECTS_DIR, TIMEOUT
-from ..models.schemas import ScenePrompt, GenerationSession
+from typing import List, Dict, Optional
+from ..config import PROJECTS_DIR
+from ..models.schemas import ScenePrompt, GenerationSession, DownloadResult, ProjectSummaryRequest
+from .downloads import download_images, file_sha256
+from .http_cache import versioned_url
+from .blob_store import adopt_file, link_existing, release_blobs
+from .project_index import (
+    query_projects, get_indexed_project, get_indexed_projects, set_project_images, remove_project
+)
+from .thumbnails import create_derivatives, thumbnail_url, list_image_files, project_image_path, IMAGE_EXTENSIONS
+from .postprocess import postprocess_results, load_settings as load_postprocess_settings
+from .previews import local_preview_path, promote_preview, cached_preview_path, copy_preview, discard_preview
+from .tracing import span
+from .log import get_logger, log_context
+
+log = get_logger(__name__)
 
 def save_scene_prompts(project_path: Path, scenes: List[ScenePrompt]) -> None:
-    """Save scene prompts to a text file for reference."""
-    prompts_file = project_path / "scene_prompts.txt"
-    content = "Scene Prompts for Image Generation\n" + "=" * 50 + "\n\n"
+    """Save scene prompts as reloadable JSON plus a human-readable text file."""
+    divider = "-" * 50
+    lines = ["Scene Prompts for Image Generation", "=" * 50, ""]
     
     for scene in scenes:
-        content += f"Scene {scene.scene_number}: {scene.scene_title}\n"
-        content += f"Script: {scene.script_excerpt}\n"
-        content += f"Prompt: {scene.image_prompt}\n"
-        content += "-" * 50 + "\n\n"
+        lines.extend([
+            f"Scene {scene.scene_number}: {scene.scene_title}",
+            f"Script: {scene.script_excerpt}",
+            f"Prompt: {scene.image_prompt}",
+            divider,
+            ""
+        ])
+    
+    (project_path / "scene_prompts.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    (project_path / "scene_prompts.json").write_text(
+        json.dumps({
+            "saved_at": datetime.now().isoformat(),
+            "scenes": [scene.dict() for scene in scenes]
+        }, indent=2),
+        encoding="utf-8"
+    )
+
+def load_scene_prompts(project_path: Path, scene_numbers: Optional[List[int]] = None) -> List[ScenePrompt]:
+    """Load previously saved scene prompts, optionally only the given scene numbers."""
+    prompts_file = project_path / "scene_prompts.json"
+    if not prompts_file.exists():
+        raise FileNotFoundError("No saved scene prompts for this project")
+    
+    data = json.loads(prompts_file.read_text(encoding="utf-8"))
+    scenes = [ScenePrompt(**scene) for scene in data["scenes"]]
     
-    prompts_file.write_text(content, encoding="utf-8")
+    if scene_numbers:
+        wanted = set(scene_numbers)
+        scenes = [scene for scene in scenes if scene.scene_number in wanted]
+    
+    return scenes
+
+def project_image_url(project_id: str, filename: str) -> str:
+    return f"/projects/{project_id}/images/{filename}"
+
+def saved_image_path(url: str) -> Optional[Path]:
+    """Return the file behind a project image URL, or None for anything else."""
+    parts = url.split("?", 1)[0].split("/")
+    if len(parts) != 5 or parts[0] or parts[1] != "projects" or parts[3] != "images":
+        return None
+    try:
+        return project_image_path(parts[2], parts[4])
+    except FileNotFoundError:
+        return None
+
+def save_approved_images(session: GenerationSession) -> List[DownloadResult]:
+    """Download approved images into the project directory and report per-image results."""
+    with log_context(project_id=session.project_id):
+        return _save_approved_images(session)
 
-def save_approved_images(session: GenerationSession) -> int:
-    """Save approved images to the project directory."""
+def _save_approved_images(session: GenerationSession) -> List[DownloadResult]:
     project_path = PROJECTS_DIR / session.project_id
     images_dir = project_path / "images"
     images_dir.mkdir(exist_ok=True)
     
-    saved_count = 0
+    results = []
+    jobs = []
+    promoted = {}
+    already_saved = []
+    previous = (get_indexed_project(session.project_id) or {}).get("image_hashes", {})
+    
+    for preview in session.previews:
+        if not (preview.approved and preview.preview_url):
+            continue
+        
+        destination = images_dir / f"scene_{preview.scene_number:03d}.jpg"
+        saved = saved_image_path(preview.preview_url)
+        if saved is not None and saved.parent == images_dir:
+            # Promoted by an earlier approval: the file is in place and already processed
+            already_saved.append(DownloadResult(
+                scene_number=preview.scene_number,
+                filename=saved.name,
+                success=True,
+                bytes=saved.stat().st_size,
+                sha256=previous.get(saved.name) or file_sha256(saved)
+            ))
+        elif saved is not None:
+            # Another project's saved image: copy it in like a cached preview
+            with span("copy_saved_image", scene_number=preview.scene_number):
+                results.append(copy_preview(preview.scene_number, saved, destination))
+        elif local_preview_path(preview.preview_url):
+            # Inline (base64) previews are already on disk: approval is a rename
+            with span("promote_preview", scene_number=preview.scene_number):
+                result = promote_preview(preview.scene_number, preview.preview_url, destination)
+            if result.success:
+                promoted[preview.scene_number] = preview
+                preview.local_url = None
+            results.append(result)
+        elif cached_preview_path(preview.preview_url):
+            # The preview proxy already fetched this image once; if another project
+            # saved the same bytes, link to them instead of writing a new copy
+            with span("copy_cached_preview", scene_number=preview.scene_number) as trace:
+                cached = cached_preview_path(preview.preview_url)
+                sha256 = file_sha256(cached)
+                trace["linked"] = link_existing(sha256, destination)
+                if trace["linked"]:
+                    results.append(DownloadResult(
+                        scene_number=preview.scene_number,
+                        filename=destination.name,
+                        success=True,
+                        bytes=destination.stat().st_size,
+                        sha256=sha256
+                    ))
+                else:
+                    results.append(copy_preview(preview.scene_number, cached, destination))
+        else:
+            jobs.append((preview.scene_number, preview.preview_url, destination))
+    
+    if jobs:
+        with span("download_images", images=len(jobs)):
+            results.extend(download_images(jobs))
+    
+    # Resize/re-encode per the project's settings before anything is stored by hash
+    raw_hashes = {r.sha256 for r in results if r.success and r.sha256}
+    with span("postprocess", images=sum(1 for r in results if r.success)):
+        postprocess_results(images_dir, results, load_postprocess_settings(project_path))
+    for result in results:
+        if result.success:
+            # A scene saved earlier in another format must not linger next to the new file
+            for sibling in images_dir.glob(f"{Path(result.filename).stem}.*"):
+                if sibling.name != result.filename and sibling.suffix.lower() in IMAGE_EXTENSIONS:
+                    sibling.unlink(missing_ok=True)
+            # The preview store no longer has promoted files; serve the (possibly re-encoded) project copy
+            if result.scene_number in promoted:
+                promoted[result.scene_number].preview_url = project_image_url(session.project_id, result.filename)
     
+    if any(result.success for result in results):
+        with span("store_blobs"):
+            # Store each saved image once by content; duplicates become hardlinks
+            for result in results:
+                if result.success and result.sha256:
+                    adopt_file(images_dir / result.filename, result.sha256)
+            
+            # Hashes come from the downloads themselves; only unknown files are re-read
+            known = dict(previous)
+            known.update({r.filename: r.sha256 for r in results if r.success and r.sha256})
+            hashes = {
+                p.name: known.get(p.name) or file_sha256(p) 
+                for p in list_image_files(images_dir)
+            }
+            set_project_images(session.project_id, hashes)
+            
+            # Re-approved or re-encoded scenes may have dropped the last reference to a blob
+            current = set(hashes.values())
+            release_blobs(
+                [sha for name, sha in previous.items() if sha and hashes.get(name) != sha] 
+                + [sha for sha in raw_hashes if sha not in current]
+            )
+    
+    # Pre-render thumbnails so project listings never touch full-size images
+    with span("thumbnails"):
+        for result in results:
+            if result.success:
+                try:
+                    create_derivatives(project_path, result.filename)
+                except Exception as e:
+                    log.warning("thumbnails_failed", scene_number=result.scene_number, error=str(e))
+    
+    # Rejected inline previews would otherwise sit in the preview store forever
     for preview in session.previews:
-        if preview.approved and preview.preview_url:
-            try:
-                response = requests.get(preview.preview_url, timeout=TIMEOUT)
-                response.raise_for_status()
-                
-                filename = f"scene_{preview.scene_number:03d}.jpg"
-                image_path = images_dir / filename
-                image_path.write_bytes(response.content)
-                saved_count += 1
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Failed to download scene {preview.scene_number}: {e}")
-            except Exception as e:
-                print(f"Failed to save scene {preview.scene_number}: {e}")
-    
-    return saved_count
+        if not preview.approved and discard_preview(preview.preview_url):
+            preview.preview_url = ""
+            preview.local_url = None
+    
+    return sorted(results + already_saved, key=lambda r: r.scene_number)
 
-def list_projects() -> Dict:
-    """List all projects in the projects directory."""
-    projects = []
+def list_projects(
+    offset: int = 0, 
+    limit: int = 50, 
+    sort: str = "newest", 
+    search: Optional[str] = None
+) -> Dict:
+    """List one page of projects from the project index."""
+    projects, total = query_projects(offset=offset, limit=limit, sort=sort, search=search)
     
-    try:
-        for folder in PROJECTS_DIR.iterdir():
-            if folder.is_dir():
-                analysis_file = folder / "analysis.json"
-                if analysis_file.exists():
-                    try:
-                        analysis = json.loads(analysis_file.read_text(encoding="utf-8"))
-                        projects.append({
-                            "project_id": folder.name,
-                            "created_at": datetime.fromtimestamp(
-                                folder.stat().st_ctime
-                            ).isoformat(),
-                            "analysis": analysis
-                        })
-                    except Exception as e:
-                        print(f"Error loading project {folder.name}: {e}")
-    except Exception as e:
-        print(f"Error listing projects: {e}")
+    for project in projects:
+        project.pop("images", None)
+        project.pop("image_hashes", None)
+    
+    return {
+        "projects": projects,
+        "total": total,
+        "offset": offset,
+        "limit": limit
+    }
+
+def get_project_summaries(request: ProjectSummaryRequest) -> Dict:
+    """Summarize many projects from the index alone: counts, thumbnails and analysis, no script bodies."""
+    if request.project_ids:
+        projects = get_indexed_projects(request.project_ids)
+        total = len(projects)
+        next_offset = None
+    else:
+        projects, total = query_projects(
+            offset=request.offset, 
+            limit=request.limit, 
+            sort=request.sort, 
+            search=request.search
+        )
+        end = request.offset + len(projects)
+        next_offset = end if end < total else None
+    
+    for project in projects:
+        images = project.pop("images")
+        hashes = project.pop("image_hashes")
+        project["thumbnails"] = [
+            thumbnail_url(project["project_id"], name, sha256=hashes.get(name)) 
+            for name in images[:request.thumbnails_per_project]
+        ]
+    
+    return {
+        "projects": projects,
+        "total": total,
+        "next_offset": next_offset
+    }
+
+def delete_project(project_id: str) -> int:
+    """Delete a project and return how many image blobs were freed with it."""
+    project_path = PROJECTS_DIR / project_id
+    if "/" in project_id or project_id.startswith(".") or not project_path.is_dir():
+        raise FileNotFoundError("Project not found")
+    
+    hashes = (get_indexed_project(project_id) or {}).get("image_hashes", {})
+    shutil.rmtree(project_path)
+    remove_project(project_id)
     
-    return {"projects": projects}
+    # Blobs shared with other projects survive; only unreferenced ones are deleted
+    return release_blobs(sha for sha in hashes.values() if sha)
 
 def get_project_details(project_id: str) -> Dict:
     """Get detailed information about a specific project."""
@@ -83,18 +267,21 @@ def get_project_details(project_id: str) -> Dict:
             (project_path / "analysis.json").read_text(encoding="utf-8")
         )
 
-        # List generated images
+        # List generated images with content-hash versioned URLs
         images_dir = project_path / "images"
-        images = []
-        if images_dir.exists():
-            for img_file in sorted(images_dir.glob("*.jpg")):
-                images.append(f"/projects/{project_id}/images/{img_file.name}")
+        hashes = (get_indexed_project(project_id) or {}).get("image_hashes", {})
+        image_names = [img_file.name for img_file in list_image_files(images_dir)]
+        images = [
+            versioned_url(f"/projects/{project_id}/images/{name}", hashes.get(name)) 
+            for name in image_names
+        ]
 
         return {
             "project_id": project_id,
             "script": script,
             "analysis": analysis,
             "images": images,
+            "thumbnails": [thumbnail_url(project_id, name, sha256=hashes.get(name)) for name in image_names],
             "total_images": len(images)
         }
         
@@ -0,0 +1,86 @@
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+from PIL import Image
+from ..config import PROJECTS_DIR
+from .http_cache import versioned_url
+
+# Derivative name -> longest edge in pixels
+THUMBNAIL_SIZES: Dict[str, int] = {
+    "thumb": 256,
+    "medium": 640
+}
+WEBP_QUALITY = 80
+
+# Saved project images may be re-encoded by post-processing, so not always .jpg
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".avif")
+
+_IMAGE_NAME = re.compile(r"^[\w\-]+\.(jpg|jpeg|png|webp|avif)$", re.IGNORECASE)
+
+def list_image_files(images_dir: Path) -> List[Path]:
+    """Saved images in a project's images folder, sorted by name."""
+    if not images_dir.exists():
+        return []
+    return sorted(
+        p for p in images_dir.iterdir() 
+        if p.suffix.lower() in IMAGE_EXTENSIONS and not p.name.startswith(".")
+    )
+
+def derivative_path(project_path: Path, image_name: str, size: str) -> Path:
+    """Where the WebP derivative of a project image is stored."""
+    return project_path / "derivatives" / size / f"{Path(image_name).stem}.webp"
+
+def thumbnail_url(project_id: str, image_name: str, size: str = "thumb", sha256: Optional[str] = None) -> str:
+    """Backend URL serving a derivative of a project image, versioned by the source hash when known."""
+    return versioned_url(f"/projects/{project_id}/thumbnails/{size}/{image_name}", sha256)
+
+def project_image_path(project_id: str, image_name: str) -> Path:
+    """Resolve a saved project image, rejecting anything outside the project's images folder."""
+    if "/" in project_id or project_id.startswith(".") or not _IMAGE_NAME.match(image_name):
+        raise FileNotFoundError("Image not found")
+
+    path = PROJECTS_DIR / project_id / "images" / image_name
+    if not path.exists():
+        raise FileNotFoundError("Image not found")
+    return path
+
+def create_derivatives(project_path: Path, image_name: str, sizes: Optional[List[str]] = None) -> List[Path]:
+    """Render WebP derivatives of one project image, largest first from a single decode."""
+    sizes = sizes or list(THUMBNAIL_SIZES)
+    source = project_path / "images" / image_name
+    created = []
+
+    with Image.open(source) as img:
+        img = img.convert("RGB")
+        for size in sorted(sizes, key=lambda s: THUMBNAIL_SIZES[s], reverse=True):
+            edge = THUMBNAIL_SIZES[size]
+            img.thumbnail((edge, edge), Image.LANCZOS)
+
+            destination = derivative_path(project_path, image_name, size)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+
+            fd, tmp_name = tempfile.mkstemp(
+                dir=destination.parent, prefix=f".{destination.name}.", suffix=".part"
+            )
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, format="WEBP", quality=WEBP_QUALITY, method=4)
+            os.replace(tmp_name, destination)
+            created.append(destination)
+
+    return created
+
+def get_derivative(project_id: str, image_name: str, size: str) -> Path:
+    """Return a derivative, rendering it on first request or when the source is newer."""
+    if size not in THUMBNAIL_SIZES:
+        raise ValueError(f"Unknown size '{size}', expected one of {list(THUMBNAIL_SIZES)}")
+
+    source = project_image_path(project_id, image_name)
+    project_path = source.parent.parent
+
+    destination = derivative_path(project_path, image_name, size)
+    if not destination.exists() or destination.stat().st_mtime < source.stat().st_mtime:
+        create_derivatives(project_path, image_name, [size])
+
+    return destination
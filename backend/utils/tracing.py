@@ -0,0 +1,142 @@
+"""
+Lightweight per-session span recorder.
+
+Spans are recorded against the trace bound to the current context (one trace
+per generation session). Code that is not running under a trace pays almost
+nothing: span() checks a ContextVar and returns.
+
+Worker threads do not inherit context variables, so work submitted to an
+executor must go through traced_call() (or bind_trace()) to keep its spans.
+"""
+
+import time
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from ..config import TRACE_MAX_SESSIONS, TRACE_MAX_SPANS
+
+_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+_parent_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("parent_span", default=None)
+
+# trace_id -> spans, oldest trace first
+_traces: "OrderedDict[str, List[Dict]]" = OrderedDict()
+_lock = threading.Lock()
+
+@contextmanager
+def bind_trace(trace_id: str) -> Iterator[None]:
+    """Record spans opened inside this block against trace_id."""
+    token = _trace_id.set(trace_id)
+    try:
+        yield
+    finally:
+        _trace_id.reset(token)
+
+def current_trace() -> Optional[str]:
+    return _trace_id.get()
+
+def traced_call(function: Callable, *args, **kwargs) -> Callable[[], object]:
+    """Wrap a call so it runs in a copy of the caller's context (for executor.submit)."""
+    context = contextvars.copy_context()
+    return lambda: context.run(function, *args, **kwargs)
+
+def _record(trace_id: str, span: Dict) -> None:
+    with _lock:
+        spans = _traces.get(trace_id)
+        if spans is None:
+            spans = _traces[trace_id] = []
+            while len(_traces) > TRACE_MAX_SESSIONS:
+                _traces.popitem(last=False)
+        if len(spans) < TRACE_MAX_SPANS:
+            spans.append(span)
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Dict]:
+    """
+    Time a pipeline stage. Yields the span's attribute dict so callers can add
+    results (e.g. bytes, outcome) before it closes.
+    """
+    trace_id = _trace_id.get()
+    if trace_id is None:
+        yield attrs
+        return
+
+    span_id = uuid.uuid4().hex[:12]
+    parent_id = _parent_span.get()
+    token = _parent_span.set(span_id)
+    wall_start = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _parent_span.reset(token)
+        _record(trace_id, {
+            "name": name,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "start": wall_start,
+            "duration": time.perf_counter() - start,
+            "thread": threading.current_thread().name,
+            "attrs": attrs,
+            "error": error
+        })
+
+def get_trace(trace_id: str) -> Optional[List[Dict]]:
+    with _lock:
+        spans = _traces.get(trace_id)
+        return sorted(spans, key=lambda s: s["start"]) if spans is not None else None
+
+def discard_trace(trace_id: str) -> None:
+    with _lock:
+        _traces.pop(trace_id, None)
+
+def summarize_trace(spans: List[Dict]) -> Dict:
+    """Wall-clock extent of the trace plus total time and count per stage name."""
+    if not spans:
+        return {"wall_seconds": 0.0, "stages": {}}
+
+    stages: Dict[str, Dict] = {}
+    for s in spans:
+        stage = stages.setdefault(s["name"], {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "errors": 0})
+        stage["count"] += 1
+        stage["total_seconds"] += s["duration"]
+        stage["max_seconds"] = max(stage["max_seconds"], s["duration"])
+        stage["errors"] += 1 if s["error"] else 0
+
+    start = min(s["start"] for s in spans)
+    end = max(s["start"] + s["duration"] for s in spans)
+    return {"wall_seconds": round(end - start, 6), "stages": stages}
+
+def to_chrome_trace(trace_id: str, spans: List[Dict]) -> Dict:
+    """Chrome trace-event format (chrome://tracing, Perfetto): one complete event per span."""
+    threads = {}
+    events = []
+    for s in spans:
+        tid = threads.setdefault(s["thread"], len(threads) + 1)
+        args = dict(s["attrs"])
+        if s["error"]:
+            args["error"] = s["error"]
+        events.append({
+            "name": s["name"],
+            "cat": "pipeline",
+            "ph": "X",
+            "ts": round(s["start"] * 1_000_000),
+            "dur": round(s["duration"] * 1_000_000),
+            "pid": 1,
+            "tid": tid,
+            "args": args
+        })
+
+    # Label the rows with thread names and the process with the session
+    metadata = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": trace_id}}]
+    metadata += [
+        {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+        for name, tid in threads.items()
+    ]
+    return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import math
+import shutil
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+from ..config import PROJECTS_DIR, FFMPEG_BINARY, VIDEO_FPS, VIDEO_WIDTH, VIDEO_HEIGHT
+from .thumbnails import list_image_files
+
+MAX_ZOOM = 1.15           # Ken Burns zoom range 1.0 .. MAX_ZOOM
+MIN_SCENE_SECONDS = 2.0
+
+_SCENE_NUMBER = re.compile(r"scene_(\d+)")
+
+# project_id -> render progress, like the in-memory session registry
+_renders: Dict[str, Dict] = {}
+_renders_lock = threading.Lock()
+
+def encoder_available() -> bool:
+    return shutil.which(FFMPEG_BINARY) is not None
+
+def video_path(project_id: str) -> Path:
+    return PROJECTS_DIR / project_id / "video" / "slideshow.mp4"
+
+def get_render_status(project_id: str) -> Optional[Dict]:
+    with _renders_lock:
+        status = _renders.get(project_id)
+        return dict(status) if status else None
+
+def count_active_renders() -> int:
+    with _renders_lock:
+        return sum(1 for status in _renders.values() if status.get("status") == "rendering")
+
+def claim_render(project_id: str) -> bool:
+    """Mark a project as rendering; False if a render is already running."""
+    with _renders_lock:
+        if _renders.get(project_id, {}).get("status") == "rendering":
+            return False
+        _renders[project_id] = {"status": "rendering", "frames_done": 0, "total_frames": None, "error": None}
+        return True
+
+def _update_render(project_id: str, **fields) -> None:
+    with _renders_lock:
+        _renders.setdefault(project_id, {}).update(fields)
+
+def scene_durations(
+    estimated_minutes: float, 
+    excerpt_lengths: List[int], 
+    min_seconds: float = MIN_SCENE_SECONDS
+) -> List[float]:
+    """Split the script's estimated duration across scenes by excerpt length."""
+    count = len(excerpt_lengths)
+    if count == 0:
+        return []
+
+    total = max(estimated_minutes * 60, min_seconds * count)
+    weights = [max(length, 1) for length in excerpt_lengths]
+    # Every scene gets the minimum, the rest is shared by excerpt length
+    spare = total - min_seconds * count
+    return [min_seconds + spare * w / sum(weights) for w in weights]
+
+def plan_slideshow(project_id: str) -> List[Tuple[Path, float]]:
+    """Images to show and for how long, from the analysis and saved scene prompts."""
+    project_path = PROJECTS_DIR / project_id
+    images = list_image_files(project_path / "images")
+    if not images:
+        raise FileNotFoundError("Project has no approved images")
+
+    analysis = json.loads((project_path / "analysis.json").read_text(encoding="utf-8"))
+
+    excerpts = {}
+    prompts_file = project_path / "scene_prompts.json"
+    if prompts_file.exists():
+        for scene in json.loads(prompts_file.read_text(encoding="utf-8"))["scenes"]:
+            excerpts[scene["scene_number"]] = scene.get("script_excerpt", "")
+
+    lengths = []
+    for image in images:
+        match = _SCENE_NUMBER.search(image.stem)
+        excerpt = excerpts.get(int(match.group(1))) if match else None
+        lengths.append(len(excerpt) if excerpt else 0)
+    if not any(lengths):
+        lengths = [1] * len(images)
+
+    durations = scene_durations(analysis.get("estimated_duration_minutes", 0), lengths)
+    return list(zip(images, durations))
+
+def _load_scene(path: Path, width: int, height: int) -> np.ndarray:
+    """Decode one scene, scaled so the most zoomed-in crop still has output resolution."""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        scale = max(width / img.width, height / img.height) * MAX_ZOOM
+        img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+        return np.asarray(img, dtype=np.float32)
+
+def render_frame(
+    src: np.ndarray, 
+    center_x: float, 
+    center_y: float, 
+    crop_w: float, 
+    crop_h: float, 
+    width: int, 
+    height: int
+) -> np.ndarray:
+    """Sample a crop window to width x height with separable bilinear interpolation."""
+    src_h, src_w = src.shape[:2]
+
+    xs = center_x - crop_w / 2 + (np.arange(width, dtype=np.float32) + 0.5) * (crop_w / width) - 0.5
+    ys = center_y - crop_h / 2 + (np.arange(height, dtype=np.float32) + 0.5) * (crop_h / height) - 0.5
+    xs = np.clip(xs, 0, src_w - 1)
+    ys = np.clip(ys, 0, src_h - 1)
+
+    x0 = xs.astype(np.intp)
+    y0 = ys.astype(np.intp)
+    x1 = np.minimum(x0 + 1, src_w - 1)
+    y1 = np.minimum(y0 + 1, src_h - 1)
+    fx = (xs - x0)[None, :, None]
+    fy = (ys - y0)[:, None, None]
+
+    # Interpolate rows first, then columns of the (height x src_w) intermediate
+    rows = src[y0] * (1 - fy) + src[y1] * fy
+    frame = rows[:, x0] * (1 - fx) + rows[:, x1] * fx
+    return (frame + 0.5).astype(np.uint8)
+
+def iter_scene_frames(
+    src: np.ndarray, 
+    frame_count: int, 
+    scene_index: int, 
+    width: int, 
+    height: int
+) -> Iterator[np.ndarray]:
+    """Pan/zoom frames for one scene; alternate scenes zoom in and out and pan opposite ways."""
+    src_h, src_w = src.shape[:2]
+    aspect = width / height
+    base_w = min(src_w, src_h * aspect)
+    base_h = base_w / aspect
+
+    zoom_in = scene_index % 2 == 0
+    pan_direction = 1 if scene_index % 4 < 2 else -1
+
+    for i in range(frame_count):
+        t = i / max(frame_count - 1, 1)
+        eased = (1 - math.cos(math.pi * t)) / 2
+        zoom = 1 + (MAX_ZOOM - 1) * (eased if zoom_in else 1 - eased)
+
+        crop_w = base_w / zoom
+        crop_h = base_h / zoom
+        # Drift across whatever room the current zoom leaves
+        slack_x = (src_w - crop_w) / 2
+        center_x = src_w / 2 + pan_direction * slack_x * (2 * eased - 1)
+        center_y = src_h / 2
+
+        yield render_frame(src, center_x, center_y, crop_w, crop_h, width, height)
+
+def iter_slideshow_frames(
+    plan: List[Tuple[Path, float]], 
+    fps: int = VIDEO_FPS, 
+    width: int = VIDEO_WIDTH, 
+    height: int = VIDEO_HEIGHT
+) -> Iterator[np.ndarray]:
+    """Every frame of the video in order; only one decoded scene is held at a time."""
+    for index, (image_path, seconds) in enumerate(plan):
+        src = _load_scene(image_path, width, height)
+        yield from iter_scene_frames(src, max(1, round(seconds * fps)), index, width, height)
+
+def render_slideshow(project_id: str) -> Path:
+    """Render the project's approved images to an MP4, streaming raw frames into ffmpeg."""
+    destination = video_path(project_id)
+    tmp_path = destination.with_name(f".{destination.name}.part.mp4")
+
+    command = [
+        FFMPEG_BINARY, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", 
+        "-s", f"{VIDEO_WIDTH}x{VIDEO_HEIGHT}", "-r", str(VIDEO_FPS), "-i", "-",
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", 
+        "-movflags", "+faststart", str(tmp_path)
+    ]
+
+    try:
+        plan = plan_slideshow(project_id)
+        total_frames = sum(max(1, round(seconds * VIDEO_FPS)) for _, seconds in plan)
+        _update_render(project_id, status="rendering", frames_done=0, total_frames=total_frames, error=None)
+        destination.parent.mkdir(exist_ok=True)
+
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        broken_pipe = False
+        try:
+            for frames_done, frame in enumerate(iter_slideshow_frames(plan), start=1):
+                process.stdin.write(frame.tobytes())
+                if frames_done % VIDEO_FPS == 0:
+                    _update_render(project_id, frames_done=frames_done)
+        except BrokenPipeError:
+            # ffmpeg exited early; its stderr says why
+            broken_pipe = True
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                broken_pipe = True
+            stderr = process.stderr.read().decode("utf-8", "replace")
+            process.wait()
+
+        if process.returncode != 0 or broken_pipe:
+            raise RuntimeError(f"ffmpeg exited with {process.returncode}: {stderr.strip()}")
+
+        os.replace(tmp_path, destination)
+        _update_render(project_id, status="completed", frames_done=total_frames)
+        return destination
+
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        _update_render(project_id, status="failed", error=str(e))
+        raise
@@ -0,0 +1 @@
+"""Performance benchmarks for the Story to Image Generator backend."""
@@ -0,0 +1,235 @@
+"""
+Micro-benchmarks for backend hot paths, on generated fixtures at several scales.
+
+Covers script analysis (1 KB to 10 MB), scene prompt building and saving
+(hundreds of scenes), project listing and details with thousands of projects
+on disk, and GenerationSession serialization with large preview lists.
+
+Results are written as JSON tagged with the git revision; pass an earlier
+file to --compare to see regressions between versions.
+
+    python -m benchmarks.bench_hot_paths --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.bench_hot_paths --quick --compare bench-abc1234.json
+
+All fixtures live in a scratch DATA_DIR, never in the real project store.
+"""
+
+import os
+import shutil
+import tempfile
+
+# Must happen before backend.config is imported: it creates the data directories
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench_hot_paths_")
+
+import json
+import time
+import random
+import platform
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List
+from fastapi.encoders import jsonable_encoder
+
+from backend.config import DATA_DIR, PROJECTS_DIR
+from backend.models.schemas import GenerationSession, PreviewImage, ScenePrompt
+from backend.utils.script_analysis import analyze_script, create_project
+from backend.utils.prompt_generation import build_prompt, generate_fallback_scenes
+from backend.utils.storage import save_scene_prompts, list_projects, get_project_details
+from backend.utils.project_index import rebuild_index
+
+WORDS = (
+    "the storm rolled over harbour lighthouse keeper climbed spiral stairs lantern flickered "
+    "boat waves crew watched beam sweep across black water dawn rested safely tower silent "
+    "ancient forest whispered secrets traveller wandered through moonlit clearing"
+).split()
+
+REGRESSION_THRESHOLD = 1.2    # flag cases at least 20% slower than the comparison run
+
+def make_script(size_bytes: int, seed: int = 0) -> str:
+    """Prose with sentences, dialogue and paragraph breaks, about size_bytes long."""
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size_bytes:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize()
+        if rng.random() < 0.2:
+            sentence = f'"{sentence}," she said.'
+        else:
+            sentence += "."
+        parts.append(sentence)
+        length += len(sentence) + 1
+        if rng.random() < 0.1:
+            parts.append("\n\n")
+    return " ".join(parts)[:size_bytes]
+
+def measure(function: Callable[[], object], repeat: int, number: int = 1) -> Dict:
+    """Seconds per call over `repeat` rounds of `number` calls each."""
+    function()    # warm-up: imports, caches, first-touch allocation
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "repeat": repeat,
+        "number": number
+    }
+
+def bench_analyze_script(sizes: List[int]) -> Dict[str, Dict]:
+    results = {}
+    for size in sizes:
+        script = make_script(size)
+        repeat = 3 if size >= 1_000_000 else 10
+        number = max(1, 100_000 // size)
+        results[f"analyze_script[{size // 1024}KB]"] = measure(lambda: analyze_script(script), repeat, number)
+    return results
+
+def bench_scene_prompts(scene_counts: List[int]) -> Dict[str, Dict]:
+    results = {}
+    script = make_script(100_000)
+    project_path = PROJECTS_DIR / "bench_scene_prompts"
+    project_path.mkdir(exist_ok=True)
+    for count in scene_counts:
+        results[f"generate_fallback_scenes[{count}]"] = measure(
+            lambda: generate_fallback_scenes(script, count, "cinematic"), 10
+        )
+        results[f"build_prompt[{count}]"] = measure(lambda: build_prompt(script, count, "cinematic"), 10, 10)
+        scenes = generate_fallback_scenes(script, count, "cinematic")
+        results[f"save_scene_prompts[{count}]"] = measure(lambda: save_scene_prompts(project_path, scenes), 10)
+    return results
+
+def make_projects(count: int) -> float:
+    """Create count projects through create_project; returns the seconds taken."""
+    start = time.perf_counter()
+    for i in range(count):
+        script = make_script(2_000 + (i % 7) * 500, seed=i)
+        project_id = f"story_bench_{i:06d}"
+        create_project(project_id, script, analyze_script(script), title=f"Bench story {i}")
+        if i % 50 == 0:
+            # A few projects with images so details have something to list
+            for n in range(1, 9):
+                (PROJECTS_DIR / project_id / "images" / f"scene_{n:03d}.jpg").write_bytes(b"\xff\xd8\xff\xd9")
+    return time.perf_counter() - start
+
+def bench_projects(count: int) -> Dict[str, Dict]:
+    setup_seconds = make_projects(count)
+    results = {
+        f"create_project[{count} total]": {"min": setup_seconds, "median": setup_seconds, "mean": setup_seconds,
+                                           "repeat": 1, "number": count}
+    }
+    results[f"list_projects[{count}, newest]"] = measure(lambda: list_projects(limit=50), 20)
+    results[f"list_projects[{count}, words]"] = measure(lambda: list_projects(limit=50, sort="words"), 20)
+    results[f"list_projects[{count}, last page]"] = measure(lambda: list_projects(offset=count - 50, limit=50), 20)
+    results[f"list_projects[{count}, search]"] = measure(lambda: list_projects(limit=50, search="story 42"), 20)
+    results[f"get_project_details[{count}]"] = measure(lambda: get_project_details("story_bench_000050"), 20, 10)
+    results[f"rebuild_index[{count}]"] = measure(rebuild_index, 1)
+    return results
+
+def make_session(previews: int) -> GenerationSession:
+    scenes = [
+        ScenePrompt(
+            scene_number=n, scene_title=f"Scene {n}", script_excerpt="x" * 100, image_prompt="y" * 400
+        )
+        for n in range(1, previews + 1)
+    ]
+    return GenerationSession(
+        session_id="session_bench",
+        project_id="story_bench",
+        status="previewing",
+        total_scenes=previews,
+        completed_scenes=previews,
+        previews=[
+            PreviewImage(
+                scene_number=s.scene_number, scene_title=s.scene_title, prompt=s.image_prompt,
+                preview_url=f"https://cdn.example.com/images/{s.scene_number:08d}.jpg",
+                generation_time=3.2, provider_used="runware", model_used="runware:101@1",
+                local_url=f"/preview-proxy/{s.scene_number:032x}"
+            )
+            for s in scenes
+        ],
+        scene_prompts=scenes
+    )
+
+def bench_session_serialization(preview_counts: List[int]) -> Dict[str, Dict]:
+    results = {}
+    for count in preview_counts:
+        session = make_session(count)
+        repeat = 5 if count >= 5000 else 20
+        # What /generation-status does for a changed session
+        results[f"session_to_json[{count}]"] = measure(
+            lambda: json.dumps(jsonable_encoder(session)), repeat
+        )
+        results[f"session_model_dump_json[{count}]"] = measure(lambda: session.model_dump_json(), repeat)
+    return results
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_results(results: Dict[str, Dict], baseline: Dict[str, Dict] = None) -> None:
+    for name, stats in results.items():
+        line = f"{name:<40} median {stats['median'] * 1000:>10.3f} ms   min {stats['min'] * 1000:>10.3f} ms"
+        previous = (baseline or {}).get(name)
+        if previous:
+            ratio = stats["median"] / previous["median"] if previous["median"] else float("inf")
+            flag = "  REGRESSION" if ratio >= REGRESSION_THRESHOLD else ""
+            line += f"   x{ratio:.2f} vs baseline{flag}"
+        print(line)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="smaller scales for a fast smoke run")
+    parser.add_argument("--projects", type=int, help="projects on disk (default 10000, 1000 with --quick)")
+    parser.add_argument("--only", help="comma-separated groups: scripts,prompts,projects,sessions")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    groups = set((args.only or "scripts,prompts,projects,sessions").split(","))
+    script_sizes = [1024, 10 * 1024, 100 * 1024, 1024 * 1024] + ([] if args.quick else [10 * 1024 * 1024])
+    scene_counts = [100] if args.quick else [100, 500]
+    preview_counts = [100, 1000] if args.quick else [100, 1000, 5000]
+    projects = args.projects or (1000 if args.quick else 10000)
+
+    results: Dict[str, Dict] = {}
+    try:
+        if "scripts" in groups:
+            results.update(bench_analyze_script(script_sizes))
+        if "prompts" in groups:
+            results.update(bench_scene_prompts(scene_counts))
+        if "projects" in groups:
+            results.update(bench_projects(projects))
+        if "sessions" in groups:
+            results.update(bench_session_serialization(preview_counts))
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        report = {
+            "git_revision": git_revision(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "results": results
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Image post-processing benchmark.
+
+Re-encodes synthetic provider-sized (1024x1024, quality 95) JPEGs with each
+post-processing preset and reports bytes saved and throughput per core.
+
+    python -m benchmarks.bench_postprocess --images 24 --workers 1,2,4
+"""
+
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageFilter
+
+from backend.models.schemas import PostProcessSettings
+from backend.utils.postprocess import process_image, supported_formats
+
+PRESETS = {
+    "jpeg-progressive-q85": PostProcessSettings(enabled=True, format="jpeg", quality=85),
+    "jpeg-768-q85": PostProcessSettings(enabled=True, format="jpeg", quality=85, max_size=768),
+    "webp-q80": PostProcessSettings(enabled=True, format="webp", quality=80),
+    "avif-q60": PostProcessSettings(enabled=True, format="avif", quality=60),
+}
+
+def make_source_images(directory: Path, count: int) -> List[Path]:
+    """Photo-like test images: smooth gradients with blurred noise, saved like a provider would."""
+    paths = []
+    for i in range(count):
+        gradient = Image.linear_gradient("L").resize((1024, 1024)).rotate(i * 15)
+        noise = Image.effect_noise((1024, 1024), 40 + i).filter(ImageFilter.GaussianBlur(2))
+        img = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+        path = directory / f"source_{i:03d}.jpg"
+        img.save(path, format="JPEG", quality=95)
+        paths.append(path)
+    return paths
+
+def run_preset(sources: List[Path], settings: PostProcessSettings, workers: int) -> Dict:
+    work_dir = Path(tempfile.mkdtemp(prefix="postprocess_bench_"))
+    try:
+        inputs = []
+        for source in sources:
+            target = work_dir / source.name
+            shutil.copyfile(source, target)
+            inputs.append(str(target))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Warm the workers so process start-up isn't counted
+            list(pool.map(sum, [[0]] * workers))
+            start = time.perf_counter()
+            results = list(pool.map(process_image, inputs, [settings.dict()] * len(inputs)))
+            elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    input_bytes = sum(r["input_bytes"] for r in results)
+    output_bytes = sum(r["output_bytes"] for r in results)
+    images_per_second = len(results) / elapsed
+
+    return {
+        "workers": workers,
+        "images": len(results),
+        "seconds": round(elapsed, 3),
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "bytes_saved_pct": round(100 * (1 - output_bytes / input_bytes), 1),
+        "images_per_second": round(images_per_second, 2),
+        "images_per_second_per_core": round(images_per_second / workers, 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated pool sizes")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    source_dir = Path(tempfile.mkdtemp(prefix="postprocess_sources_"))
+    try:
+        sources = make_source_images(source_dir, args.images)
+        results = {}
+        for name, settings in PRESETS.items():
+            if settings.format not in supported_formats():
+                print(f"{name:<22} skipped: Pillow has no {settings.format} encoder")
+                continue
+            results[name] = []
+            for workers in [int(w) for w in args.workers.split(",")]:
+                row = run_preset(sources, settings, workers)
+                results[name].append(row)
+                print(
+                    f"{name:<22} workers={workers:<2} saved={row['bytes_saved_pct']:>5}%  "
+                    f"{row['images_per_second']:>7} img/s  {row['images_per_second_per_core']:>6} img/s/core"
+                )
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
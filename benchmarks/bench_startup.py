@@ -0,0 +1,142 @@
+"""
+Startup benchmark for the production server.
+
+Measures, in fresh interpreters:
+
+- import time of backend.main (median of several runs), with the slowest
+  modules reported by `python -X importtime`;
+- time-to-ready of `python -m backend.server` per worker count: from
+  process start until /ready answers 200;
+- shutdown time: from SIGTERM until the server process exits, with no
+  in-flight work.
+
+    python -m benchmarks.bench_startup --workers 1,2,4 --output startup.json
+
+Each server runs against a scratch DATA_DIR.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import socket
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+import requests
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import backend.main; print(time.perf_counter() - start)"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def scratch_env(data_dir: str) -> Dict[str, str]:
+    return dict(os.environ, DATA_DIR=data_dir, DRAIN_DELAY="0", LOG_LEVEL="WARNING")
+
+def bench_import(runs: int, data_dir: str) -> Dict:
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=REPO_ROOT, env=scratch_env(data_dir),
+            capture_output=True, text=True, check=True
+        ).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return {"median": statistics.median(times), "min": min(times), "runs": runs}
+
+def slowest_imports(data_dir: str, top: int) -> List[Dict]:
+    """Cumulative import time of backend.main and the modules it imports directly, from -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"], cwd=REPO_ROOT,
+        env=scratch_env(data_dir), capture_output=True, text=True, check=True
+    ).stderr
+
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two spaces per level under their importer
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative)))
+
+    # backend/__init__ imports main too, so backend.main shows up at more than one level
+    main_indent = max(indent for indent, name, _ in entries if name == "backend.main")
+    modules = {
+        name: cumulative for indent, name, cumulative in entries 
+        if indent == main_indent + 2 or (indent == main_indent and name == "backend.main")
+    }
+    ranked = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in ranked]
+
+def bench_server(workers: int, data_dir: str, timeout: float = 60.0) -> Dict:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "backend.server", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--allow-process-local-state"
+        ],
+        cwd=REPO_ROOT, env=scratch_env(data_dir), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready_seconds = None
+        while time.perf_counter() - start < timeout and process.poll() is None:
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/ready", timeout=1).status_code == 200:
+                    ready_seconds = time.perf_counter() - start
+                    break
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(0.02)
+
+        stop = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=timeout)
+        return {
+            "workers": workers,
+            "time_to_ready": ready_seconds,
+            "shutdown": time.perf_counter() - stop
+        }
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--import-runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to report")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        imports = bench_import(args.import_runs, data_dir)
+        print(f"import backend.main   median {imports['median'] * 1000:8.1f} ms   min {imports['min'] * 1000:8.1f} ms")
+        slowest = slowest_imports(data_dir, args.top)
+        for entry in slowest:
+            print(f"  {entry['module']:<40} {entry['cumulative_ms']:8.1f} ms")
+
+        servers = []
+        for workers in (int(w) for w in args.workers.split(",")):
+            result = bench_server(workers, data_dir)
+            ready = f"{result['time_to_ready']:.2f}s" if result["time_to_ready"] is not None else "timed out"
+            print(f"{workers} worker(s)   ready in {ready}   shutdown in {result['shutdown']:.2f}s")
+            servers.append(result)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "import": imports, "slowest_imports": slowest, "servers": servers
+        }, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
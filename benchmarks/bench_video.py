@@ -0,0 +1,88 @@
+"""
+Slideshow render-speed benchmark.
+
+Measures frames per second of the NumPy pan/zoom frame generator on its own
+and, when ffmpeg is installed, end to end including H.264 encoding.
+
+    python -m benchmarks.bench_video --scenes 4 --seconds 3
+"""
+
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+from PIL import Image, ImageFilter
+
+from backend.config import FFMPEG_BINARY, VIDEO_FPS, VIDEO_WIDTH, VIDEO_HEIGHT
+from backend.utils.video import iter_slideshow_frames, encoder_available
+
+def make_scene_images(directory: Path, count: int) -> List[Path]:
+    paths = []
+    for i in range(count):
+        noise = Image.effect_noise((1024, 1024), 60).filter(ImageFilter.GaussianBlur(3))
+        gradient = Image.linear_gradient("L").resize((1024, 1024)).rotate(i * 40)
+        path = directory / f"scene_{i + 1:03d}.jpg"
+        Image.merge("RGB", (gradient, noise, gradient.rotate(90))).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+def bench_frames(plan: List[Tuple[Path, float]], width: int, height: int) -> Dict:
+    start = time.perf_counter()
+    frames = sum(1 for _ in iter_slideshow_frames(plan, VIDEO_FPS, width, height))
+    elapsed = time.perf_counter() - start
+    return {"frames": frames, "seconds": round(elapsed, 3), "fps": round(frames / elapsed, 1)}
+
+def bench_encode(plan: List[Tuple[Path, float]], width: int, height: int, output: Path) -> Dict:
+    command = [
+        FFMPEG_BINARY, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{width}x{height}", "-r", str(VIDEO_FPS), "-i", "-",
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", str(output)
+    ]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    frames = 0
+    for frame in iter_slideshow_frames(plan, VIDEO_FPS, width, height):
+        process.stdin.write(frame.tobytes())
+        frames += 1
+    process.stdin.close()
+    process.wait()
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames, 
+        "seconds": round(elapsed, 3), 
+        "fps": round(frames / elapsed, 1), 
+        "bytes": output.stat().st_size
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0, help="seconds per scene")
+    parser.add_argument("--size", default=f"{VIDEO_WIDTH}x{VIDEO_HEIGHT}")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+
+    work_dir = Path(tempfile.mkdtemp(prefix="video_bench_"))
+    try:
+        plan = [(path, args.seconds) for path in make_scene_images(work_dir, args.scenes)]
+        results = {"size": args.size, "fps_target": VIDEO_FPS, "frames_only": bench_frames(plan, width, height)}
+        print(f"frame generation: {results['frames_only']['fps']} frames/s")
+
+        if encoder_available():
+            results["encoded"] = bench_encode(plan, width, height, work_dir / "bench.mp4")
+            print(f"generate + encode: {results['encoded']['fps']} frames/s")
+        else:
+            print("ffmpeg not found: skipping encode benchmark")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
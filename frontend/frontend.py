@@ -1,13 +1,28 @@
+import os
 import streamlit as st
 import requests
 import time
+import uuid
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Optional, List
 from datetime import datetime
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
+CLIENT_ID_SECRET = os.getenv("CLIENT_ID_SECRET", "")   # same as the backend's, so it trusts X-Client-Id
 POLLING_INTERVAL = 1.5
 MAX_POLL_TIME = 300
+PROJECTS_PER_PAGE = 10
+HTTP_POOL_SIZE = 20      # keep-alive connections to the backend, shared by all browser sessions
+SETTLED_STATUSES = ("previewing", "completed", "failed")   # session can only change through a user action
+HTTP_RETRIES = 3         # retries for idempotent requests (GET/PUT/DELETE) on connection errors and 502/503/504
+PROJECT_SORT_OPTIONS = {
+    "Newest First": "newest",
+    "Oldest First": "oldest",
+    "Most Words": "words",
+    "Most Images": "images"
+}
 
 # Page Configuration
 st.set_page_config(
@@ -29,7 +44,11 @@ def init_session_state():
         "navigation_history": ["Create Story"],
         "project_created": False,
         "project_creation_result": None,
-        "last_refresh": None
+        "monitor_session_id": None,
+        "monitor_status": None,
+        "monitor_rendered": {},
+        "status_cache": {},
+        "client_id": uuid.uuid4().hex    # backend admission limits are per client
     }
     
     for key, value in defaults.items():
@@ -72,11 +91,33 @@ def get_theme_css():
 st.markdown(get_theme_css(), unsafe_allow_html=True)
 
 # API Functions
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Keep-alive HTTP client shared by every browser session in this process.
+    Reuses pooled connections to the backend and retries idempotent requests
+    with backoff; POSTs (generation, approval) are never retried.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    return session
+
 @st.cache_data(ttl=60)
 def check_backend_health() -> Dict:
     """Check backend health status"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=10)
+        response = get_http_session().get(f"{API_BASE_URL}/health", timeout=10)
         return {"healthy": response.status_code == 200, "data": response.json() if response.status_code == 200 else None}
     except Exception as e:
         return {"healthy": False, "error": str(e)}
@@ -85,7 +126,7 @@ def check_backend_health() -> Dict:
 def load_models() -> Optional[Dict]:
     """Load available AI models"""
     try:
-        response = requests.get(f"{API_BASE_URL}/models", timeout=30)
+        response = get_http_session().get(f"{API_BASE_URL}/models", timeout=30)
         return response.json() if response.status_code == 200 else None
     except Exception as e:
         st.error(f"Failed to load models: {str(e)}")
@@ -99,13 +140,19 @@ def api_request(endpoint: str, method: str = "GET", data: Dict = None, timeout:
             endpoint = endpoint[1:]
             
         url = f"{API_BASE_URL}/{endpoint}"
+        http = get_http_session()
+        headers = {"X-Client-Id": st.session_state.client_id}
+        if CLIENT_ID_SECRET:
+            headers["X-Client-Secret"] = CLIENT_ID_SECRET
         
         if method == "GET":
-            response = requests.get(url, timeout=timeout)
+            response = http.get(url, headers=headers, timeout=timeout)
         elif method == "POST":
-            response = requests.post(url, json=data, timeout=timeout)
+            response = http.post(url, json=data, headers=headers, timeout=timeout)
+        elif method == "PUT":
+            response = http.put(url, json=data, headers=headers, timeout=timeout)
         elif method == "DELETE":
-            response = requests.delete(url, timeout=timeout)
+            response = http.delete(url, headers=headers, timeout=timeout)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
         
@@ -114,6 +161,14 @@ def api_request(endpoint: str, method: str = "GET", data: Dict = None, timeout:
         elif response.status_code == 404:
             st.error(f"Resource not found: {endpoint}")
             return None
+        elif response.status_code == 429:
+            detail = response.json().get("detail", {})
+            st.warning(
+                f"⏳ The server is busy ({detail.get('error', 'over capacity')}). "
+                f"About {detail.get('queue_position', '?')} job(s) ahead of you; "
+                f"try again in {response.headers.get('Retry-After', '?')}s."
+            )
+            return None
         else:
             st.error(f"Request failed: {response.status_code} - {response.text}")
             return None
@@ -128,6 +183,53 @@ def api_request(endpoint: str, method: str = "GET", data: Dict = None, timeout:
         st.error(f"Error: {str(e)}")
         return None
 
+def get_session_status(session_id: str) -> Optional[Dict]:
+    """
+    Generation status from a per-browser-session cache. Settled sessions are
+    served from the cache without a backend call until an action invalidates
+    them; everything else is revalidated against the backend's session
+    version (ETag), so an unchanged session costs a bodiless 304.
+    """
+    cached = st.session_state.status_cache.get(session_id)
+    if cached and not cached["stale"] and cached["status"].get("status") in SETTLED_STATUSES:
+        return cached["status"]
+    
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+    try:
+        response = get_http_session().get(
+            f"{API_BASE_URL}/generation-status/{session_id}", headers=headers, timeout=30
+        )
+    except requests.exceptions.RequestException as e:
+        st.error(f"Could not fetch session status: {str(e)}")
+        return cached["status"] if cached else None
+    
+    if response.status_code == 304 and cached:
+        cached["stale"] = False
+        return cached["status"]
+    if response.status_code != 200:
+        st.session_state.status_cache.pop(session_id, None)
+        return None
+    
+    status = response.json()
+    st.session_state.status_cache[session_id] = {
+        "status": status, 
+        "etag": response.headers.get("ETag"), 
+        "stale": False
+    }
+    return status
+
+def invalidate_session_status(session_id: str):
+    """Force the next get_session_status call to check with the backend"""
+    cached = st.session_state.status_cache.get(session_id)
+    if cached:
+        cached["stale"] = True
+
+def resolve_image_url(url: str) -> str:
+    """Turn backend-relative image paths (e.g. /previews/...) into absolute URLs"""
+    if url and url.startswith('/'):
+        return f"{API_BASE_URL}{url}"
+    return url
+
 # Navigation Functions
 def navigate_to(page: str):
     """Navigate to a different page"""
@@ -340,6 +442,12 @@ def generate_images_page():
         num_scenes = st.number_input("Number of scenes:", 
                                     min_value=1, max_value=50, value=recommended, key="num_scenes_input")
     
+    reuse_col1, reuse_col2 = st.columns([1, 2])
+    use_saved_prompts = reuse_col1.checkbox("♻️ Reuse saved scene prompts", key="use_saved_prompts_checkbox",
+                                            help="Skip the LLM and render the prompts saved by the last run")
+    scene_filter = reuse_col2.text_input("Only scenes (optional):", placeholder="e.g. 1, 3, 5",
+                                         key="saved_scenes_input", disabled=not use_saved_prompts)
+    
     if st.button("🚀 Generate Scene Previews", use_container_width=True, type="primary"):
         payload = {
             "project_id": project.get("project_id"),
@@ -349,18 +457,221 @@ def generate_images_page():
             "ai_model": ai_model,
             "image_provider": image_provider,
             "image_model": image_model,
+            "use_saved_prompts": use_saved_prompts,
         }
+        if use_saved_prompts and scene_filter.strip():
+            payload["scene_numbers"] = [int(n) for n in scene_filter.replace(" ", "").split(",") if n.isdigit()]
         
         with st.spinner("🚀 Starting generation..."):
             result = api_request("generate-previews", "POST", payload, timeout=120)
         
         if result:
             st.session_state.current_session = result.get("session_id")
+            st.session_state.status_cache.pop(st.session_state.current_session, None)
             session_id = result.get("session_id", "Unknown")
             st.success(f"🎉 Generation started! Session: {session_id}")
             time.sleep(1)
             navigate_to("Monitor Progress")
 
+ACTIVE_STATUSES = ("generating", "regenerating")
+
+def preview_signature(preview: Dict, regenerating: List[int]) -> tuple:
+    """What a preview card shows; the card only needs redrawing when this changes"""
+    return (preview.get("preview_url"), preview.get("error"), preview.get("scene_number") in regenerating)
+
+def rendered_signatures(status: Dict) -> Dict[int, tuple]:
+    regenerating = status.get("regenerating_scenes", [])
+    return {
+        p.get("scene_number"): preview_signature(p, regenerating) 
+        for p in status.get("previews", [])
+    }
+
+def show_progress(status: Dict):
+    """Progress bar and status metrics"""
+    total_scenes = max(status.get("total_scenes", 1), 1)
+    completed_scenes = status.get("completed_scenes", 0)
+    progress = min(completed_scenes / total_scenes, 1.0)
+    st.progress(progress, text=f"Progress: {completed_scenes}/{total_scenes} scenes")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Status", status.get('status', 'Unknown').title())
+    col2.metric("Progress", f"{int(progress*100)}%")
+    col3.metric("Total Scenes", total_scenes)
+    col4.metric("Errors", len(status.get("errors", [])))
+
+def show_live_preview(preview: Dict):
+    """Lightweight card for a scene that finished since the page was last drawn"""
+    scene_number = preview.get('scene_number')
+    scene_title = preview.get('scene_title', f'Scene {scene_number}')
+    if preview.get("preview_url"):
+        st.markdown(f"**✅ Scene {scene_number}: {scene_title}**")
+        st.image(resolve_image_url(preview.get("local_url") or preview["preview_url"]), use_container_width=True)
+    else:
+        st.markdown(f"**❌ Scene {scene_number}: {scene_title}**")
+        st.error(f"❌ Generation failed: {preview.get('error', 'Unknown error')}")
+
+def live_progress(session_id: str):
+    """
+    Polled section of the monitor page. Runs as a fragment, so each poll only
+    redraws the progress bar and scenes that finished since the last full run;
+    cards already on the page are left alone.
+    """
+    status = get_session_status(session_id)
+    previous = st.session_state.monitor_status
+    st.session_state.monitor_status = status
+    
+    if not status:
+        st.error("❌ Session not found or backend error")
+        return
+    
+    show_progress(status)
+    
+    # Full-page run: the page draws every card itself right after this
+    rendered = st.session_state.monitor_rendered
+    if rendered is None:
+        return
+    
+    # Existing cards changed (regenerated scene) or the run finished: redraw the page once
+    current = rendered_signatures(status)
+    changed = any(scene in current and current[scene] != sig for scene, sig in rendered.items())
+    finished = (
+        previous is not None and previous.get("status") in ACTIVE_STATUSES
+        and status.get("status") not in ACTIVE_STATUSES
+    )
+    if changed or finished:
+        st.rerun(scope="app")
+    
+    new_previews = sorted(
+        (p for p in status.get("previews", []) if p.get("scene_number") not in rendered),
+        key=lambda x: x.get("scene_number", 0)
+    )
+    if new_previews:
+        st.markdown("---")
+        st.subheader("🆕 Just Finished")
+        cols = st.columns(4)
+        for i, preview in enumerate(new_previews):
+            with cols[i % 4]:
+                show_live_preview(preview)
+
+@st.fragment
+def preview_card(session_id: str, preview: Dict, regenerating: bool, models: Optional[Dict]):
+    """
+    One scene card. A fragment, so picking a provider or model in its
+    regenerate form reruns just this card.
+    """
+    scene_number = preview.get('scene_number')
+    scene_title = preview.get('scene_title', f'Scene {scene_number}')
+    
+    # Scene header with status indicator
+    if preview.get("preview_url"):
+        status_icon = "✅"
+        status_color = "green"
+    else:
+        status_icon = "❌"
+        status_color = "red"
+    
+    st.markdown(f"""
+    <div style="background: rgba(0,0,0,0.05); padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
+        <h4 style="margin: 0; color: {status_color};">
+            {status_icon} Scene {scene_number}: {scene_title}
+        </h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if regenerating:
+        st.info(f"🔄 Regenerating scene {scene_number}...")
+    
+    if preview.get("preview_url"):
+        # Display image
+        try:
+            image_url = preview.get("local_url") or preview["preview_url"]
+            st.image(resolve_image_url(image_url), use_container_width=True)
+            
+            # Image info
+            provider = preview.get('provider_used', 'Unknown')
+            model = preview.get('model_used', 'Unknown')
+            gen_time = preview.get('generation_time', 0)
+            
+            st.caption(f"🎨 {provider} | 🤖 {model} | ⏱️ {gen_time:.1f}s")
+        except Exception as e:
+            st.error(f"❌ Failed to load image: {str(e)}")
+    else:
+        # Failed generation - show error
+        error_msg = preview.get('error', 'Unknown error')
+        st.error(f"❌ Generation failed: {error_msg}")
+    
+    # Regenerate section (always available)
+    with st.expander(f"🔄 Regenerate Scene {scene_number}", expanded=False):
+        st.markdown("### Regeneration Options")
+        
+        # Provider selection
+        regen_col1, regen_col2 = st.columns(2)
+        
+        with regen_col1:
+            regen_provider = st.selectbox(
+                "Image Provider:", 
+                ["runware", "together"], 
+                key=f"regen_provider_{scene_number}_{session_id}",
+                index=0
+            )
+        
+        with regen_col2:
+            if models and models.get("image_models"):
+                provider_models = models["image_models"].get(regen_provider, [])
+                if provider_models:
+                    regen_model = st.selectbox(
+                        f"{regen_provider.title()} Model:", 
+                        provider_models,
+                        key=f"regen_model_{scene_number}_{session_id}"
+                    )
+                else:
+                    st.error(f"❌ No models available for {regen_provider}")
+                    regen_model = None
+            else:
+                st.error("❌ Models not loaded")
+                regen_model = None
+        
+        # Regenerate button
+        if regen_model:
+            if st.button(
+                f"🚀 Regenerate Scene {scene_number}", 
+                key=f"regenerate_{scene_number}_{session_id}",
+                use_container_width=True,
+                type="secondary"
+            ):
+                with st.spinner(f"🔄 Regenerating scene {scene_number}..."):
+                    regen_payload = {
+                        "session_id": session_id,
+                        "scene_number": scene_number,
+                        "image_provider": regen_provider,
+                        "image_model": regen_model
+                    }
+                    
+                    regen_result = api_request(
+                        "regenerate-scene", 
+                        "POST", 
+                        regen_payload, 
+                        timeout=120
+                    )
+                
+                if regen_result:
+                    if regen_result.get("status") == "success":
+                        st.toast(f"✅ Scene {scene_number} regenerated successfully!")
+                        invalidate_session_status(session_id)
+                        # Redraw the page so the approval checkbox and batch stats pick up the new image
+                        st.rerun(scope="app")
+                    else:
+                        st.error(f"❌ Regeneration failed for scene {scene_number}")
+                        if regen_result.get("new_preview", {}).get("error"):
+                            st.error(f"Error: {regen_result['new_preview']['error']}")
+                else:
+                    st.error("❌ Regeneration request failed")
+        
+        # Show current prompt for reference
+        if preview.get("prompt"):
+            st.markdown("**Current Prompt:**")
+            st.code(preview["prompt"], language="text")
+
 def monitor_progress_page():
     """Monitor Progress page with regenerate functionality"""
     st.header("📊 Monitor Generation Progress")
@@ -377,30 +688,34 @@ def monitor_progress_page():
     auto_refresh = col1.checkbox("🔄 Auto-refresh", value=True, key="auto_refresh_checkbox")
     manual_refresh = col2.button("📊 Check Status", key="manual_refresh_button")
     
+    status = None
+    if manual_refresh:
+        invalidate_session_status(session_id)
     if manual_refresh or auto_refresh:
-        status = api_request(f"generation-status/{session_id}")
+        # Keep polling only while the last known state is still changing
+        previous = st.session_state.monitor_status
+        polling = auto_refresh and (
+            st.session_state.get("monitor_session_id") != session_id
+            or not previous or previous.get("status") in ACTIVE_STATUSES
+        )
+        st.session_state.monitor_rendered = None
+        st.session_state.monitor_session_id = session_id
         
+        st.fragment(live_progress, run_every=POLLING_INTERVAL if polling else None)(session_id)
+        
+        status = st.session_state.monitor_status
         if not status:
-            st.error("❌ Session not found or backend error")
+            st.session_state.monitor_rendered = {}
             return
-        
-        # Progress bar
-        total_scenes = max(status.get("total_scenes", 1), 1)
-        completed_scenes = status.get("completed_scenes", 0)
-        progress = completed_scenes / total_scenes
-        st.progress(progress, text=f"Progress: {completed_scenes}/{total_scenes} scenes")
-        
-        # Status metrics
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Status", status.get('status', 'Unknown').title())
-        col2.metric("Progress", f"{int(progress*100)}%")
-        col3.metric("Total Scenes", total_scenes)
-        col4.metric("Errors", len(status.get("errors", [])))
+        if not polling and status.get("status") in ACTIVE_STATUSES and auto_refresh:
+            st.rerun()
+        st.session_state.monitor_rendered = rendered_signatures(status)
         
         # Get available models for regeneration
         models = st.session_state.available_models
         if not models:
             models = load_models()
+            st.session_state.available_models = models
         
         # Display previews with regenerate options
         if status.get("previews"):
@@ -408,6 +723,7 @@ def monitor_progress_page():
             st.subheader("🖼️ Generated Previews")
             
             sorted_previews = sorted(status["previews"], key=lambda x: x.get("scene_number", 0))
+            regenerating_scenes = status.get("regenerating_scenes", [])
             approvals = {}
             
             for i, preview in enumerate(sorted_previews):
@@ -416,127 +732,20 @@ def monitor_progress_page():
                 
                 with cols[i % 2]:
                     scene_number = preview.get('scene_number', i+1)
-                    scene_title = preview.get('scene_title', f'Scene {scene_number}')
+                    preview_card(session_id, preview, scene_number in regenerating_scenes, models)
                     
-                    # Scene header with status indicator
+                    # Approval checkbox (outside the card fragment so batch stats stay in sync)
                     if preview.get("preview_url"):
-                        status_icon = "✅"
-                        status_color = "green"
+                        approvals[str(scene_number)] = st.checkbox(
+                            f"✅ Save Scene {scene_number}", 
+                            value=True,
+                            key=f"approve_{scene_number}_{session_id}"
+                        )
                     else:
-                        status_icon = "❌"
-                        status_color = "red"
-                    
-                    st.markdown(f"""
-                    <div style="background: rgba(0,0,0,0.05); padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
-                        <h4 style="margin: 0; color: {status_color};">
-                            {status_icon} Scene {scene_number}: {scene_title}
-                        </h4>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if preview.get("preview_url"):
-                        # Display image
-                        try:
-                            st.image(preview["preview_url"], use_container_width=True)
-                            
-                            # Image info
-                            provider = preview.get('provider_used', 'Unknown')
-                            model = preview.get('model_used', 'Unknown')
-                            gen_time = preview.get('generation_time', 0)
-                            
-                            st.caption(f"🎨 {provider} | 🤖 {model} | ⏱️ {gen_time:.1f}s")
-                            
-                            # Approval checkbox
-                            approvals[str(scene_number)] = st.checkbox(
-                                f"✅ Save Scene {scene_number}", 
-                                value=True,
-                                key=f"approve_{scene_number}_{session_id}_{i}"
-                            )
-                            
-                        except Exception as e:
-                            st.error(f"❌ Failed to load image: {str(e)}")
-                            approvals[str(scene_number)] = False
-                    else:
-                        # Failed generation - show error
-                        error_msg = preview.get('error', 'Unknown error')
-                        st.error(f"❌ Generation failed: {error_msg}")
                         approvals[str(scene_number)] = False
-                    
-                    # Regenerate section (always available)
-                    with st.expander(f"🔄 Regenerate Scene {scene_number}", expanded=False):
-                        st.markdown("### Regeneration Options")
-                        
-                        # Provider selection
-                        regen_col1, regen_col2 = st.columns(2)
-                        
-                        with regen_col1:
-                            regen_provider = st.selectbox(
-                                "Image Provider:", 
-                                ["runware", "together"], 
-                                key=f"regen_provider_{scene_number}_{i}",
-                                index=0
-                            )
-                        
-                        with regen_col2:
-                            if models and models.get("image_models"):
-                                provider_models = models["image_models"].get(regen_provider, [])
-                                if provider_models:
-                                    regen_model = st.selectbox(
-                                        f"{regen_provider.title()} Model:", 
-                                        provider_models,
-                                        key=f"regen_model_{scene_number}_{i}"
-                                    )
-                                else:
-                                    st.error(f"❌ No models available for {regen_provider}")
-                                    regen_model = None
-                            else:
-                                st.error("❌ Models not loaded")
-                                regen_model = None
-                        
-                        # Regenerate button
-                        if regen_model:
-                            regen_key = f"regenerate_{scene_number}_{session_id}_{i}"
-                            if st.button(
-                                f"🚀 Regenerate Scene {scene_number}", 
-                                key=regen_key,
-                                use_container_width=True,
-                                type="secondary"
-                            ):
-                                with st.spinner(f"🔄 Regenerating scene {scene_number}..."):
-                                    regen_payload = {
-                                        "session_id": session_id,
-                                        "scene_number": scene_number,
-                                        "image_provider": regen_provider,
-                                        "image_model": regen_model
-                                    }
-                                    
-                                    regen_result = api_request(
-                                        "regenerate-scene", 
-                                        "POST", 
-                                        regen_payload, 
-                                        timeout=120
-                                    )
-                                
-                                if regen_result:
-                                    if regen_result.get("status") == "success":
-                                        st.success(f"✅ Scene {scene_number} regenerated successfully!")
-                                        # Force refresh to show new image
-                                        time.sleep(1)
-                                        st.rerun()
-                                    else:
-                                        st.error(f"❌ Regeneration failed for scene {scene_number}")
-                                        if regen_result.get("new_preview", {}).get("error"):
-                                            st.error(f"Error: {regen_result['new_preview']['error']}")
-                                else:
-                                    st.error("❌ Regeneration request failed")
-                        
-                        # Show current prompt for reference
-                        if preview.get("prompt"):
-                            st.markdown("**Current Prompt:**")
-                            st.code(preview["prompt"], language="text")
             
             # Batch operations section
-            if status.get("status") in ["previewing", "completed"]:
+            if status.get("status") in ["previewing", "regenerating", "completed"]:
                 st.markdown("---")
                 st.subheader("📦 Batch Operations")
                 
@@ -563,9 +772,9 @@ def monitor_progress_page():
                                                {"session_id": session_id, "scene_approvals": approvals})
                         
                         if result:
+                            invalidate_session_status(session_id)
                             saved_count = result.get('saved_images', selected_count)
-                            st.success(f"🎉 Saved {saved_count} images!")
-                            time.sleep(1)
+                            st.toast(f"🎉 Saved {saved_count} images!")
                             navigate_to("My Projects")
                 
                 with action_col2:
@@ -573,8 +782,22 @@ def monitor_progress_page():
                         if st.button("🔄 Regenerate All Failed", 
                                    use_container_width=True, 
                                    type="secondary"):
-                            st.info("🔄 Batch regeneration would be implemented here")
-                            st.caption("This would regenerate all failed scenes with default settings")
+                            failed_scenes = [
+                                p.get("scene_number") for p in sorted_previews if not p.get("preview_url")
+                            ]
+                            batch_payload = {
+                                "session_id": session_id,
+                                "scene_numbers": failed_scenes,
+                                "image_provider": st.session_state.get("image_provider_select", "runware"),
+                                "image_model": st.session_state.get("image_model_select", "runware:101@1")
+                            }
+                            batch_result = api_request("regenerate-scenes", "POST", batch_payload)
+                            if batch_result:
+                                st.toast(f"🔄 Regenerating {len(failed_scenes)} scenes...")
+                                # Resume polling for the batch
+                                invalidate_session_status(session_id)
+                                st.session_state.monitor_status = None
+                                st.rerun()
                 
                 with action_col3:
                     if st.button("✅ Select All Success", 
@@ -589,15 +812,6 @@ def monitor_progress_page():
             st.subheader("⚠️ Generation Errors")
             for error in status["errors"]:
                 st.error(error)
-        
-        # Auto-refresh logic
-        if auto_refresh and status.get("status") == "generating":
-            current_time = time.time()
-            if (st.session_state.last_refresh is None or 
-                current_time - st.session_state.last_refresh > POLLING_INTERVAL):
-                st.session_state.last_refresh = current_time
-                time.sleep(POLLING_INTERVAL)
-                st.rerun()
     
     # Quick actions sidebar
     st.markdown("---")
@@ -612,6 +826,8 @@ def monitor_progress_page():
                 if result:
                     st.success("🗑️ Session cleared!")
                     st.session_state.current_session = None
+                    st.session_state.status_cache.pop(session_id, None)
+                    st.session_state.monitor_status = None
                     st.rerun()
     
     with quick_col2:
@@ -628,14 +844,28 @@ def monitor_progress_page():
     
     with quick_col3:
         if st.button("🔄 Force Refresh", use_container_width=True):
-            st.session_state.last_refresh = None
+            invalidate_session_status(session_id)
+            st.session_state.monitor_status = None
             st.rerun()
 
 def my_projects_page():
     """My Projects page - Fixed version"""
     st.header("📁 My Projects")
     
-    projects = api_request("projects")
+    # Search and sort (served from the backend project index)
+    col1, col2, col3 = st.columns([2, 1, 1])
+    search_term = col1.text_input("🔍 Search:", placeholder="Enter project ID or title", key="search_projects")
+    sort_by = col2.selectbox("Sort by:", list(PROJECT_SORT_OPTIONS), key="sort_projects")
+    page_number = col3.number_input("Page:", min_value=1, value=1, step=1, key="projects_page")
+    
+    # One call returns the page with image counts and thumbnails for every project
+    summary_request = {
+        "offset": (page_number - 1) * PROJECTS_PER_PAGE,
+        "limit": PROJECTS_PER_PAGE,
+        "sort": PROJECT_SORT_OPTIONS[sort_by],
+        "search": search_term or None
+    }
+    projects = api_request("projects/summaries", "POST", summary_request)
     
     if not projects or not projects.get("projects"):
         st.info("💡 No projects found")
@@ -643,30 +873,13 @@ def my_projects_page():
             navigate_to("Create Story")
         return
     
-    project_list = projects["projects"]
-    st.success(f"📊 Found {len(project_list)} projects")
-    
-    # Search and sort
-    col1, col2 = st.columns([2, 1])
-    search_term = col1.text_input("🔍 Search:", placeholder="Enter project ID", key="search_projects")
-    sort_by = col2.selectbox("Sort by:", ["Newest First", "Oldest First", "Most Words"], key="sort_projects")
-    
-    # Filter projects
-    if search_term:
-        filtered = [p for p in project_list if search_term.lower() in p.get('project_id', '').lower()]
-    else:
-        filtered = project_list
-    
-    # Sort projects
-    if sort_by == "Newest First":
-        filtered.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-    elif sort_by == "Oldest First":
-        filtered.sort(key=lambda x: x.get('created_at', ''))
-    elif sort_by == "Most Words":
-        filtered.sort(key=lambda x: x.get('analysis', {}).get('word_count', 0), reverse=True)
+    filtered = projects["projects"]
+    total = projects.get("total", len(filtered))
+    total_pages = max(1, -(-total // PROJECTS_PER_PAGE))
+    st.success(f"📊 Found {total} projects (page {page_number} of {total_pages})")
     
     # Display projects
-    for i, project in enumerate(filtered[:10]):  # Show max 10 projects
+    for i, project in enumerate(filtered):
         project_id = project.get('project_id', 'Unknown')
         word_count = project.get('analysis', {}).get('word_count', 0)
         
@@ -688,29 +901,22 @@ def my_projects_page():
                 ⏱️ **Est. Duration:** {estimated_duration} min
                 """)
                 
-                # Load project details with proper error handling
-                try:
-                    details = api_request(f"projects/{project_id}")
-                    if details and details.get('images'):
-                        image_count = len(details['images'])
-                        st.success(f"🖼️ {image_count} images generated")
-                        
-                        # Show thumbnails
-                        images_to_show = details['images'][:4]
-                        if images_to_show:
-                            img_cols = st.columns(min(4, len(images_to_show)))
-                            for idx, img_path in enumerate(images_to_show):
-                                with img_cols[idx]:
-                                    try:
-                                        full_img_url = f"{API_BASE_URL}{img_path}"
-                                        st.image(full_img_url, use_container_width=True)
-                                    except Exception as e:
-                                        st.error("❌ Image load failed")
-                    else:
-                        st.info("📝 No images generated yet")
-                        
-                except Exception as e:
-                    st.warning(f"⚠️ Could not load project details: {str(e)}")
+                image_count = project.get('total_images', 0)
+                if image_count:
+                    st.success(f"🖼️ {image_count} images generated")
+                    
+                    # Show thumbnails (small WebP derivatives, not full-size images)
+                    images_to_show = project.get('thumbnails', [])[:4]
+                    if images_to_show:
+                        img_cols = st.columns(min(4, len(images_to_show)))
+                        for idx, img_path in enumerate(images_to_show):
+                            with img_cols[idx]:
+                                try:
+                                    st.image(resolve_image_url(img_path), use_container_width=True)
+                                except Exception as e:
+                                    st.error("❌ Image load failed")
+                else:
+                    st.info("📝 No images generated yet")
             
             with col2:
                 if st.button("🎨 Generate Images", key=f"gen_{project_id}_{i}", 
@@ -722,6 +928,26 @@ def my_projects_page():
                            use_container_width=True):
                     st.session_state.current_project = project
                     st.rerun()
+                
+                st.link_button("📦 Download ZIP", f"{API_BASE_URL}/projects/{project_id}/export",
+                               use_container_width=True)
+
+                if image_count:
+                    if st.button("🎞️ Render Video", key=f"video_{project_id}_{i}",
+                               use_container_width=True):
+                        result = api_request(f"projects/{project_id}/video", "POST")
+                        if result:
+                            st.info(f"🎞️ Rendering {result.get('duration_seconds', 0)}s slideshow...")
+                    st.link_button("▶️ Open Video", f"{API_BASE_URL}/projects/{project_id}/video",
+                                   use_container_width=True)
+
+                if st.button("🗑️ Delete", key=f"delete_{project_id}_{i}", 
+                           use_container_width=True):
+                    if api_request(f"projects/{project_id}", "DELETE"):
+                        if (st.session_state.current_project or {}).get("project_id") == project_id:
+                            st.session_state.current_project = None
+                        st.success(f"🗑️ Deleted {project_id}")
+                        st.rerun()
 # Main Router
 pages = {
     "Create Story": create_story_page,
@@ -0,0 +1 @@
+"""Offline load testing: mock provider APIs and an end-to-end load generator."""
@@ -0,0 +1,186 @@
+"""
+Local stand-in for the Runware, Together AI and OpenAI APIs.
+
+Each endpoint answers in the provider's response shape after a log-normal
+delay, fails a configurable fraction of calls with 500 or 429 (with
+Retry-After), and returns URLs to (or base64 of) real, small JPEGs served
+from this process, so the whole generate -> preview -> approve pipeline runs
+offline.
+
+    python -m loadtest.mock_providers --port 9100 \
+        --latency runware=1.5:0.4,together=1.0:0.3,openai=2.5:0.3 \
+        --error-rate 0.02 --rate-limit-rate 0.03
+
+Point the backend at it with:
+
+    RUNWARE_API_URL=http://127.0.0.1:9100/runware
+    TOGETHER_API_URL=http://127.0.0.1:9100/together
+    OPENAI_API_URL=http://127.0.0.1:9100/openai
+    RUNWARE_API_KEY=mock TOGETHER_API_KEY=mock OPENAI_API_KEY=mock
+"""
+
+import io
+import re
+import json
+import math
+import uuid
+import base64
+import random
+import asyncio
+import argparse
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from PIL import Image, ImageDraw, ImageFilter
+import uvicorn
+
+DEFAULT_LATENCY = "runware=1.5:0.4,together=1.0:0.3,openai=2.5:0.3"
+
+# Mutated by main() before the server starts
+SETTINGS = {
+    "latency": {},              # provider -> (median seconds, log-normal sigma)
+    "error_rate": 0.0,          # fraction of calls answered with 500
+    "rate_limit_rate": 0.0,     # fraction of calls answered with 429
+    "image_size": 256,
+    "public_url": "http://127.0.0.1:9100"
+}
+
+app = FastAPI(title="Mock image/LLM providers")
+
+def parse_latency(spec: str) -> Dict[str, Tuple[float, float]]:
+    """'runware=1.5:0.4,openai=2' -> {'runware': (1.5, 0.4), 'openai': (2.0, 0.0)}"""
+    latency = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        provider, _, value = item.partition("=")
+        median, _, sigma = value.partition(":")
+        latency[provider.strip()] = (float(median), float(sigma or 0))
+    return latency
+
+async def simulate(provider: str) -> Optional[Response]:
+    """Sleep like the provider would; return an error response for the failed fraction of calls."""
+    median, sigma = SETTINGS["latency"].get(provider, (0.0, 0.0))
+    if median > 0:
+        await asyncio.sleep(median * math.exp(random.gauss(0, sigma)) if sigma else median)
+
+    roll = random.random()
+    if roll < SETTINGS["rate_limit_rate"]:
+        return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": "1"})
+    if roll < SETTINGS["rate_limit_rate"] + SETTINGS["error_rate"]:
+        return JSONResponse({"error": "internal error"}, status_code=500)
+    return None
+
+@lru_cache(maxsize=64)
+def render_image(seed: int) -> bytes:
+    """A small but real JPEG: coloured noise with a few shapes, distinct per seed."""
+    rng = random.Random(seed)
+    size = SETTINGS["image_size"]
+    image = Image.effect_noise((size, size), 40).convert("RGB")
+    tint = Image.new("RGB", (size, size), tuple(rng.randrange(256) for _ in range(3)))
+    image = Image.blend(image, tint, 0.6)
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        x, y = rng.randrange(size), rng.randrange(size)
+        r = rng.randrange(size // 16, size // 4)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.filter(ImageFilter.GaussianBlur(1)).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+def new_image() -> Tuple[str, bytes]:
+    seed = random.randrange(64)
+    return f"{SETTINGS['public_url']}/images/{seed}-{uuid.uuid4().hex[:8]}.jpg", render_image(seed)
+
+@app.get("/images/{name}")
+async def get_image(name: str):
+    seed = int(name.split("-", 1)[0]) % 64
+    return Response(content=render_image(seed), media_type="image/jpeg")
+
+@app.post("/runware")
+async def runware(request: Request):
+    failure = await simulate("runware")
+    if failure:
+        return failure
+
+    tasks = await request.json()
+    data = []
+    for task in tasks:
+        url, body = new_image()
+        result = {"taskType": "imageInference", "taskUUID": task.get("taskUUID"), "imageUUID": str(uuid.uuid4())}
+        if task.get("outputType") == "base64Data":
+            result["imageBase64Data"] = base64.b64encode(body).decode("ascii")
+        else:
+            result["imageURL"] = url
+        data.append(result)
+    return {"data": data}
+
+@app.post("/together")
+async def together(request: Request):
+    failure = await simulate("together")
+    if failure:
+        return failure
+
+    payload = await request.json()
+    data = []
+    for _ in range(payload.get("n", 1)):
+        url, body = new_image()
+        if payload.get("response_format") == "b64_json":
+            data.append({"b64_json": base64.b64encode(body).decode("ascii")})
+        else:
+            data.append({"url": url})
+    return {"id": uuid.uuid4().hex, "model": payload.get("model"), "data": data}
+
+@app.post("/openai")
+async def openai(request: Request):
+    failure = await simulate("openai")
+    if failure:
+        return failure
+
+    payload = await request.json()
+    prompt = payload["messages"][-1]["content"]
+    # build_prompt opens with "Create N detailed visual scene descriptions"
+    match = re.search(r"Create (\d+) ", prompt)
+    num_scenes = int(match.group(1)) if match else 3
+    scenes = [
+        {
+            "scene_number": i + 1,
+            "scene_title": f"Mock Scene {i + 1}",
+            "script_excerpt": f"Excerpt for scene {i + 1}.",
+            "image_prompt": f"Cinematic mock scene {i + 1}, dramatic lighting, detailed composition"
+        }
+        for i in range(num_scenes)
+    ]
+    content = "```json\n" + json.dumps({"scenes": scenes}) + "\n```"
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "model": payload.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]
+    }
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "settings": SETTINGS}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default=DEFAULT_LATENCY,
+                        help="per provider median seconds and log-normal sigma, e.g. runware=1.5:0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--image-size", type=int, default=256)
+    args = parser.parse_args()
+
+    SETTINGS.update(
+        latency=parse_latency(args.latency),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        image_size=args.image_size,
+        public_url=f"http://{args.host}:{args.port}"
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
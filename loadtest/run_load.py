@@ -0,0 +1,287 @@
+"""
+End-to-end load generator for the backend.
+
+Drives N concurrent story flows through the public API, from
+/analyze-script to /generate-previews, polling /generation-status until the
+previews are ready, then /approve-previews. Reports throughput,
+p50/p95/p99 latency per step and error rates.
+
+Fully offline, with the mock providers and a backend started on free ports:
+
+    python -m loadtest.run_load --spawn --flows 40 --concurrency 8 --scenes 4 \
+        --latency runware=1.0:0.4,openai=1.5:0.3 --error-rate 0.02 --rate-limit-rate 0.03
+
+Against an already running backend (pointed at loadtest.mock_providers):
+
+    python -m loadtest.run_load --backend http://127.0.0.1:8000 --flows 20 --concurrency 4
+
+Each flow counts as a separate client for the per-client admission limits
+only when CLIENT_ID_SECRET matches the backend's (--spawn sets one up).
+Otherwise all flows share the limits of this machine's address.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+from .mock_providers import DEFAULT_LATENCY
+
+STEPS = ("analyze", "generate", "previews", "approve", "flow")
+SETTLED_STATUSES = ("previewing", "completed", "failed")
+SCRIPT = (
+    "The lighthouse keeper climbed the spiral stairs as the storm rolled in. "
+    "Below, a small boat fought the waves, its lantern flickering. "
+    "She lit the great lamp and watched the beam sweep across the black water. "
+    "By dawn the boat rested safely in the harbour, its crew waving up at the tower. "
+) * 5
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+def spawn_servers(args) -> Tuple[str, List[subprocess.Popen]]:
+    """Start the mock providers and a backend wired to them; returns the backend URL."""
+    mock_port, backend_port = free_port(), free_port()
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    repo_root = Path(__file__).resolve().parent.parent
+
+    mock = subprocess.Popen([
+        sys.executable, "-m", "loadtest.mock_providers", "--port", str(mock_port),
+        "--latency", args.latency, "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate)
+    ], cwd=repo_root)
+
+    env = dict(
+        os.environ,
+        RUNWARE_API_URL=f"{mock_url}/runware", RUNWARE_API_KEY="mock",
+        TOGETHER_API_URL=f"{mock_url}/together", TOGETHER_API_KEY="mock",
+        OPENAI_API_URL=f"{mock_url}/openai", OPENAI_API_KEY="mock"
+    )
+    env.setdefault("RETRY_DELAY", "1")
+    args.client_secret = args.client_secret or uuid.uuid4().hex
+    env["CLIENT_ID_SECRET"] = args.client_secret
+    # Projects, previews and the index from a load run must not land in the real data store
+    args.data_dir = tempfile.mkdtemp(prefix="story_load_")
+    env["DATA_DIR"] = args.data_dir
+    backend = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--port", str(backend_port), "--log-level", "warning"
+    ], cwd=repo_root, env=env)
+
+    processes = [mock, backend]
+    try:
+        wait_until_up(f"{mock_url}/health")
+        wait_until_up(f"http://127.0.0.1:{backend_port}/health")
+    except Exception:
+        stop_servers(processes, args.data_dir)
+        raise
+    return f"http://127.0.0.1:{backend_port}", processes
+
+def stop_servers(processes: List[subprocess.Popen], data_dir: Optional[str] = None) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    if data_dir:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+def run_flow(http: requests.Session, backend: str, args) -> Dict:
+    """One story end to end; returns per-step durations and the first failure, if any."""
+    timings: Dict[str, float] = {}
+    result = {"timings": timings, "error": None, "failed_scenes": 0, "saved_images": 0}
+    flow_start = time.perf_counter()
+    project_id = None
+    # Each flow is its own client as far as the backend's per-client admission limits go
+    client = {"X-Client-Id": f"loadtest-{uuid.uuid4().hex[:12]}"}
+    if args.client_secret:
+        client["X-Client-Secret"] = args.client_secret
+
+    def step(name: str, method: str, path: str, **kwargs) -> Dict:
+        start = time.perf_counter()
+        response = http.request(method, f"{backend}{path}", headers=client, timeout=args.timeout, **kwargs)
+        timings[name] = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status_code}")
+        return response.json()
+
+    try:
+        project = step("analyze", "POST", "/analyze-script", json={"script": SCRIPT, "title": "Load test"})
+        project_id = project["project_id"]
+
+        session = step("generate", "POST", "/generate-previews", json={
+            "project_id": project_id,
+            "num_scenes": args.scenes,
+            "ai_provider": "Openai",
+            "ai_model": "gpt-4o-mini",
+            "image_provider": args.provider,
+            "image_model": args.model
+        })
+        session_id = session["session_id"]
+
+        # Poll with the session version ETag so unchanged polls are bodiless 304s
+        start = time.perf_counter()
+        etag, status = None, None
+        while time.perf_counter() - start < args.timeout:
+            response = http.get(
+                f"{backend}/generation-status/{session_id}",
+                headers={"If-None-Match": etag} if etag else {}, timeout=args.timeout
+            )
+            if response.status_code == 200:
+                status, etag = response.json(), response.headers.get("ETag")
+                if status["status"] in SETTLED_STATUSES:
+                    break
+            elif response.status_code != 304:
+                raise RuntimeError(f"previews: HTTP {response.status_code}")
+            time.sleep(args.poll_interval)
+        timings["previews"] = time.perf_counter() - start
+        if not status or status["status"] != "previewing":
+            raise RuntimeError(f"previews: session ended as {status and status['status']}")
+
+        result["failed_scenes"] = sum(1 for p in status["previews"] if not p["preview_url"])
+        approvals = {str(p["scene_number"]): bool(p["preview_url"]) for p in status["previews"]}
+        approved = step("approve", "POST", "/approve-previews", json={
+            "session_id": session_id, "scene_approvals": approvals
+        })
+        result["saved_images"] = approved["saved_images"]
+        http.delete(f"{backend}/sessions/{session_id}", timeout=args.timeout)
+        timings["flow"] = time.perf_counter() - flow_start
+
+    except Exception as e:
+        result["error"] = str(e)
+
+    finally:
+        if project_id and not args.keep:
+            try:
+                http.delete(f"{backend}/projects/{project_id}", timeout=args.timeout)
+            except requests.exceptions.RequestException:
+                pass
+
+    return result
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+def summarize(results: List[Dict], wall_seconds: float, args) -> Dict:
+    completed = [r for r in results if not r["error"]]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["error"]:
+            kind = r["error"].split(":", 1)[0]
+            errors[kind] = errors.get(kind, 0) + 1
+
+    steps = {}
+    for name in STEPS:
+        values = [r["timings"][name] for r in results if name in r["timings"]]
+        steps[name] = {
+            "count": len(values),
+            **{f"p{p}": percentile(values, p) for p in (50, 95, 99)},
+            "max": max(values) if values else None
+        }
+
+    total_scenes = len(completed) * args.scenes
+    failed_scenes = sum(r["failed_scenes"] for r in completed)
+    return {
+        "flows": len(results),
+        "concurrency": args.concurrency,
+        "scenes_per_flow": args.scenes,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_flows_per_second": round(len(completed) / wall_seconds, 3) if wall_seconds else 0,
+        "throughput_images_per_second": round(sum(r["saved_images"] for r in completed) / wall_seconds, 3) if wall_seconds else 0,
+        "flow_error_rate": round(1 - len(completed) / len(results), 4) if results else 0,
+        "scene_failure_rate": round(failed_scenes / total_scenes, 4) if total_scenes else 0,
+        "errors": errors,
+        "steps": steps
+    }
+
+def print_report(summary: Dict) -> None:
+    print(f"\n{summary['flows']} flows, concurrency {summary['concurrency']}, "
+          f"{summary['scenes_per_flow']} scenes each, {summary['wall_seconds']}s wall")
+    print(f"throughput: {summary['throughput_flows_per_second']} flows/s, "
+          f"{summary['throughput_images_per_second']} images/s")
+    print(f"flow error rate: {summary['flow_error_rate']:.2%}   scene failure rate: {summary['scene_failure_rate']:.2%}")
+    if summary["errors"]:
+        print(f"errors: {summary['errors']}")
+
+    fmt = lambda v: f"{v:9.3f}" if v is not None else f"{'-':>9}"
+    print(f"\n{'step':<10}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, stats in summary["steps"].items():
+        print(f"{name:<10}{stats['count']:>7}" + "".join(fmt(stats[k]) for k in ("p50", "p95", "p99", "max")))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="start mock providers and a backend on free ports")
+    parser.add_argument("--flows", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--scenes", type=int, default=3)
+    parser.add_argument("--provider", default="runware", choices=["runware", "together"])
+    parser.add_argument("--model", default="runware:101@1")
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--keep", action="store_true", help="keep the created projects")
+    parser.add_argument("--output", help="write the summary as JSON to this file")
+    # Forwarded to the mock providers with --spawn
+    parser.add_argument("--latency", default=DEFAULT_LATENCY)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    args.client_secret = os.getenv("CLIENT_ID_SECRET", "")
+
+    processes = []
+    backend = args.backend
+    if args.spawn:
+        backend, processes = spawn_servers(args)
+        print(f"backend at {backend}")
+
+    try:
+        with requests.Session() as http:
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+            http.mount("http://", adapter)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                futures = [executor.submit(run_flow, http, backend, args) for _ in range(args.flows)]
+                results = [future.result() for future in futures]
+            wall_seconds = time.perf_counter() - start
+    finally:
+        stop_servers(processes, args.data_dir if args.spawn else None)
+
+    summary = summarize(results, wall_seconds, args)
+    print_report(summary)
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
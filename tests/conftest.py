@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Point the whole data store at a scratch directory before backend.config is imported
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="story_tests_"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
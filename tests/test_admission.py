@@ -0,0 +1,182 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.config import PROJECTS_DIR
+from backend.utils import admission
+from backend.models.schemas import ScenePrompt
+from backend.utils.admission import AdmissionRejected, admit, release, scene_finished
+from backend.utils.storage import save_scene_prompts
+
+@pytest.fixture(autouse=True)
+def clean_admission(monkeypatch):
+    monkeypatch.setattr(admission, "_tickets", {})
+    monkeypatch.setattr(admission, "_scene_seconds", {"average": 10.0})
+    monkeypatch.setattr(admission, "MAX_ACTIVE_SESSIONS", 16)
+    monkeypatch.setattr(admission, "MAX_ACTIVE_SESSIONS_PER_CLIENT", 4)
+    monkeypatch.setattr(admission, "MAX_QUEUED_SCENES", 400)
+    monkeypatch.setattr(admission, "MAX_QUEUED_SCENES_PER_CLIENT", 100)
+
+@pytest.fixture
+def project():
+    project_id = "story_admission_test"
+    (PROJECTS_DIR / project_id).mkdir(parents=True, exist_ok=True)
+    return project_id
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+def ticket(remaining, parallelism=1, client="a"):
+    return {"client": client, "remaining": remaining, "parallelism": parallelism}
+
+# _drain_time
+
+def test_drain_time_without_tickets_is_zero():
+    assert admission._drain_time([], 5, 10.0) == (0.0, 0)
+
+def test_drain_time_counts_scene_steps():
+    # One scene every 10s: three scenes are freed after 30s, before the ticket finishes
+    assert admission._drain_time([ticket(5)], 3, 10.0) == (30.0, 1)
+
+def test_drain_time_uses_parallelism():
+    # Four scenes at a time: eight scenes drain in two steps and finish the ticket
+    assert admission._drain_time([ticket(8, parallelism=4)], 8, 10.0) == (20.0, 1)
+
+def test_drain_time_counts_finished_sessions():
+    tickets = [ticket(1), ticket(1), ticket(5)]
+    seconds, position = admission._drain_time(tickets, 3, 10.0)
+    assert seconds == 10.0
+    assert position == 2
+
+# Limits
+
+def test_session_limit_per_client(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_ACTIVE_SESSIONS_PER_CLIENT", 2)
+    admit("a", 3)
+    admit("a", 3)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admit("a", 3)
+    assert rejected.value.limit == "client active sessions"
+    assert rejected.value.queue_position == 1
+    assert rejected.value.retry_after == 30.0
+    # Other clients are unaffected
+    admit("b", 3)
+
+def test_global_session_limit(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_ACTIVE_SESSIONS", 2)
+    admit("a", 1)
+    admit("b", 4)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admit("c", 1)
+    assert rejected.value.limit == "global active sessions"
+    assert rejected.value.retry_after == 10.0
+
+def test_scene_limit(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUED_SCENES", 10)
+    admit("a", 8)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admit("b", 4)
+    assert rejected.value.limit == "global queued scenes"
+    # Two of the eight queued scenes must finish first
+    assert rejected.value.retry_after == 20.0
+
+def test_scene_limit_per_client(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUED_SCENES_PER_CLIENT", 6)
+    admit("a", 5)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admit("a", 2)
+    assert rejected.value.limit == "client queued scenes"
+    admit("b", 6)
+
+def test_request_that_never_fits(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUED_SCENES", 10)
+    with pytest.raises(ValueError):
+        admit("a", 11)
+
+def test_finished_scenes_and_release_free_capacity(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUED_SCENES", 4)
+    first = admit("a", 4)
+    with pytest.raises(AdmissionRejected):
+        admit("b", 1)
+    scene_finished(first, 2.0)
+    admit("b", 1)
+    release(first)
+    assert admission.active_tickets() == 1
+    assert admission.queued_scenes() == 1
+
+# Endpoint behaviour
+
+def test_generate_previews_returns_429_with_retry_after(monkeypatch, client, project):
+    monkeypatch.setattr(admission, "MAX_ACTIVE_SESSIONS_PER_CLIENT", 1)
+    admit("testclient", 2)
+
+    response = client.post("/generate-previews", json={"project_id": project, "num_scenes": 2})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "20"
+    assert response.json()["detail"] == {
+        "error": "Over the client active sessions limit", "retry_after": 20, "queue_position": 1
+    }
+
+def test_generate_previews_returns_400_when_request_never_fits(monkeypatch, client, project):
+    monkeypatch.setattr(admission, "MAX_QUEUED_SCENES", 3)
+    response = client.post("/generate-previews", json={"project_id": project, "num_scenes": 5})
+    assert response.status_code == 400
+    assert admission.active_tickets() == 0
+
+def test_ticket_released_when_prompt_preparation_fails(monkeypatch, client, project):
+    def failing_prompts(project_path, request):
+        raise HTTPException(status_code=404, detail="Script file not found")
+
+    monkeypatch.setattr(main, "prepare_scene_prompts", failing_prompts)
+    response = client.post("/generate-previews", json={"project_id": project, "num_scenes": 2})
+
+    assert response.status_code == 404
+    assert admission.active_tickets() == 0
+
+def test_saved_prompts_admitted_by_saved_scene_count(monkeypatch, client, project):
+    save_scene_prompts(PROJECTS_DIR / project, [
+        ScenePrompt(scene_number=n, scene_title=f"Scene {n}", script_excerpt="", image_prompt="prompt")
+        for n in range(1, 6)
+    ])
+    admitted = []
+    monkeypatch.setattr(main, "admit_or_reject", lambda http_request, scenes: admitted.append(scenes) or "ticket")
+    monkeypatch.setattr(main, "release", lambda ticket: None)
+    monkeypatch.setattr(main, "generate_image_with_retry", lambda *args: pytest.fail("no generation expected"))
+    monkeypatch.setattr(main.BackgroundTasks, "add_task", lambda self, func, *args, **kwargs: None)
+
+    response = client.post(
+        "/generate-previews", json={"project_id": project, "num_scenes": 1, "use_saved_prompts": True}
+    )
+
+    assert response.status_code == 200
+    assert admitted == [5]
+
+def test_client_id_header_ignored_without_secret(monkeypatch, client, project):
+    monkeypatch.setattr(admission, "MAX_ACTIVE_SESSIONS_PER_CLIENT", 1)
+    admit("testclient", 2)
+    response = client.post(
+        "/generate-previews", json={"project_id": project, "num_scenes": 2},
+        headers={"X-Client-Id": "someone-else"}
+    )
+    assert response.status_code == 429
+
+def test_client_id_header_trusted_with_secret(monkeypatch, client, project):
+    monkeypatch.setattr(main, "CLIENT_ID_SECRET", "shared")
+    monkeypatch.setattr(admission, "MAX_ACTIVE_SESSIONS_PER_CLIENT", 1)
+    monkeypatch.setattr(main, "prepare_scene_prompts", lambda project_path, request: [])
+    admit("testclient", 2)
+
+    wrong = client.post(
+        "/generate-previews", json={"project_id": project, "num_scenes": 2},
+        headers={"X-Client-Id": "browser-1", "X-Client-Secret": "guess"}
+    )
+    right = client.post(
+        "/generate-previews", json={"project_id": project, "num_scenes": 2},
+        headers={"X-Client-Id": "browser-1", "X-Client-Secret": "shared"}
+    )
+    assert wrong.status_code == 429
+    assert right.status_code == 200
@@ -0,0 +1,92 @@
+import io
+
+import pytest
+from PIL import Image
+
+from backend.config import PREVIEW_CACHE_DIR
+from backend.utils import previews
+from backend.utils.previews import cached_media_type, fetch_proxied_preview, proxy_key, proxy_preview_url
+
+class FakeResponse:
+    def __init__(self, body: bytes, content_type: str, content_length: bool = True):
+        self.body = body
+        self.headers = {"Content-Type": content_type}
+        if content_length:
+            self.headers["Content-Length"] = str(len(body))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+class FakeHttp:
+    def __init__(self, response: FakeResponse):
+        self.response = response
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return self.response
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    for path in PREVIEW_CACHE_DIR.iterdir():
+        path.unlink()
+    monkeypatch.setattr(previews, "_cache_bytes", None)
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), "green").save(buffer, "PNG")
+    return buffer.getvalue()
+
+def register(monkeypatch, url: str, response: FakeResponse) -> str:
+    monkeypatch.setattr(previews, "_proxy_http", FakeHttp(response))
+    proxy_preview_url(url)
+    return proxy_key(url)
+
+def test_fetch_serves_the_upstream_image_type(monkeypatch):
+    key = register(monkeypatch, "https://cdn.example/a.png", FakeResponse(png_bytes(), "image/png"))
+
+    path = fetch_proxied_preview(key)
+
+    assert cached_media_type(path) == "image/png"
+    assert fetch_proxied_preview(key) == path
+    assert previews._proxy_http.calls == 1
+
+def test_fetch_rejects_non_image_responses(monkeypatch):
+    key = register(monkeypatch, "https://cdn.example/error", FakeResponse(b"<html></html>", "text/html"))
+
+    with pytest.raises(ValueError):
+        fetch_proxied_preview(key)
+    assert list(PREVIEW_CACHE_DIR.iterdir()) == []
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_fetch_fails_past_the_size_cap(monkeypatch, content_length):
+    monkeypatch.setattr(previews, "PREVIEW_MAX_BYTES", 1024)
+    body = b"\xff" * 4096
+    key = register(monkeypatch, "https://cdn.example/big", FakeResponse(body, "image/jpeg", content_length))
+
+    with pytest.raises(ValueError):
+        fetch_proxied_preview(key)
+    assert list(PREVIEW_CACHE_DIR.iterdir()) == []
+
+def test_eviction_runs_only_when_the_running_total_passes_the_limit(monkeypatch):
+    monkeypatch.setattr(previews, "PREVIEW_CACHE_MAX_BYTES", 2500)
+    scans = []
+    real_evict = previews._evict
+    monkeypatch.setattr(previews, "_evict", lambda max_bytes: scans.append(max_bytes) or real_evict(max_bytes))
+
+    for i in range(3):
+        fetch_proxied_preview(register(monkeypatch, f"https://cdn.example/{i}", FakeResponse(b"x" * 1000, "image/jpeg")))
+        assert len(scans) == (1 if i == 2 else 0)
+
+    # Trimmed below the limit, with the total recomputed from disk
+    assert sum(p.stat().st_size for p in PREVIEW_CACHE_DIR.glob("*.jpg")) == previews._cache_bytes == 2000
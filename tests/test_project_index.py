@@ -0,0 +1,17 @@
+import uuid
+
+from backend.utils.project_index import index_project, query_projects, remove_project
+
+def test_search_matches_like_metacharacters_literally():
+    tag = uuid.uuid4().hex[:6]
+    ids = [f"story_{tag}_percent", f"story_{tag}xunderscore"]
+    index_project(ids[0], {}, title="100% done")
+    index_project(ids[1], {}, title="plain")
+    try:
+        assert [p["project_id"] for p in query_projects(search="100%")[0]] == [ids[0]]
+        # "_" must not match the "x" in the second id
+        assert [p["project_id"] for p in query_projects(search=f"{tag}_")[0]] == [ids[0]]
+        assert query_projects(search="\\")[1] == 0
+    finally:
+        for project_id in ids:
+            remove_project(project_id)
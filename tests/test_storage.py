@@ -0,0 +1,91 @@
+import io
+import uuid
+
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.config import PROJECTS_DIR
+from backend.models.schemas import GenerationSession, PostProcessSettings, PreviewImage
+from backend.utils.postprocess import save_settings, supported_formats
+from backend.utils.previews import local_preview_path, store_preview
+from backend.utils.storage import save_approved_images
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def project():
+    project_id = f"story_storage_{uuid.uuid4().hex[:6]}"
+    (PROJECTS_DIR / project_id / "images").mkdir(parents=True)
+    return project_id
+
+def jpeg_bytes(color: str = "red") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+def local_preview(scene_number: int, approved: bool, color: str = "red") -> PreviewImage:
+    return PreviewImage(
+        scene_number=scene_number,
+        scene_title=f"Scene {scene_number}",
+        prompt="prompt",
+        preview_url=store_preview(jpeg_bytes(color)),
+        generation_time=1.0,
+        provider_used="together",
+        model_used="model",
+        approved=approved
+    )
+
+def session_for(project_id: str, previews) -> GenerationSession:
+    return GenerationSession(
+        session_id=f"session_{uuid.uuid4().hex[:8]}",
+        project_id=project_id,
+        status="previewing",
+        total_scenes=len(previews),
+        completed_scenes=len(previews),
+        previews=previews
+    )
+
+@pytest.mark.skipif("webp" not in supported_formats(), reason="Pillow built without WebP")
+def test_promoted_preview_points_at_post_processed_file(client, project):
+    save_settings(PROJECTS_DIR / project, PostProcessSettings(enabled=True, format="webp"))
+    preview = local_preview(1, approved=True)
+    session = session_for(project, [preview])
+
+    results = save_approved_images(session)
+
+    assert [r.filename for r in results if r.success] == ["scene_001.webp"]
+    assert preview.preview_url == f"/projects/{project}/images/scene_001.webp"
+    assert preview.local_url is None
+    assert not (PROJECTS_DIR / project / "images" / "scene_001.jpg").exists()
+    response = client.get(preview.preview_url)
+    assert response.status_code == 200
+    assert Image.open(io.BytesIO(response.content)).format == "WEBP"
+
+def test_reapproving_promoted_preview_keeps_saved_image(project):
+    preview = local_preview(1, approved=True)
+    session = session_for(project, [preview])
+    save_approved_images(session)
+    saved = PROJECTS_DIR / project / "images" / "scene_001.jpg"
+    assert preview.preview_url == f"/projects/{project}/images/scene_001.jpg"
+
+    results = save_approved_images(session)
+
+    assert [(r.filename, r.success, r.error) for r in results] == [("scene_001.jpg", True, None)]
+    assert results[0].sha256
+    assert saved.exists()
+
+def test_rejected_local_previews_are_discarded(project):
+    rejected = local_preview(2, approved=False, color="blue")
+    rejected_path = local_preview_path(rejected.preview_url)
+    session = session_for(project, [local_preview(1, approved=True), rejected])
+
+    save_approved_images(session)
+
+    assert not rejected_path.exists()
+    assert rejected.preview_url == ""
+    assert not (PROJECTS_DIR / project / "images" / "scene_002.jpg").exists()